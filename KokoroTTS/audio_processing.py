@@ -0,0 +1,249 @@
+"""
+Audio Post-Processing for KokoroTTS
+Vectorized NumPy stage that runs between synthesis and WAV encoding
+
+Every step works on float32 sample buffers in place (or returns a view into
+the same buffer), so long lectures never hold more than one working copy:
+
+    trim_silence       - drop leading/trailing silence by frame energy
+    compress_pauses    - shorten over-long pauses between sentences
+    normalize_loudness - bring every slide to the same RMS loudness
+    resample           - optional 24 kHz -> 16 kHz for low-bandwidth mode
+
+Usage:
+    processor = AudioPostProcessor(target_sample_rate=16000)
+    samples, sr = processor.process(samples, sr)
+    pcm = to_pcm16(samples)
+"""
+
+from math import gcd
+
+import numpy as np
+
+SILENCE_DB = -45.0          # Frames quieter than this (dBFS) count as silence
+FRAME_MS = 10               # Analysis frame length
+LOW_BANDWIDTH_RATE = 16000  # Sample rate for bandwidth-constrained mode
+
+
+def frame_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """
+    RMS level of each full frame in dBFS
+
+    Uses einsum on a reshaped view so no squared copy of the signal is made.
+    """
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+    power = np.einsum("ij,ij->i", frames, frames) / frame_len
+    return 10.0 * np.log10(np.maximum(power, 1e-12))
+
+
+def silence_bounds(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_db: float = SILENCE_DB,
+    pad_ms: int = 30
+) -> tuple[int, int]:
+    """
+    Sample range [start, end) that remains after trimming edge silence
+
+    Returns (0, 0) if everything is silent.
+    """
+    frame_len = max(1, sample_rate * FRAME_MS // 1000)
+    loud = np.flatnonzero(frame_db(samples, frame_len) > threshold_db)
+    if len(loud) == 0:
+        return 0, 0
+
+    pad = sample_rate * pad_ms // 1000
+    start = max(0, int(loud[0]) * frame_len - pad)
+    end = min(len(samples), (int(loud[-1]) + 1) * frame_len + pad)
+    return start, end
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_db: float = SILENCE_DB,
+    pad_ms: int = 30
+) -> np.ndarray:
+    """
+    Trim leading and trailing silence
+
+    Returns:
+        A view into samples (no copy); empty if everything is silent
+    """
+    start, end = silence_bounds(samples, sample_rate, threshold_db, pad_ms)
+    return samples[start:end]
+
+
+def compress_pauses(
+    samples: np.ndarray,
+    sample_rate: int,
+    max_pause_ms: int = 400,
+    threshold_db: float = SILENCE_DB
+) -> np.ndarray:
+    """
+    Shorten internal pauses longer than max_pause_ms
+
+    The middle of each long silent run is cut out and the remaining audio is
+    compacted towards the start of the same buffer.
+
+    Returns:
+        A view of the compacted prefix of samples
+    """
+    frame_len = max(1, sample_rate * FRAME_MS // 1000)
+    silent = frame_db(samples, frame_len) <= threshold_db
+    if not silent.any():
+        return samples
+
+    # Run boundaries of silent frames: starts where mask goes 0->1, ends 1->0
+    edges = np.diff(np.concatenate(([0], silent.view(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+
+    max_frames = max(2, max_pause_ms // FRAME_MS)
+    long_runs = (run_ends - run_starts) > max_frames
+    if not long_runs.any():
+        return samples
+
+    # Keep half of the allowed pause on each side of every cut
+    half = max_frames // 2
+    cut_starts = (run_starts[long_runs] + half) * frame_len
+    cut_ends = (run_ends[long_runs] - half) * frame_len
+
+    dst = cut_starts[0]
+    for src_start, src_end in zip(cut_ends, np.append(cut_starts[1:], len(samples))):
+        n = src_end - src_start
+        # dst <= src_start, so forward overlapping copies are safe
+        samples[dst:dst + n] = samples[src_start:src_end]
+        dst += n
+
+    return samples[:dst]
+
+
+def normalize_loudness(
+    samples: np.ndarray,
+    sample_rate: int,
+    target_dbfs: float = -20.0,
+    peak_limit: float = 0.97,
+    threshold_db: float = SILENCE_DB
+) -> np.ndarray:
+    """
+    Scale samples in place so active speech sits at target_dbfs RMS
+
+    Silent frames are excluded from the measurement so pause length does not
+    change loudness, and the gain is capped so peaks stay below peak_limit.
+    """
+    if len(samples) == 0:
+        return samples
+
+    frame_len = max(1, sample_rate * FRAME_MS // 1000)
+    levels = frame_db(samples, frame_len)
+    active = levels[levels > threshold_db]
+    if len(active) == 0:
+        return samples
+
+    # Mean power of active frames, back in dB
+    active_db = 10.0 * np.log10(np.mean(10.0 ** (active / 10.0)))
+    gain = 10.0 ** ((target_dbfs - active_db) / 20.0)
+
+    peak = float(np.max(np.abs(samples)))
+    if peak * gain > peak_limit:
+        gain = peak_limit / peak
+
+    samples *= np.float32(gain)
+    return samples
+
+
+def resample(samples: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Polyphase resampling with an anti-aliasing filter
+
+    This is the only stage that allocates: the output buffer is
+    target_rate / orig_rate the size of the input.
+    """
+    if orig_rate == target_rate or len(samples) == 0:
+        return samples
+    from scipy.signal import resample_poly
+
+    g = gcd(orig_rate, target_rate)
+    out = resample_poly(samples, target_rate // g, orig_rate // g)
+    return out.astype(np.float32, copy=False)
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    """
+    Convert float samples to 16-bit PCM
+
+    Clips and scales in place, so the only new buffer is the int16 output
+    (half the size of the float32 input).
+    """
+    np.clip(samples, -1.0, 1.0, out=samples)
+    samples *= np.float32(32767)
+    return samples.astype(np.int16)
+
+
+class AudioPostProcessor:
+    """
+    Configurable post-processing pipeline between synthesize() and encoding
+
+    Usage:
+        processor = AudioPostProcessor()
+        samples, sr = processor.process(samples, sr)
+    """
+
+    def __init__(
+        self,
+        trim: bool = True,
+        max_pause_ms: int | None = 400,
+        target_dbfs: float | None = -20.0,
+        target_sample_rate: int | None = None,
+        threshold_db: float = SILENCE_DB,
+        sentence_pause_ms: int = 250
+    ):
+        """
+        Args:
+            trim: Trim leading/trailing silence
+            max_pause_ms: Longest pause to keep inside the audio (None: keep all)
+            target_dbfs: RMS loudness target (None: skip normalization)
+            target_sample_rate: Output rate, e.g. 16000 for low bandwidth (None: keep)
+            threshold_db: Silence threshold in dBFS
+            sentence_pause_ms: Pause inserted between separately synthesized chunks
+        """
+        self.trim = trim
+        self.max_pause_ms = max_pause_ms
+        self.target_dbfs = target_dbfs
+        self.target_sample_rate = target_sample_rate
+        self.threshold_db = threshold_db
+        self.sentence_pause_ms = sentence_pause_ms
+
+    def process(self, samples, sample_rate: int):
+        """
+        Run the pipeline, reusing the input buffer wherever possible
+
+        Args:
+            samples: Float audio (converted to float32 only if needed)
+            sample_rate: Input sample rate
+
+        Returns:
+            tuple: (processed_samples, sample_rate)
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if not samples.flags.writeable:
+            samples = samples.copy()
+
+        if self.trim:
+            samples = trim_silence(samples, sample_rate, threshold_db=self.threshold_db)
+
+        if self.max_pause_ms is not None:
+            samples = compress_pauses(samples, sample_rate, self.max_pause_ms, self.threshold_db)
+
+        if self.target_dbfs is not None:
+            normalize_loudness(samples, sample_rate, self.target_dbfs, threshold_db=self.threshold_db)
+
+        if self.target_sample_rate and self.target_sample_rate != sample_rate:
+            samples = resample(samples, sample_rate, self.target_sample_rate)
+            sample_rate = self.target_sample_rate
+
+        return samples, sample_rate
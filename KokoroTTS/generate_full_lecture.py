@@ -7,7 +7,9 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "KokoroTTS"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 from tts_engine import KokoroTTS
+from script_parser import parse_script
 
 # Detailed Photosynthesis Lecture Script
 PHOTOSYNTHESIS_LECTURE = """
@@ -129,7 +131,7 @@ def generate_detailed_lecture():
     audio_dir.mkdir(parents=True, exist_ok=True)
     
     # Parse the script
-    segments = parse_lecture_script(PHOTOSYNTHESIS_LECTURE)
+    segments = parse_script(PHOTOSYNTHESIS_LECTURE)
     total_slides = len(segments)
     
     print(f"\nParsed {total_slides} slides")
@@ -153,12 +155,12 @@ def generate_detailed_lecture():
     
     for i, segment in enumerate(segments):
         slide_num = i + 1
-        print(f"\n[{slide_num}/{total_slides}] {segment['title']}")
+        print(f"\n[{slide_num}/{total_slides}] {segment['slide']['title']}")
         
         # Generate SVG slide
         svg_content = generate_slide_svg(
-            title=segment['title'],
-            content=segment['content'],
+            title=segment['slide']['title'],
+            content=segment['slide']['content'],
             slide_number=slide_num,
             total_slides=total_slides
         )
@@ -170,10 +172,7 @@ def generate_detailed_lecture():
         
         # Generate audio
         audio_path = audio_dir / f"slide{slide_num}.wav"
-        clean_speech = segment['speech']
-        for cue in ['[POINT]', '[GESTURE]', '[THINK]', '[NOD]', '[WAVE]', '[IDLE]']:
-            clean_speech = clean_speech.replace(cue, '')
-        clean_speech = ' '.join(clean_speech.split())  # Clean whitespace
+        clean_speech = segment['speech_clean']
         
         if clean_speech:
             tts.save(
@@ -188,7 +187,7 @@ def generate_detailed_lecture():
         # Add to lecture data
         lecture_data["segments"].append({
             "index": slide_num,
-            "title": segment['title'],
+            "title": segment['slide']['title'],
             "slide_path": f"/slides/photosynthesis/slide{slide_num}.svg",
             "audio_path": f"/audio/photosynthesis/slide{slide_num}.wav",
             "speech_text": segment['speech']
@@ -209,48 +208,6 @@ def generate_detailed_lecture():
     return lecture_data
 
 
-def parse_lecture_script(script):
-    """Parse lecture script into segments"""
-    import re
-    
-    segments = []
-    raw_segments = re.split(r'\n---+\n', script.strip())
-    
-    for seg in raw_segments:
-        if not seg.strip():
-            continue
-        
-        segment = {
-            'title': '',
-            'content': [],
-            'speech': ''
-        }
-        
-        lines = seg.strip().split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            if line.upper().startswith('SLIDE:'):
-                current_section = 'slide'
-                segment['title'] = line[6:].strip()
-            elif line.upper().startswith('SPEECH:'):
-                current_section = 'speech'
-                segment['speech'] = line[7:].strip()
-            elif current_section == 'slide' and line.startswith('-'):
-                segment['content'].append(line[1:].strip())
-            elif current_section == 'speech':
-                segment['speech'] += ' ' + line
-        
-        if segment['title']:
-            segments.append(segment)
-    
-    return segments
-
-
 def generate_slide_svg(title, content, slide_number, total_slides):
     """Generate SVG for a slide"""
     
@@ -259,6 +216,7 @@ def generate_slide_svg(title, content, slide_number, total_slides):
     y_pos = 280
     
     for item in content:
+        item = item.strip().lstrip('-•* ')
         content_elements.append(f'''
     <g transform="translate(120, {y_pos})">
       <circle cx="0" cy="12" r="8" fill="#6366f1"/>
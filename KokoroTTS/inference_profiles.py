@@ -0,0 +1,151 @@
+"""
+ONNX Runtime Inference Profiles for KokoroTTS
+Selects the model variant and session settings used for synthesis
+
+Profiles:
+    fp32   kokoro-v1.0.onnx as downloaded
+    int8   kokoro-v1.0.int8.onnx: weights dynamically quantized to int8
+           (smaller file and RSS, faster MatMuls on CPU, small audio change)
+
+Every profile runs CPU-only with explicit thread counts and graph
+optimization level. By default intra-op threads = CPU cores and inter-op
+threads = 1 (the Kokoro graph is a chain, so parallel branches gain little
+and extra pools only contend for cores). Processes that run several engines
+side by side (course_builder workers) should divide the cores between them.
+
+Create the int8 model once (needs `pip install onnx`):
+    python inference_profiles.py quantize
+
+Usage:
+    tts = KokoroTTS(profile="int8")
+    tts = KokoroTTS(profile={"name": "fp32", "intra_op_threads": 2})
+"""
+
+import os
+from pathlib import Path
+
+MODEL_FILES = {
+    "fp32": "kokoro-v1.0.onnx",
+    "int8": "kokoro-v1.0.int8.onnx"
+}
+
+GRAPH_OPTIMIZATION_LEVELS = ("disabled", "basic", "extended", "all")
+
+DEFAULTS = {
+    "name": "fp32",
+    "intra_op_threads": 0,      # 0 = one per CPU core
+    "inter_op_threads": 1,
+    "graph_optimization": "all"
+}
+
+PROFILES = {
+    "fp32": dict(DEFAULTS),
+    "int8": dict(DEFAULTS, name="int8")
+}
+
+
+def resolve_profile(profile=None) -> dict:
+    """
+    Full settings for a profile name or a partial settings dict
+
+    Args:
+        profile: "fp32", "int8", or a dict with "name" and any of
+                 intra_op_threads, inter_op_threads, graph_optimization
+
+    Returns:
+        dict: name, intra_op_threads, inter_op_threads, graph_optimization
+    """
+    if profile is None:
+        profile = "fp32"
+    if isinstance(profile, str):
+        profile = {"name": profile}
+
+    name = profile.get("name", "fp32")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown inference profile '{name}'. Available: {', '.join(PROFILES)}")
+
+    settings = dict(PROFILES[name])
+    settings.update({k: v for k, v in profile.items() if v is not None})
+    if settings["graph_optimization"] not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(
+            f"graph_optimization must be one of: {', '.join(GRAPH_OPTIMIZATION_LEVELS)}"
+        )
+    if not settings["intra_op_threads"]:
+        settings["intra_op_threads"] = os.cpu_count() or 1
+    return settings
+
+
+def model_path(model_dir, profile: dict) -> Path:
+    """Model file of a resolved profile"""
+    return Path(model_dir) / MODEL_FILES[profile["name"]]
+
+
+def create_session(model_file, profile: dict):
+    """ONNX Runtime CPU session configured by a resolved profile"""
+    import onnxruntime as rt
+
+    levels = {
+        "disabled": rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": rt.GraphOptimizationLevel.ORT_ENABLE_ALL
+    }
+
+    options = rt.SessionOptions()
+    options.intra_op_num_threads = profile["intra_op_threads"]
+    options.inter_op_num_threads = profile["inter_op_threads"]
+    options.execution_mode = rt.ExecutionMode.ORT_SEQUENTIAL
+    options.graph_optimization_level = levels[profile["graph_optimization"]]
+
+    return rt.InferenceSession(str(model_file), sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def quantize(model_dir=None, force=False) -> Path:
+    """
+    Write the int8 model next to the fp32 one (dynamic quantization)
+
+    Only MatMul/Gemm weights are quantized; activations are quantized on the
+    fly at inference time, so no calibration data is needed.
+
+    Returns:
+        Path: The int8 model file
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model_dir = Path(model_dir or Path(__file__).parent)
+    source = model_dir / MODEL_FILES["fp32"]
+    target = model_dir / MODEL_FILES["int8"]
+
+    if not source.exists():
+        raise FileNotFoundError(f"Kokoro model not found: {source}")
+    if target.exists() and not force:
+        print(f"[InferenceProfiles] {target.name} already exists (use --force to rebuild)")
+        return target
+
+    quantize_dynamic(
+        str(source),
+        str(target),
+        weight_type=QuantType.QInt8,
+        op_types_to_quantize=["MatMul", "Gemm"]
+    )
+    print(f"[InferenceProfiles] {source.name} ({source.stat().st_size / 1e6:.0f} MB) -> "
+          f"{target.name} ({target.stat().st_size / 1e6:.0f} MB)")
+    return target
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="KokoroTTS inference profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    quantize_cmd = sub.add_parser("quantize", help="Create the int8 model from the fp32 one")
+    quantize_cmd.add_argument("--model-dir", help="Folder with kokoro-v1.0.onnx (default: this folder)")
+    quantize_cmd.add_argument("--force", action="store_true", help="Overwrite an existing int8 model")
+    sub.add_parser("list", help="Show profile settings on this machine")
+    args = parser.parse_args()
+
+    if args.command == "quantize":
+        quantize(args.model_dir, force=args.force)
+    else:
+        for name in PROFILES:
+            print(f"{name}: {resolve_profile(name)}")
@@ -0,0 +1,136 @@
+"""
+Phoneme (G2P) Cache for KokoroTTS
+Memoizes text-to-phoneme conversion so repeated lecture vocabulary is only
+phonemized once
+
+Only whole sentences are cached, keyed on their exact text (case included).
+A word's phonemes depend on its sentence ("US" vs "us", "the" before a
+vowel, stress of "is"), so phonemes are never assembled from words seen in
+other sentences; a new sentence always goes through G2P once.
+
+The cache is LRU-bounded and can be persisted to a JSON file. Files from
+older versions, which could hold word-assembled sentences, are ignored.
+
+Usage:
+    cache = PhonemeCache(kokoro.tokenizer.phonemize, path="phonemes.json")
+    phonemes = cache.phonemize("As you can see on the board.", "en-us")
+    cache.save()
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+FORMAT_VERSION = 2
+
+
+class _LRU:
+    """Minimal thread-unsafe LRU map; PhonemeCache holds the lock"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.data = OrderedDict()
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+
+    def __len__(self):
+        return len(self.data)
+
+
+class PhonemeCache:
+    """
+    LRU sentence cache in front of a phonemize(text, lang) function
+    """
+
+    def __init__(self, phonemize, max_sentences=4096, path=None):
+        """
+        Args:
+            phonemize: G2P function, e.g. kokoro.tokenizer.phonemize
+            max_sentences: Sentence cache capacity
+            path: Optional JSON file to load from and save() to
+        """
+        self._phonemize = phonemize
+        self.sentences = _LRU(max_sentences)
+        self.path = Path(path) if path else None
+        self.lock = threading.Lock()
+        self.stats = {
+            "sentence_hits": 0,
+            "misses": 0,
+            "g2p_seconds": 0.0,
+            "lookup_seconds": 0.0
+        }
+
+        if self.path and self.path.exists():
+            self.load(self.path)
+
+    def phonemize(self, text, lang="en-us"):
+        """Phonemes for text, phonemizing only sentences not seen before"""
+        start = time.perf_counter()
+        text = " ".join(text.split())
+        result = " ".join(
+            self._sentence(sentence, lang)
+            for sentence in SENTENCE_END.split(text)
+            if sentence
+        )
+        with self.lock:
+            self.stats["lookup_seconds"] += time.perf_counter() - start
+        return result
+
+    def _sentence(self, sentence, lang):
+        key = f"{lang}\t{sentence}"
+
+        with self.lock:
+            cached = self.sentences.get(key)
+            if cached is not None:
+                self.stats["sentence_hits"] += 1
+                return cached
+
+        # G2P outside the lock so other threads can keep hitting the cache
+        g2p_start = time.perf_counter()
+        phonemes = self._phonemize(sentence, lang)
+        g2p_seconds = time.perf_counter() - g2p_start
+
+        with self.lock:
+            self.stats["misses"] += 1
+            self.stats["g2p_seconds"] += g2p_seconds
+            self.sentences.put(key, phonemes)
+        return phonemes
+
+    def save(self, path=None):
+        """Persist the cache as JSON (atomic replace)"""
+        path = Path(path or self.path)
+        with self.lock:
+            payload = {"version": FORMAT_VERSION, "sentences": dict(self.sentences.data)}
+        tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Load a cache saved by save(); older formats are skipped"""
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != FORMAT_VERSION:
+            return
+        with self.lock:
+            for key, value in payload.get("sentences", {}).items():
+                self.sentences.put(key, value)
+
+    def clear(self):
+        with self.lock:
+            self.sentences.data.clear()
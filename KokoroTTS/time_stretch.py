@@ -0,0 +1,131 @@
+"""
+Pitch-Preserving Time-Stretch for KokoroTTS
+WSOLA (waveform similarity overlap-add) on float32 NumPy buffers
+
+Changes playback speed of already synthesized speech without changing its
+pitch, so speed variants of a lecture (0.8x, 1.25x, ...) come from the
+stored PCM instead of another pass through the ONNX model.
+
+Frames of FRAME_MS are read from the input every `speed * hop` samples and
+overlap-added every `hop` samples. Each frame is shifted by up to
+TOLERANCE_MS so that it lines up with the natural continuation of the
+previous frame (the shift with the highest cross-correlation), which keeps
+pitch periods intact across frame boundaries.
+
+The shift search runs on a decimated signal with one matrix-vector product
+per frame and is then refined at full rate; windowing and overlap-add are
+done for all frames at once.
+
+Usage:
+    slower = wsola(samples, 0.8, sample_rate)   # 0.8x: 25% longer
+    stretch_file("audio1.wav", "audio1@1.25x.wav", 1.25)
+"""
+
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from audio_processing import to_pcm16
+
+FRAME_MS = 40       # Analysis frame; a few pitch periods of speech
+TOLERANCE_MS = 10   # Max shift of a frame to find the best waveform match
+DECIMATION = 4      # Coarse search resolution (samples)
+
+
+def _best_shift(padded: np.ndarray, template: np.ndarray, center: int, tolerance: int) -> int:
+    """Shift in [-tolerance, tolerance] maximizing correlation with template at center"""
+    length = len(template)
+    region = padded[center - tolerance:center + tolerance + length]
+
+    # Coarse: every DECIMATION-th lag and sample
+    coarse = np.lib.stride_tricks.sliding_window_view(region, length)[::DECIMATION, ::DECIMATION]
+    best = int(np.argmax(coarse @ template[::DECIMATION])) * DECIMATION
+
+    # Fine: full resolution around the coarse winner
+    lo = max(0, best - DECIMATION + 1)
+    hi = min(2 * tolerance, best + DECIMATION - 1)
+    fine = np.lib.stride_tricks.sliding_window_view(region[lo:hi + length], length)
+    return lo + int(np.argmax(fine @ template)) - tolerance
+
+
+def wsola(samples: np.ndarray, speed: float, sample_rate: int = 24000,
+          frame_ms: int = FRAME_MS, tolerance_ms: int = TOLERANCE_MS) -> np.ndarray:
+    """
+    Time-stretch speech by `speed` (>1 faster/shorter, <1 slower/longer)
+
+    Args:
+        samples: Mono float32 samples
+        speed: Playback speed factor
+        sample_rate: Sample rate of samples
+        frame_ms: Frame length
+        tolerance_ms: Max frame shift for waveform matching
+
+    Returns:
+        New float32 array of about len(samples) / speed samples
+    """
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    samples = np.asarray(samples, dtype=np.float32)
+    if speed == 1.0 or len(samples) == 0:
+        return samples.copy()
+
+    length = 2 * (sample_rate * frame_ms // 2000)     # Even frame length
+    hop = length // 2                                  # Synthesis hop (50% overlap)
+    tolerance = sample_rate * tolerance_ms // 1000
+    out_len = int(round(len(samples) / speed))
+    n_frames = out_len // hop + 2
+
+    # Zero padding: frames may start up to hop + tolerance before 0 and run past the end
+    pad = tolerance + length
+    padded = np.zeros(len(samples) + 2 * pad + int(n_frames * hop * speed), dtype=np.float32)
+    padded[pad:pad + len(samples)] = samples
+
+    # Frame k is centered on input sample k * hop * speed
+    nominal = pad - hop + np.round(np.arange(n_frames) * hop * speed).astype(np.int64)
+    starts = nominal.copy()
+    for k in range(1, n_frames):
+        template = padded[starts[k - 1] + hop:starts[k - 1] + hop + length]
+        if not template.any():  # Silence or past the end: nothing to align with
+            continue
+        starts[k] = nominal[k] + _best_shift(padded, template, nominal[k], tolerance)
+
+    # Window every frame at once, then overlap-add even and odd frames:
+    # frames of the same parity tile the output without overlapping
+    window = np.hanning(length + 1)[:length].astype(np.float32)  # Periodic Hann sums to 1 at 50%
+    frames = padded[starts[:, None] + np.arange(length)] * window
+    out = np.zeros((n_frames + 2) * hop, dtype=np.float32)
+    even, odd = frames[0::2].ravel(), frames[1::2].ravel()
+    out[:len(even)] += even
+    out[hop:hop + len(odd)] += odd
+
+    # Output sample k * hop is the center of frame k: drop frame 0's leading half
+    return out[hop:hop + out_len]
+
+
+def read_wav(path) -> tuple[np.ndarray, int]:
+    """Mono 16-bit WAV -> (float32 samples, sample_rate)"""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"Expected mono 16-bit PCM: {path}")
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+        return pcm.astype(np.float32) / 32768.0, wav.getframerate()
+
+
+def stretch_file(source, target, speed: float) -> Path:
+    """
+    Write a speed variant of a mono 16-bit WAV
+
+    Returns:
+        Path: target
+    """
+    samples, sample_rate = read_wav(source)
+    stretched = wsola(samples, speed, sample_rate)
+
+    target = Path(target)
+    with wave.open(str(target), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(to_pcm16(stretched))
+    return target
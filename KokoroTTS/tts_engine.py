@@ -21,14 +21,18 @@ AVAILABLE VOICES:
 
 from pathlib import Path
 import numpy as np
-from scipy.io import wavfile
-import sounddevice as sd
 import threading
 import re
+import wave
 import unicodedata
 import hashlib
 from concurrent.futures import ThreadPoolExecutor
 
+from audio_processing import AudioPostProcessor, to_pcm16
+from inference_profiles import create_session, model_path, resolve_profile
+from phoneme_cache import PhonemeCache
+from voice_store import STORE_DIR, VoiceStore
+
 
 class KokoroTTS:
     """
@@ -41,45 +45,76 @@ class KokoroTTS:
         tts.save("Text to save", "output.wav")
     """
     
-    def __init__(self, model_dir=None):
+    def __init__(self, model_dir=None, postprocessor=None, kokoro=None,
+                 phoneme_cache=True, phoneme_cache_path=None, profile=None):
         """
         Initialize Kokoro TTS
         
         Args:
             model_dir: Directory containing kokoro-v1.0.onnx and voices-v1.0.bin
+                      (or a voices/ store from voice_store.py, used when present)
                       Defaults to this file's directory
+            postprocessor: AudioPostProcessor applied before saving/playing
+                      Defaults to trimming + loudness normalization at 24 kHz
+            kokoro: Pre-built Kokoro-compatible engine (skips loading the model files)
+            phoneme_cache: Memoize text-to-phoneme conversion across calls
+            phoneme_cache_path: JSON file to load the phoneme cache from / save it to
+            profile: Inference profile name ("fp32", "int8") or settings dict
+                      (see inference_profiles.py). Default: fp32
         """
-        from kokoro_onnx import Kokoro
-        
         if model_dir is None:
             model_dir = Path(__file__).parent
         
         self.model_dir = Path(model_dir)
-        self.model_path = self.model_dir / "kokoro-v1.0.onnx"
+        self.profile = resolve_profile(profile)
+        self.model_path = model_path(self.model_dir, self.profile)
         self.voices_path = self.model_dir / "voices-v1.0.bin"
-        
-        # Check if models exist
-        if not self.model_path.exists():
-            raise FileNotFoundError(
-                f"Kokoro model not found: {self.model_path}\n"
-                "Download from: https://huggingface.co/hexgrad/Kokoro-82M-v1.0-ONNX"
-            )
-        if not self.voices_path.exists():
-            raise FileNotFoundError(
-                f"Voices file not found: {self.voices_path}\n"
-                "Download from: https://huggingface.co/hexgrad/Kokoro-82M-v1.0-ONNX"
-            )
-        
-        # Initialize Kokoro
-        self.kokoro = Kokoro(str(self.model_path), str(self.voices_path))
+        voice_store = None
+        
+        if kokoro is None:
+            from kokoro_onnx import Kokoro
+            
+            # Check if models exist
+            if not self.model_path.exists():
+                hint = ("Create it with: python inference_profiles.py quantize"
+                        if self.profile["name"] != "fp32" else
+                        "Download from: https://huggingface.co/hexgrad/Kokoro-82M-v1.0-ONNX")
+                raise FileNotFoundError(f"Kokoro model not found: {self.model_path}\n{hint}")
+            
+            # Prefer the memory-mapped store: voices are paged in on first use
+            # and shared between worker processes
+            if VoiceStore.exists(self.model_dir / STORE_DIR):
+                voice_store = VoiceStore(self.model_dir / STORE_DIR)
+                self.voices_path = voice_store.index_path
+            elif not self.voices_path.exists():
+                raise FileNotFoundError(
+                    f"Voices file not found: {self.voices_path}\n"
+                    "Download from: https://huggingface.co/hexgrad/Kokoro-82M-v1.0-ONNX"
+                )
+            
+            # Initialize Kokoro on a session tuned by the profile
+            session = create_session(self.model_path, self.profile)
+            kokoro = Kokoro.from_session(session, str(self.voices_path))
+            if voice_store is not None:
+                kokoro.voices = voice_store
+        
+        self.kokoro = kokoro
         self.sample_rate = 24000
+        self.postprocessor = postprocessor or AudioPostProcessor()
+        
+        # Phonemize through a shared LRU cache when the engine exposes its G2P
+        self.phonemes = None
+        tokenizer = getattr(kokoro, "tokenizer", None)
+        if phoneme_cache and tokenizer is not None:
+            self.phonemes = PhonemeCache(tokenizer.phonemize, path=phoneme_cache_path)
         
         # Cache and threading
         self.cache = {}
         self.worker_pool = ThreadPoolExecutor(max_workers=2)
         self.synthesis_lock = threading.Lock()
         
-        print(f"[KokoroTTS] Initialized successfully")
+        print(f"[KokoroTTS] Initialized successfully ({self.profile['name']}, "
+              f"{self.profile['intra_op_threads']} threads)")
     
     def get_voices(self):
         """Get available voices"""
@@ -101,6 +136,17 @@ class KokoroTTS:
         Returns:
             tuple: (audio_samples, sample_rate)
         """
+        if self.phonemes is not None:
+            phonemes = self.phonemes.phonemize(text, lang)
+            samples, sr = self.kokoro.create(
+                phonemes,
+                voice=voice,
+                speed=speed,
+                lang=lang,
+                is_phonemes=True
+            )
+            return samples, sr
+        
         samples, sr = self.kokoro.create(
             text,
             voice=voice,
@@ -115,39 +161,72 @@ class KokoroTTS:
             sample_rate = self.sample_rate
         
         # Normalize if needed
-        if np.max(np.abs(samples)) > 1.0:
-            samples = samples / np.max(np.abs(samples))
+        peak = np.max(np.abs(samples))
+        if peak > 1.0:
+            samples = samples / peak
+        
+        # Imported here so headless servers never probe for audio devices
+        import sounddevice as sd
         
         sd.play(samples, sample_rate)
         duration = len(samples) / sample_rate
         sd.wait()
         return duration
     
-    def save(self, text, output_path, voice="af_sky", speed=1.0, lang="en-us"):
+    def save(self, text, output_path, voice="af_sky", speed=1.0, lang="en-us", chunk_size=300,
+             postprocessor=None, timing=None):
         """
         Synthesize and save to WAV file
         
+        Text is synthesized chunk by chunk (see _split_text) and each chunk's
+        16-bit PCM is appended straight to the file, so peak memory depends on
+        chunk_size rather than on the length of the text. The WAV header is
+        patched with the final length when the file is closed.
+        
         Args:
             text: Text to synthesize
             output_path: Output file path
             voice: Voice ID
             speed: Speech speed
             lang: Language code
+            chunk_size: Max characters synthesized at once (default: 300)
+            postprocessor: Override self.postprocessor for this file
+            timing: Optional list; receives {"text", "start", "end"} per chunk,
+                    with start/end in seconds of the written file
         
         Returns:
             str: Saved file path
         """
-        samples, sr = self.synthesize(text, voice, speed, lang)
-        
+        postprocessor = postprocessor or self.postprocessor
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Normalize and convert to 16-bit PCM
-        if np.max(np.abs(samples)) > 1.0:
-            samples = samples / np.max(np.abs(samples))
-        samples_int16 = np.int16(samples * 32767)
+        chunks = self._split_text(text, max_chars=chunk_size)
+        
+        with wave.open(str(output_path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(postprocessor.target_sample_rate or self.sample_rate)
+            gap = b""
+            position = 0  # Samples written so far
+            
+            for i, chunk in enumerate(chunks):
+                samples, sr = self.synthesize(chunk, voice, speed, lang)
+                
+                # Trim, normalize loudness (in place) and convert to 16-bit PCM
+                samples, sr = postprocessor.process(samples, sr)
+                if i == 0:
+                    wav.setframerate(sr)
+                    gap = bytes(2 * (sr * postprocessor.sentence_pause_ms // 1000))
+                else:
+                    wav.writeframes(gap)
+                    position += len(gap) // 2
+                
+                wav.writeframes(to_pcm16(samples))
+                if timing is not None:
+                    timing.append({"text": chunk, "start": position / sr, "end": (position + len(samples)) / sr})
+                position += len(samples)
         
-        wavfile.write(output_path, sr, samples_int16)
         return str(output_path)
     
     def speak(self, text, voice="af_sky", speed=1.0, lang="en-us", use_cache=True):
@@ -173,6 +252,7 @@ class KokoroTTS:
         
         # Synthesize
         samples, sr = self.synthesize(text, voice, speed, lang)
+        samples, sr = self.postprocessor.process(samples, sr)
         
         # Store in cache
         if use_cache:
@@ -260,12 +340,21 @@ class KokoroTTS:
         """Clear the audio cache"""
         self.cache.clear()
         print("[KokoroTTS] Cache cleared")
+    
+    def save_phoneme_cache(self, path=None):
+        """Persist the phoneme cache (to phoneme_cache_path by default)"""
+        if self.phonemes is not None and (path or self.phonemes.path):
+            self.phonemes.save(path)
+    
+    def g2p_stats(self):
+        """Phoneme cache hit counts and time spent in G2P"""
+        return dict(self.phonemes.stats) if self.phonemes is not None else {}
 
 
 # Quick access function
-def create_tts(model_dir=None):
+def create_tts(model_dir=None, profile=None):
     """Create a KokoroTTS instance"""
-    return KokoroTTS(model_dir)
+    return KokoroTTS(model_dir, profile=profile)
 
 
 # Example usage when run directly
@@ -0,0 +1,168 @@
+"""
+Memory-Mapped Voice Store for KokoroTTS
+Keeps each voice style as its own .npy file, opened with mmap_mode='r'
+
+voices-v1.0.bin is an .npz archive of every voice; kokoro-onnx copies a voice
+out of it into private memory of each process on every lookup. After a one-time
+conversion into voices/<name>.npy, a voice is memory-mapped on first use:
+only the voices a process actually speaks with are paged in, and the pages
+are shared by every worker process through the OS page cache.
+
+Blended voices (weighted averages of styles) are precomputed into the same
+folder and used by name like any other voice.
+
+Setup (once, next to voices-v1.0.bin):
+    python voice_store.py convert
+    python voice_store.py blend af_calm af_sarah:0.6 af_nicole:0.4
+
+Layout:
+    voices/index.npz      Voice names; handed to kokoro-onnx as its voices file
+    voices/<name>.npy     float32 style table, shape (510, 1, 256)
+"""
+
+import re
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+STORE_DIR = "voices"
+INDEX_FILE = "index.npz"
+VOICE_NAME = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+class VoiceStore(Mapping):
+    """
+    Read-only mapping of voice name -> memory-mapped style table
+
+    Drop-in for the `voices` attribute of kokoro_onnx.Kokoro.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.lock = threading.Lock()
+        self.mapped = {}
+        with np.load(self.directory / INDEX_FILE) as index:
+            self.names = [str(n) for n in index["names"]]
+        self.known = set(self.names)
+
+    @classmethod
+    def exists(cls, directory) -> bool:
+        return (Path(directory) / INDEX_FILE).exists()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_FILE
+
+    def __getitem__(self, name):
+        voice = self.mapped.get(name)
+        if voice is not None:
+            return voice
+        if name not in self.known:
+            raise KeyError(name)
+        with self.lock:
+            voice = self.mapped.get(name)
+            if voice is None:
+                voice = np.load(self.directory / f"{name}.npy", mmap_mode="r")
+                self.mapped[name] = voice
+        return voice
+
+    def __contains__(self, name):
+        return name in self.known
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _write_index(directory: Path):
+    names = sorted(p.stem for p in directory.glob("*.npy"))
+    np.savez(directory / INDEX_FILE, names=np.array(names))
+    return names
+
+
+def convert(voices_bin, directory=None, voices=None) -> Path:
+    """
+    Split voices-v1.0.bin into one .npy file per voice
+
+    Args:
+        voices_bin: Path to voices-v1.0.bin
+        directory: Output folder (default: voices/ next to the .bin)
+        voices: Only convert these names (default: all)
+
+    Returns:
+        Path: The store folder
+    """
+    voices_bin = Path(voices_bin)
+    directory = Path(directory) if directory else voices_bin.parent / STORE_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with np.load(voices_bin) as archive:
+        names = voices or list(archive.keys())
+        for name in names:
+            style = np.ascontiguousarray(archive[name], dtype=np.float32)
+            np.save(directory / f"{name}.npy", style)
+
+    total = _write_index(directory)
+    print(f"[VoiceStore] Converted {len(names)} voices into {directory} ({len(total)} in store)")
+    return directory
+
+
+def blend(directory, name: str, weights: dict) -> Path:
+    """
+    Precompute a blended voice as the weighted average of existing styles
+
+    Args:
+        directory: Store folder
+        name: New voice name (lowercase letters, digits, underscores)
+        weights: {voice name: weight}; weights are normalized to sum to 1
+
+    Returns:
+        Path: The new .npy file
+    """
+    if not VOICE_NAME.match(name):
+        raise ValueError(f"Invalid voice name: {name}")
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("Blend needs at least one voice with a positive weight")
+
+    directory = Path(directory)
+    store = VoiceStore(directory)
+    total = sum(weights.values())
+    mixed = sum(store[voice].astype(np.float32) * (weight / total) for voice, weight in weights.items())
+
+    path = directory / f"{name}.npy"
+    np.save(path, np.ascontiguousarray(mixed, dtype=np.float32))
+    _write_index(directory)
+    print(f"[VoiceStore] Blended {name} = " + " + ".join(f"{w / total:.2f}*{v}" for v, w in weights.items()))
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    here = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Memory-mapped voice store for KokoroTTS")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert_cmd = sub.add_parser("convert", help="Split voices-v1.0.bin into voices/<name>.npy")
+    convert_cmd.add_argument("--bin", default=str(here / "voices-v1.0.bin"), help="Path to voices-v1.0.bin")
+    convert_cmd.add_argument("--dir", default=None, help="Store folder (default: voices/ next to the .bin)")
+    convert_cmd.add_argument("--voices", default=None, help="Comma-separated voices (default: all)")
+
+    blend_cmd = sub.add_parser("blend", help="Precompute a blended voice")
+    blend_cmd.add_argument("name", help="New voice name, e.g. af_calm")
+    blend_cmd.add_argument("parts", nargs="+", help="voice:weight pairs, e.g. af_sarah:0.6 af_nicole:0.4")
+    blend_cmd.add_argument("--dir", default=str(here / STORE_DIR), help="Store folder")
+
+    args = parser.parse_args()
+    if args.command == "convert":
+        convert(args.bin, args.dir, args.voices.split(",") if args.voices else None)
+    else:
+        parts = {}
+        for part in args.parts:
+            voice, _, weight = part.partition(":")
+            parts[voice] = float(weight or 1)
+        blend(args.dir, args.name, parts)
@@ -0,0 +1,516 @@
+"""
+Class Analytics for AetherLearn
+Rollup tables that give teachers per-class, per-lecture, per-quiz and
+per-student aggregates without scanning raw history
+
+The submit routes apply small deltas to the rollups inside their own
+transaction (INSERT ... SELECT ... ON DUPLICATE KEY UPDATE, keyed on the
+student's class), so reads only touch rows bounded by class size, never by
+the number of attempts. rebuild() recomputes everything from the raw tables
+and is run periodically to fold in deletions or repair drift:
+
+    python analytics.py --rebuild
+
+Distribution statistics over a class are computed with NumPy.
+"""
+
+from datetime import datetime
+
+PASS_PERCENTAGE = 70
+
+# At-risk thresholds
+AT_RISK_QUIZ_PERCENTAGE = 50
+AT_RISK_COMPLETION_RATE = 0.4
+AT_RISK_INACTIVE_DAYS = 7
+
+DISTRIBUTION_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+# ==================== INCREMENTAL UPDATES ====================
+
+def record_student_registered(cursor, user_id: int, class_id: str):
+    """Add a new student to their class rollups (so inactive students are visible too)"""
+    cursor.execute("""
+        INSERT IGNORE INTO analytics_student (user_id, class_id) VALUES (%s, %s)
+    """, (user_id, class_id))
+    cursor.execute("""
+        INSERT INTO analytics_class (class_id, students) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE students = students + 1
+    """, (class_id,))
+
+
+def record_students_registered(cursor, class_id: str, roll_numbers: list[str]):
+    """Bulk version of record_student_registered for roster imports"""
+    placeholders = ', '.join(['%s'] * len(roll_numbers))
+    cursor.execute(f"""
+        INSERT IGNORE INTO analytics_student (user_id, class_id)
+        SELECT id, class_id FROM users WHERE roll_number IN ({placeholders})
+    """, tuple(roll_numbers))
+    cursor.execute("""
+        INSERT INTO analytics_class (class_id, students) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE students = students + VALUES(students)
+    """, (class_id, len(roll_numbers)))
+
+
+def record_lecture_progress(cursor, user_id: int, lecture_id: str, previous: dict | None,
+                            progress_percent: int, completed: bool):
+    """
+    Apply one lecture progress update
+
+    Args:
+        previous: The student's lecture_progress row before the update
+            (progress_percent, completed) or None if this is the first
+    """
+    old_progress = previous['progress_percent'] if previous else 0
+    old_completed = bool(previous['completed']) if previous else False
+
+    started = 0 if previous else 1
+    newly_completed = 1 if completed and not old_completed else 0
+    progress_delta = max(progress_percent, old_progress) - old_progress
+
+    if not (started or newly_completed or progress_delta):
+        cursor.execute("""
+            UPDATE analytics_student SET last_activity_at = NOW() WHERE user_id = %s
+        """, (user_id,))
+        return
+
+    cursor.execute("""
+        INSERT INTO analytics_student (user_id, class_id, lectures_started, lectures_completed, progress_sum, last_activity_at)
+        SELECT id, class_id, %s, %s, %s, NOW() FROM users WHERE id = %s
+        ON DUPLICATE KEY UPDATE
+            lectures_started = lectures_started + VALUES(lectures_started),
+            lectures_completed = lectures_completed + VALUES(lectures_completed),
+            progress_sum = progress_sum + VALUES(progress_sum),
+            last_activity_at = NOW()
+    """, (started, newly_completed, progress_delta, user_id))
+
+    cursor.execute("""
+        INSERT INTO analytics_lecture (class_id, lecture_id, students_started, students_completed, progress_sum)
+        SELECT class_id, %s, %s, %s, %s FROM users WHERE id = %s AND class_id IS NOT NULL
+        ON DUPLICATE KEY UPDATE
+            students_started = students_started + VALUES(students_started),
+            students_completed = students_completed + VALUES(students_completed),
+            progress_sum = progress_sum + VALUES(progress_sum)
+    """, (lecture_id, started, newly_completed, progress_delta, user_id))
+
+    if newly_completed:
+        cursor.execute("""
+            INSERT INTO analytics_class (class_id, lecture_completions)
+            SELECT class_id, 1 FROM users WHERE id = %s AND class_id IS NOT NULL
+            ON DUPLICATE KEY UPDATE lecture_completions = lecture_completions + 1
+        """, (user_id,))
+
+
+def record_quiz_attempt(cursor, user_id: int, quiz_id: str, percentage: float,
+                        first_attempt: bool, first_pass: bool):
+    """
+    Apply one quiz attempt
+
+    Must run after progress_service.record_quiz_summary() in the same
+    transaction: the improvement of the student's best score is read from
+    quiz_summary.last_best_gain.
+
+    Args:
+        first_attempt: This is the student's first attempt at the quiz
+        first_pass: This attempt is the student's first passing one
+    """
+    first_attempt = 1 if first_attempt else 0
+    passed = 1 if first_pass else 0
+
+    cursor.execute("""
+        INSERT INTO analytics_student (user_id, class_id, quiz_attempts, quizzes_attempted, quizzes_passed,
+                                       quiz_percentage_sum, best_percentage_sum, last_activity_at)
+        SELECT u.id, u.class_id, 1, %s, %s, %s, qs.last_best_gain, NOW()
+        FROM users u JOIN quiz_summary qs ON qs.user_id = u.id AND qs.quiz_id = %s
+        WHERE u.id = %s
+        ON DUPLICATE KEY UPDATE
+            quiz_attempts = quiz_attempts + 1,
+            quizzes_attempted = quizzes_attempted + VALUES(quizzes_attempted),
+            quizzes_passed = quizzes_passed + VALUES(quizzes_passed),
+            quiz_percentage_sum = quiz_percentage_sum + VALUES(quiz_percentage_sum),
+            best_percentage_sum = best_percentage_sum + VALUES(best_percentage_sum),
+            last_activity_at = NOW()
+    """, (first_attempt, passed, percentage, quiz_id, user_id))
+
+    cursor.execute("""
+        INSERT INTO analytics_quiz (class_id, quiz_id, attempts, students_attempted, students_passed,
+                                    percentage_sum, percentage_sq_sum, best_percentage_sum)
+        SELECT u.class_id, qs.quiz_id, 1, %s, %s, %s, %s, qs.last_best_gain
+        FROM users u JOIN quiz_summary qs ON qs.user_id = u.id AND qs.quiz_id = %s
+        WHERE u.id = %s AND u.class_id IS NOT NULL
+        ON DUPLICATE KEY UPDATE
+            attempts = attempts + 1,
+            students_attempted = students_attempted + VALUES(students_attempted),
+            students_passed = students_passed + VALUES(students_passed),
+            percentage_sum = percentage_sum + VALUES(percentage_sum),
+            percentage_sq_sum = percentage_sq_sum + VALUES(percentage_sq_sum),
+            best_percentage_sum = best_percentage_sum + VALUES(best_percentage_sum)
+    """, (first_attempt, passed, percentage, percentage * percentage, quiz_id, user_id))
+
+    cursor.execute("""
+        INSERT INTO analytics_class (class_id, quiz_attempts, quiz_percentage_sum, quiz_passes)
+        SELECT class_id, 1, %s, %s FROM users WHERE id = %s AND class_id IS NOT NULL
+        ON DUPLICATE KEY UPDATE
+            quiz_attempts = quiz_attempts + 1,
+            quiz_percentage_sum = quiz_percentage_sum + VALUES(quiz_percentage_sum),
+            quiz_passes = quiz_passes + VALUES(quiz_passes)
+    """, (percentage, passed, user_id))
+
+
+def record_test_submission(cursor, user_id: int, percentage: float | None):
+    """Apply one test submission"""
+    percentage = percentage or 0
+
+    cursor.execute("""
+        INSERT INTO analytics_student (user_id, class_id, tests_taken, test_percentage_sum, last_activity_at)
+        SELECT id, class_id, 1, %s, NOW() FROM users WHERE id = %s
+        ON DUPLICATE KEY UPDATE
+            tests_taken = tests_taken + 1,
+            test_percentage_sum = test_percentage_sum + VALUES(test_percentage_sum),
+            last_activity_at = NOW()
+    """, (percentage, user_id))
+
+    cursor.execute("""
+        INSERT INTO analytics_class (class_id, test_submissions, test_percentage_sum)
+        SELECT class_id, 1, %s FROM users WHERE id = %s AND class_id IS NOT NULL
+        ON DUPLICATE KEY UPDATE
+            test_submissions = test_submissions + 1,
+            test_percentage_sum = test_percentage_sum + VALUES(test_percentage_sum)
+    """, (percentage, user_id))
+
+
+def record_test_grades(cursor, grades: list[tuple[int, int, float]]):
+    """
+    Apply a batch of server-graded tests in two statements
+
+    Args:
+        grades: (user_id, newly graded tests, percentage change) per student;
+            a regrade counts 0 tests and only the change of its percentage
+    """
+    params = [(tests, delta, user_id) for user_id, tests, delta in grades]
+    cursor.executemany("""
+        INSERT INTO analytics_student (user_id, class_id, tests_taken, test_percentage_sum, last_activity_at)
+        SELECT id, class_id, %s, %s, NOW() FROM users WHERE id = %s
+        ON DUPLICATE KEY UPDATE
+            tests_taken = tests_taken + VALUES(tests_taken),
+            test_percentage_sum = test_percentage_sum + VALUES(test_percentage_sum),
+            last_activity_at = NOW()
+    """, params)
+
+    cursor.executemany("""
+        INSERT INTO analytics_class (class_id, test_submissions, test_percentage_sum)
+        SELECT class_id, %s, %s FROM users WHERE id = %s AND class_id IS NOT NULL
+        ON DUPLICATE KEY UPDATE
+            test_submissions = test_submissions + VALUES(test_submissions),
+            test_percentage_sum = test_percentage_sum + VALUES(test_percentage_sum)
+    """, params)
+
+
+# ==================== COMPACTION ====================
+
+REBUILD_STATEMENTS = (
+    "DELETE FROM analytics_student",
+    "DELETE FROM analytics_lecture",
+    "DELETE FROM analytics_quiz",
+    "DELETE FROM analytics_class",
+    """
+    INSERT INTO analytics_student (user_id, class_id, lectures_started, lectures_completed, progress_sum,
+                                   quiz_attempts, quizzes_attempted, quizzes_passed, quiz_percentage_sum,
+                                   best_percentage_sum, tests_taken, test_percentage_sum, last_activity_at)
+    SELECT u.id, u.class_id,
+           COALESCE(lp.started, 0), COALESCE(lp.completed, 0), COALESCE(lp.progress_sum, 0),
+           COALESCE(q.attempts, 0), COALESCE(q.quizzes, 0), COALESCE(q.passed, 0), COALESCE(q.percentage_sum, 0),
+           COALESCE(q.best_sum, 0), COALESCE(t.tests, 0), COALESCE(t.percentage_sum, 0),
+           GREATEST(COALESCE(lp.last_at, q.last_at, t.last_at),
+                    COALESCE(q.last_at, t.last_at, lp.last_at),
+                    COALESCE(t.last_at, lp.last_at, q.last_at))
+    FROM users u
+    LEFT JOIN (
+        SELECT user_id, COUNT(*) AS started, SUM(completed) AS completed,
+               SUM(progress_percent) AS progress_sum, MAX(updated_at) AS last_at
+        FROM lecture_progress GROUP BY user_id
+    ) lp ON lp.user_id = u.id
+    LEFT JOIN (
+        SELECT user_id, SUM(attempts) AS attempts, COUNT(*) AS quizzes, SUM(best >= %(pass)s) AS passed,
+               SUM(percentage_sum) AS percentage_sum, SUM(best) AS best_sum, MAX(last_at) AS last_at
+        FROM (
+            SELECT user_id, quiz_id, COUNT(*) AS attempts, MAX(percentage) AS best,
+                   SUM(percentage) AS percentage_sum, MAX(completed_at) AS last_at
+            FROM quiz_scores GROUP BY user_id, quiz_id
+        ) per_quiz
+        GROUP BY user_id
+    ) q ON q.user_id = u.id
+    LEFT JOIN (
+        SELECT user_id, COUNT(*) AS tests, SUM(COALESCE(percentage, 0)) AS percentage_sum,
+               MAX(submitted_at) AS last_at
+        FROM test_results WHERE percentage IS NOT NULL GROUP BY user_id
+    ) t ON t.user_id = u.id
+    WHERE u.user_type = 'student'
+    """,
+    """
+    INSERT INTO analytics_lecture (class_id, lecture_id, students_started, students_completed, progress_sum)
+    SELECT u.class_id, lp.lecture_id, COUNT(*), SUM(lp.completed), SUM(lp.progress_percent)
+    FROM lecture_progress lp JOIN users u ON u.id = lp.user_id
+    WHERE u.class_id IS NOT NULL
+    GROUP BY u.class_id, lp.lecture_id
+    """,
+    """
+    INSERT INTO analytics_quiz (class_id, quiz_id, attempts, students_attempted, students_passed,
+                                percentage_sum, percentage_sq_sum, best_percentage_sum)
+    SELECT u.class_id, per_quiz.quiz_id, SUM(per_quiz.attempts), COUNT(*), SUM(per_quiz.best >= %(pass)s),
+           SUM(per_quiz.percentage_sum), SUM(per_quiz.percentage_sq_sum), SUM(per_quiz.best)
+    FROM (
+        SELECT user_id, quiz_id, COUNT(*) AS attempts, MAX(percentage) AS best,
+               SUM(percentage) AS percentage_sum, SUM(percentage * percentage) AS percentage_sq_sum
+        FROM quiz_scores GROUP BY user_id, quiz_id
+    ) per_quiz
+    JOIN users u ON u.id = per_quiz.user_id
+    WHERE u.class_id IS NOT NULL
+    GROUP BY u.class_id, per_quiz.quiz_id
+    """,
+    """
+    INSERT INTO analytics_class (class_id, students, lecture_completions, quiz_attempts, quiz_percentage_sum,
+                                 quiz_passes, test_submissions, test_percentage_sum)
+    SELECT class_id, COUNT(*), SUM(lectures_completed), SUM(quiz_attempts), SUM(quiz_percentage_sum),
+           SUM(quizzes_passed), SUM(tests_taken), SUM(test_percentage_sum)
+    FROM analytics_student
+    WHERE class_id IS NOT NULL
+    GROUP BY class_id
+    """
+)
+
+
+def rebuild(conn):
+    """
+    Recompute every rollup from the raw tables in one transaction
+
+    Submissions that commit while the rebuild runs may be counted twice or
+    not at all, so schedule it for quiet hours.
+    """
+    cursor = conn.cursor()
+    try:
+        for statement in REBUILD_STATEMENTS:
+            if '%(pass)s' in statement:
+                cursor.execute(statement, {'pass': PASS_PERCENTAGE})
+            else:
+                cursor.execute(statement)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# ==================== READS ====================
+
+def _ratio(numerator, denominator, scale=1.0):
+    return round(float(numerator) * scale / denominator, 2) if denominator else None
+
+
+def class_overview(cursor, class_id: str) -> dict:
+    """Headline numbers for one class"""
+    cursor.execute("""
+        SELECT c.students, c.lecture_completions, c.quiz_attempts, c.quiz_percentage_sum, c.quiz_passes,
+               c.test_submissions, c.test_percentage_sum,
+               (SELECT COUNT(*) FROM analytics_lecture WHERE class_id = c.class_id) AS lectures,
+               (SELECT COUNT(*) FROM analytics_quiz WHERE class_id = c.class_id) AS quizzes
+        FROM analytics_class c WHERE c.class_id = %s
+    """, (class_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    (students, lecture_completions, quiz_attempts, quiz_sum, quiz_passes,
+     test_submissions, test_sum, lectures, quizzes) = row
+    return {
+        'classId': class_id,
+        'students': students,
+        'lecturesTracked': lectures,
+        'quizzesTracked': quizzes,
+        'lectureCompletions': lecture_completions,
+        'completionRate': _ratio(lecture_completions, students * lectures, 100),
+        'quizAttempts': quiz_attempts,
+        'averageQuizPercentage': _ratio(quiz_sum, quiz_attempts),
+        'quizPasses': quiz_passes,
+        'testSubmissions': test_submissions,
+        'averageTestPercentage': _ratio(test_sum, test_submissions)
+    }
+
+
+def lecture_breakdown(cursor, class_id: str) -> list[dict]:
+    """Completion and average progress per lecture"""
+    cursor.execute("""
+        SELECT l.lecture_id, l.students_started, l.students_completed, l.progress_sum, c.students
+        FROM analytics_lecture l JOIN analytics_class c ON c.class_id = l.class_id
+        WHERE l.class_id = %s
+        ORDER BY l.lecture_id
+    """, (class_id,))
+    return [
+        {
+            'lectureId': lecture_id,
+            'studentsStarted': started,
+            'studentsCompleted': completed,
+            'completionRate': _ratio(completed, students, 100),
+            'averageProgress': _ratio(progress_sum, started)
+        }
+        for lecture_id, started, completed, progress_sum, students in cursor.fetchall()
+    ]
+
+
+def quiz_breakdown(cursor, class_id: str) -> list[dict]:
+    """Mean, spread and pass rate per quiz"""
+    cursor.execute("""
+        SELECT quiz_id, attempts, students_attempted, students_passed,
+               percentage_sum, percentage_sq_sum, best_percentage_sum
+        FROM analytics_quiz WHERE class_id = %s
+        ORDER BY quiz_id
+    """, (class_id,))
+    quizzes = []
+    for quiz_id, attempts, students, passed, pct_sum, pct_sq_sum, best_sum in cursor.fetchall():
+        mean = float(pct_sum) / attempts if attempts else None
+        variance = max(0.0, float(pct_sq_sum) / attempts - mean * mean) if attempts else None
+        quizzes.append({
+            'quizId': quiz_id,
+            'attempts': attempts,
+            'studentsAttempted': students,
+            'studentsPassed': passed,
+            'passRate': _ratio(passed, students, 100),
+            'averagePercentage': round(mean, 2) if mean is not None else None,
+            'stdDeviation': round(variance ** 0.5, 2) if variance is not None else None,
+            'averageBestPercentage': _ratio(best_sum, students),
+            'attemptsPerStudent': _ratio(attempts, students)
+        })
+    return quizzes
+
+
+def distribution(values) -> dict:
+    """Summary statistics and a 10-bin histogram (0-100) of a NumPy array"""
+    import numpy as np
+
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {'count': 0}
+
+    counts, edges = np.histogram(values, bins=10, range=(0, 100))
+    percentiles = np.percentile(values, DISTRIBUTION_PERCENTILES)
+    return {
+        'count': int(len(values)),
+        'mean': round(float(values.mean()), 2),
+        'std': round(float(values.std()), 2),
+        'min': round(float(values.min()), 2),
+        'max': round(float(values.max()), 2),
+        'percentiles': {f"p{p}": round(float(v), 2) for p, v in zip(DISTRIBUTION_PERCENTILES, percentiles)},
+        'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()}
+    }
+
+
+def student_report(cursor, class_id: str) -> dict:
+    """
+    Per-student metrics, class distributions and at-risk students
+
+    All per-student arithmetic is done on NumPy columns, so cost is a single
+    pass over the class regardless of how much history each student has.
+    """
+    import numpy as np
+
+    cursor.execute("""
+        SELECT s.user_id, u.name, u.roll_number, s.lectures_completed, s.progress_sum,
+               s.quizzes_attempted, s.best_percentage_sum, s.tests_taken, s.test_percentage_sum,
+               s.last_activity_at
+        FROM analytics_student s JOIN users u ON u.id = s.user_id
+        WHERE s.class_id = %s
+        ORDER BY u.name
+    """, (class_id,))
+    rows = cursor.fetchall()
+
+    cursor.execute("SELECT COUNT(*) FROM analytics_lecture WHERE class_id = %s", (class_id,))
+    lectures = cursor.fetchone()[0]
+
+    if not rows:
+        return {'students': [], 'distributions': {}, 'atRisk': []}
+
+    now = datetime.now()
+    columns = np.array([
+        [r[3], r[4], r[5], r[6], r[7], r[8],
+         (now - r[9]).total_seconds() / 86400 if r[9] else np.inf]
+        for r in rows
+    ], dtype=np.float64)
+    (completed, progress_sum, quizzes, best_sum,
+     tests, test_sum, inactive_days) = columns.T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        completion = completed / lectures * 100 if lectures else np.full(len(rows), np.nan)
+        avg_progress = progress_sum / lectures if lectures else np.full(len(rows), np.nan)
+        avg_quiz = np.where(quizzes > 0, best_sum / quizzes, np.nan)
+        avg_test = np.where(tests > 0, test_sum / tests, np.nan)
+
+    low_quiz = avg_quiz < AT_RISK_QUIZ_PERCENTAGE
+    low_completion = completion < AT_RISK_COMPLETION_RATE * 100
+    inactive = inactive_days > AT_RISK_INACTIVE_DAYS
+    at_risk = low_quiz | low_completion | inactive
+
+    def value(array, i):
+        return None if np.isnan(array[i]) else round(float(array[i]), 2)
+
+    students = []
+    for i, row in enumerate(rows):
+        reasons = [
+            reason for reason, flagged in (
+                ('low_quiz_scores', low_quiz[i]),
+                ('low_completion', low_completion[i]),
+                ('inactive', inactive[i])
+            ) if flagged
+        ]
+        students.append({
+            'userId': row[0],
+            'name': row[1],
+            'rollNumber': row[2],
+            'completionRate': value(completion, i),
+            'averageProgress': value(avg_progress, i),
+            'averageBestQuizPercentage': value(avg_quiz, i),
+            'averageTestPercentage': value(avg_test, i),
+            'lastActivity': row[9].isoformat() if row[9] else None,
+            'atRisk': bool(at_risk[i]),
+            'riskReasons': reasons
+        })
+
+    return {
+        'students': students,
+        'distributions': {
+            'completionRate': distribution(completion),
+            'averageBestQuizPercentage': distribution(avg_quiz),
+            'averageTestPercentage': distribution(avg_test)
+        },
+        'atRisk': [s['userId'] for s in students if s['atRisk']]
+    }
+
+
+# ==================== CLI INTERFACE ====================
+
+def main():
+    """CLI for the periodic compaction job"""
+    import argparse
+    from database import get_db_connection
+
+    parser = argparse.ArgumentParser(description="AetherLearn analytics rollups")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all rollups from raw tables")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    try:
+        start = datetime.now()
+        rebuild(conn)
+        print(f"✓ Analytics rollups rebuilt in {(datetime.now() - start).total_seconds():.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
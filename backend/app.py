@@ -1,16 +1,32 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+from werkzeug.utils import safe_join
 from database import get_db_connection, init_database
-from auth import hash_password, verify_password, generate_token, token_required
+from auth import hash_password, verify_password, generate_token, token_required, teacher_required
 from config import Config
-from lecture_generator import LectureGenerator, VOICES
+from instrumentation import init_app as init_instrumentation
+from lecture_generator import LectureGenerator, VOICES, resolve_voice
+from script_parser import ScriptParseError, parse_script
+from progress_service import fetch_attempts, fetch_progress, progress_cache, record_quiz_summary
+import analytics
+import grading
+import live_updates
+import live_session
+import search_index
+import retrieval
+from roster_import import RosterImportError, import_roster
+from class_export import FORMATS as EXPORT_FORMATS, stream_class_export
+import tts_service
+import speed_variants
 from datetime import datetime
 import json
 import os
 from pathlib import Path
 
 app = Flask(__name__)
-CORS(app, origins=['http://localhost:5173', 'http://localhost:5174', 'http://127.0.0.1:5173', 'http://127.0.0.1:5174'])
+CORS(app, origins=['http://localhost:5173', 'http://localhost:5174', 'http://127.0.0.1:5173', 'http://127.0.0.1:5174'],
+     expose_headers=['X-Query-Count', 'Server-Timing', 'X-TTS-Cache'])
+init_instrumentation(app)
 
 # Lecture output directory
 LECTURES_DIR = Path(__file__).parent.parent / "frontend" / "public" / "lectures"
@@ -76,8 +92,11 @@ def register():
                 VALUES (%s, %s, %s, %s, %s)
             """, (user_type, name, password_hash, email, school))
         
-        conn.commit()
         user_id = cursor.lastrowid
+        if user_type == 'student':
+            analytics.record_student_registered(cursor, user_id, class_id)
+        
+        conn.commit()
         
         # Generate token
         token = generate_token(user_id, user_type, name)
@@ -191,6 +210,7 @@ def login():
             streak = 1
         
         conn.commit()
+        progress_cache.invalidate(user['id'])
         
         return jsonify({
             'message': 'Login successful',
@@ -267,9 +287,15 @@ def update_lecture_progress():
         return jsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
         completed = progress_percent >= 90
         
+        cursor.execute("""
+            SELECT progress_percent, completed FROM lecture_progress
+            WHERE user_id = %s AND lecture_id = %s
+        """, (request.user_id, lecture_id))
+        previous = cursor.fetchone()
+        
         cursor.execute("""
             INSERT INTO lecture_progress (user_id, lecture_id, progress_percent, last_position_seconds, completed, completed_at)
             VALUES (%s, %s, %s, %s, %s, IF(%s, NOW(), NULL))
@@ -290,7 +316,13 @@ def update_lecture_progress():
                     total_score = total_score + 10
             """, (request.user_id,))
         
+        analytics.record_lecture_progress(cursor, request.user_id, lecture_id, previous,
+                                          progress_percent, completed)
+        change = live_updates.read_change(cursor, request.user_id)
+        
         conn.commit()
+        progress_cache.invalidate(request.user_id)
+        live_updates.publish_progress(change, lecture_id, progress_percent, completed)
         return jsonify({'message': 'Progress updated', 'completed': completed}), 200
         
     except Exception as e:
@@ -304,54 +336,45 @@ def update_lecture_progress():
 @app.route('/api/progress', methods=['GET'])
 @token_required
 def get_user_progress():
-    """Get all progress for current user"""
+    """Get all progress for current user (best attempt per quiz)"""
+    cached = progress_cache.get(request.user_id)
+    if cached is not None:
+        return jsonify(cached), 200
+    
     conn = get_db_connection()
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get lecture progress
-        cursor.execute("""
-            SELECT lecture_id, progress_percent, completed, last_position_seconds
-            FROM lecture_progress WHERE user_id = %s
-        """, (request.user_id,))
-        lectures = cursor.fetchall()
-        
-        # Get quiz scores
-        cursor.execute("""
-            SELECT quiz_id, score, total_questions, percentage, passed, attempts
-            FROM quiz_scores WHERE user_id = %s
-        """, (request.user_id,))
-        quizzes = cursor.fetchall()
-        
-        # Get test results
-        cursor.execute("""
-            SELECT test_id, ai_score, total_marks, percentage
-            FROM test_results WHERE user_id = %s
-        """, (request.user_id,))
-        tests = cursor.fetchall()
-        
-        # Get leaderboard stats
-        cursor.execute("""
-            SELECT total_score, lectures_completed, quizzes_passed, tests_completed, streak_days
-            FROM leaderboard WHERE user_id = %s
-        """, (request.user_id,))
-        stats = cursor.fetchone() or {
-            'total_score': 0,
-            'lectures_completed': 0,
-            'quizzes_passed': 0,
-            'tests_completed': 0,
-            'streak_days': 0
-        }
+        version = progress_cache.version(request.user_id)
+        cursor = conn.cursor()
+        progress = fetch_progress(cursor, request.user_id)
+        progress_cache.put(request.user_id, progress, version)
+        return jsonify(progress), 200
         
-        return jsonify({
-            'lectures': lectures,
-            'quizzes': quizzes,
-            'tests': tests,
-            'stats': stats
-        }), 200
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/api/progress/attempts', methods=['GET'])
+@token_required
+def get_quiz_attempts():
+    """Get paginated quiz attempt history for current user"""
+    try:
+        page = int(request.args.get('page', 1))
+        page_size = int(request.args.get('pageSize', 20))
+    except ValueError:
+        return jsonify({'error': 'page and pageSize must be integers'}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        cursor = conn.cursor()
+        attempts = fetch_attempts(cursor, request.user_id, page, page_size, request.args.get('quizId'))
+        return jsonify(attempts), 200
         
     finally:
         cursor.close()
@@ -377,29 +400,25 @@ def submit_quiz():
         return jsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor()
         
         percentage = round((score / total_questions) * 100, 2)
         passed = percentage >= 70
         
-        # Check for existing attempt
-        cursor.execute("""
-            SELECT id, attempts, percentage as best_percentage FROM quiz_scores 
-            WHERE user_id = %s AND quiz_id = %s
-            ORDER BY percentage DESC LIMIT 1
-        """, (request.user_id, quiz_id))
-        existing = cursor.fetchone()
-        
-        attempts = (existing['attempts'] + 1) if existing else 1
+        # Atomically bump the summary row; also locks it until commit, so
+        # concurrent submissions of the same quiz are serialized
+        attempts, first_pass = record_quiz_summary(
+            cursor, request.user_id, quiz_id, score, total_questions, percentage, passed
+        )
         
+        # Append to attempt history
         cursor.execute("""
             INSERT INTO quiz_scores (user_id, quiz_id, score, total_questions, percentage, passed, attempts)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
         """, (request.user_id, quiz_id, score, total_questions, percentage, passed, attempts))
         
-        # Update leaderboard
-        if passed and (not existing or not existing.get('best_percentage') or existing['best_percentage'] < 70):
-            # First time passing
+        # Pass bonus only on the submission that first set passed_at
+        if first_pass:
             cursor.execute("""
                 INSERT INTO leaderboard (user_id, quizzes_passed, total_score)
                 VALUES (%s, 1, %s)
@@ -408,7 +427,12 @@ def submit_quiz():
                     total_score = total_score + %s
             """, (request.user_id, int(percentage), int(percentage)))
         
+        analytics.record_quiz_attempt(cursor, request.user_id, quiz_id, percentage, attempts == 1, first_pass)
+        change = live_updates.read_change(cursor, request.user_id) if first_pass else None
+        
         conn.commit()
+        progress_cache.invalidate(request.user_id)
+        live_updates.publish_score(change)
         
         return jsonify({
             'message': 'Quiz submitted',
@@ -430,7 +454,13 @@ def submit_quiz():
 @app.route('/api/test/submit', methods=['POST'])
 @token_required
 def submit_test():
-    """Submit test answers"""
+    """
+    Submit test answers
+    
+    Tests with an answer key are graded on the server (see grading.py): the
+    result is stored as pending and scored in the next grading batch, and
+    any aiScore sent by the client is ignored. Other tests keep the client's score.
+    """
     data = request.get_json()
     test_id = data.get('testId')
     answers = data.get('answers')
@@ -440,6 +470,10 @@ def submit_test():
     if not all([test_id, answers, total_marks]):
         return jsonify({'error': 'Missing required fields'}), 400
     
+    texts = answers.values() if isinstance(answers, dict) else answers if isinstance(answers, list) else [answers]
+    if any(isinstance(text, str) and len(text) > Config.TEST_MAX_ANSWER_CHARS for text in texts):
+        return jsonify({'error': f'Answers are limited to {Config.TEST_MAX_ANSWER_CHARS} characters'}), 400
+    
     conn = get_db_connection()
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
@@ -447,6 +481,23 @@ def submit_test():
     try:
         cursor = conn.cursor()
         
+        key = grading.load_key(cursor, test_id)
+        if key is not None:
+            cursor.execute("""
+                INSERT INTO test_results (user_id, test_id, answers, ai_score, total_marks, percentage)
+                VALUES (%s, %s, %s, NULL, %s, NULL)
+            """, (request.user_id, test_id, json.dumps(answers), key['totalMarks']))
+            result_id = cursor.lastrowid
+            grading.enqueue(cursor, result_id, test_id)
+            conn.commit()
+            grading.dispatcher.notify()
+            
+            return jsonify({
+                'message': 'Test submitted for grading',
+                'status': 'pending',
+                'resultId': result_id
+            }), 202
+        
         percentage = round((ai_score / total_marks) * 100, 2) if ai_score else 0
         
         cursor.execute("""
@@ -463,10 +514,16 @@ def submit_test():
                 total_score = total_score + %s
         """, (request.user_id, int(percentage), int(percentage)))
         
+        analytics.record_test_submission(cursor, request.user_id, percentage)
+        change = live_updates.read_change(cursor, request.user_id)
+        
         conn.commit()
+        progress_cache.invalidate(request.user_id)
+        live_updates.publish_score(change)
         
         return jsonify({
             'message': 'Test submitted',
+            'status': 'graded',
             'percentage': percentage
         }), 200
         
@@ -478,6 +535,83 @@ def submit_test():
         conn.close()
 
 
+@app.route('/api/test/results/<int:result_id>', methods=['GET'])
+@token_required
+def get_test_result(result_id):
+    """A submitted test's score, or status pending while it waits for grading"""
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, user_id, test_id, ai_score, total_marks, percentage, submitted_at
+            FROM test_results WHERE id = %s
+        """, (result_id,))
+        result = cursor.fetchone()
+        if result is None or (result['user_id'] != request.user_id and request.user_type != 'teacher'):
+            return jsonify({'error': 'Result not found'}), 404
+        
+        return jsonify({
+            'resultId': result['id'],
+            'testId': result['test_id'],
+            'status': 'pending' if result['percentage'] is None else 'graded',
+            'aiScore': result['ai_score'],
+            'totalMarks': result['total_marks'],
+            'percentage': float(result['percentage']) if result['percentage'] is not None else None,
+            'submittedAt': str(result['submitted_at'])
+        }), 200
+        
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/api/test/<test_id>/key', methods=['GET', 'PUT'])
+@token_required
+@teacher_required
+def test_answer_key(test_id):
+    """
+    Read or replace a test's answer key (teachers only)
+    
+    Replacing a key regrades every stored submission of the test.
+    
+    Request body (PUT):
+        A test in the tests.json shape: questions with id, marks,
+        expected_keywords, optional rubric [{points, any}] and sample_answer
+    """
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        cursor = conn.cursor()
+        if request.method == 'GET':
+            key = grading.load_key(cursor, test_id)
+            if key is None:
+                return jsonify({'error': 'No answer key for this test'}), 404
+            return jsonify({'key': key}), 200
+        
+        data = request.get_json(silent=True) or {}
+        key = grading.save_key(cursor, {**data, 'id': test_id}, request.user_id)
+        queued = grading.requeue_test(cursor, test_id)
+        conn.commit()
+        if queued:
+            grading.dispatcher.notify()
+        return jsonify({'key': key, 'regrading': queued}), 200
+        
+    except grading.AnswerKeyError as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+
 # ==================== LEADERBOARD ROUTES ====================
 
 @app.route('/api/leaderboard', methods=['GET'])
@@ -538,6 +672,269 @@ def get_leaderboard():
         conn.close()
 
 
+def _user_class_id(user_id):
+    """Class of a user (None without one or if the database is unreachable)"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT class_id FROM users WHERE id = %s", (user_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/api/live/classes/<class_id>', methods=['GET'])
+@token_required
+def stream_class_updates(class_id):
+    """
+    Server-Sent Events stream of a class's leaderboard and progress changes
+    
+    Students may only follow their own class. Events: snapshot (on connect),
+    ranks, progress (see live_updates.py).
+    """
+    if not Config.LIVE_UPDATES_ENABLED:
+        return jsonify({'error': 'Live updates are disabled on this server'}), 503
+    
+    is_teacher = request.user_type == 'teacher'
+    if not is_teacher and _user_class_id(request.user_id) != class_id:
+        return jsonify({'error': 'You can only follow your own class'}), 403
+    
+    return Response(
+        live_updates.stream_events(class_id, request.user_id, is_teacher),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# ==================== LIVE SESSION ROUTES ====================
+
+def _session_response(session_data):
+    """Session as returned to clients (the plan is sent once, on the event stream)"""
+    return {key: value for key, value in session_data.items() if key != 'plan'}
+
+
+@app.route('/api/sessions/clock', methods=['GET'])
+def session_clock():
+    """Server time in ms, sampled by devices to estimate their clock offset"""
+    response = jsonify({'serverTime': live_session.server_time_ms()})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/api/sessions', methods=['POST'])
+@token_required
+@teacher_required
+def create_live_session():
+    """
+    Start a teacher-driven session of a lecture for a class (teachers only)
+    
+    Request body:
+        lectureId: Generated lecture to present
+        classId: Class whose devices follow the session
+    """
+    data = request.get_json(silent=True) or {}
+    lecture_id = data.get('lectureId')
+    class_id = data.get('classId')
+    if not lecture_id or not class_id:
+        return jsonify({'error': 'lectureId and classId are required'}), 400
+    
+    lecture_dir = safe_join(str(LECTURES_DIR), lecture_id)
+    if lecture_dir is None or not os.path.isfile(os.path.join(lecture_dir, 'lecture.json')):
+        return jsonify({'error': 'Lecture not found'}), 404
+    
+    session = live_session.create_session(lecture_id, lecture_dir, class_id, request.user_id)
+    return jsonify({'session': session}), 201
+
+
+@app.route('/api/classes/<class_id>/session', methods=['GET'])
+@token_required
+def get_class_session(class_id):
+    """The class's running session, for devices to join"""
+    if request.user_type != 'teacher' and _user_class_id(request.user_id) != class_id:
+        return jsonify({'error': 'You can only join your own class'}), 403
+    
+    session = live_session.registry.for_class(class_id)
+    if session is None:
+        return jsonify({'error': 'No session running for this class'}), 404
+    return jsonify({'session': _session_response(session.data)}), 200
+
+
+@app.route('/api/sessions/<session_id>/control', methods=['POST'])
+@token_required
+@teacher_required
+def control_live_session(session_id):
+    """
+    Play, pause, seek, change slide or end a session (the teacher who started it)
+    
+    Request body:
+        action: play, pause, seek, slide or end
+        slide: 1-based slide number (seek, slide)
+        position: Seconds into the slide (play, pause, seek)
+    """
+    session = live_session.registry.get(session_id)
+    if session is None or session.ended:
+        return jsonify({'error': 'Session not found'}), 404
+    if session.data['teacherId'] != request.user_id:
+        return jsonify({'error': 'Only the teacher who started the session can control it'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        slide = int(data['slide']) if data.get('slide') is not None else None
+        position = float(data['position']) if data.get('position') is not None else None
+        state = live_session.control(session, data.get('action'), slide, position)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'state': state}), 200
+
+
+@app.route('/api/sessions/<session_id>/events', methods=['GET'])
+@token_required
+def stream_live_session(session_id):
+    """
+    Server-Sent Events of a session: session (plan and device slot), then
+    state, prefetch and finally end (see live_session.py)
+    """
+    session = live_session.registry.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    if request.user_type != 'teacher' and _user_class_id(request.user_id) != session.data['classId']:
+        return jsonify({'error': 'You can only join your own class'}), 403
+    
+    return Response(
+        live_session.stream_session(session),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# ==================== CLASS ROUTES ====================
+
+@app.route('/api/classes/<class_id>/roster', methods=['POST'])
+@token_required
+@teacher_required
+def import_class_roster(class_id):
+    """
+    Bulk-import students into a class from a CSV upload (teachers only)
+    
+    Form data:
+        file: CSV with name, roll_number and optional password columns
+        defaultPassword: optional, used for rows without a password
+    """
+    upload = request.files.get('file')
+    if not upload:
+        return jsonify({'error': 'CSV file is required'}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        cursor = conn.cursor()
+        report = import_roster(cursor, upload.stream, class_id, request.form.get('defaultPassword'))
+        conn.commit()
+        return jsonify(report), 200
+        
+    except (RosterImportError, UnicodeDecodeError) as e:
+        conn.rollback()
+        return jsonify({'error': f'Invalid roster file: {e}'}), 400
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/api/classes/<class_id>/export', methods=['GET'])
+@token_required
+@teacher_required
+def export_class_results(class_id):
+    """
+    Stream a class's results for term reports (teachers only)
+    
+    Query params:
+        format: csv (default) or ndjson
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    # The generator owns the connection and closes it when the stream ends
+    filename = f"{class_id}_results_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+    return Response(
+        stream_with_context(stream_class_export(conn, class_id, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+# ==================== ANALYTICS ROUTES ====================
+
+def _analytics_response(build):
+    """Run an analytics read on a tuple cursor and return it as JSON"""
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        cursor = conn.cursor()
+        return build(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/api/analytics/classes/<class_id>', methods=['GET'])
+@token_required
+@teacher_required
+def get_class_analytics(class_id):
+    """Class overview: completion rate, quiz and test averages (teachers only)"""
+    def build(cursor):
+        overview = analytics.class_overview(cursor, class_id)
+        if overview is None:
+            return jsonify({'error': 'No analytics for this class yet'}), 404
+        return jsonify(overview), 200
+    return _analytics_response(build)
+
+
+@app.route('/api/analytics/classes/<class_id>/lectures', methods=['GET'])
+@token_required
+@teacher_required
+def get_lecture_analytics(class_id):
+    """Per-lecture completion for a class (teachers only)"""
+    return _analytics_response(
+        lambda cursor: (jsonify({'lectures': analytics.lecture_breakdown(cursor, class_id)}), 200)
+    )
+
+
+@app.route('/api/analytics/classes/<class_id>/quizzes', methods=['GET'])
+@token_required
+@teacher_required
+def get_quiz_analytics(class_id):
+    """Per-quiz averages, spread and pass rate for a class (teachers only)"""
+    return _analytics_response(
+        lambda cursor: (jsonify({'quizzes': analytics.quiz_breakdown(cursor, class_id)}), 200)
+    )
+
+
+@app.route('/api/analytics/classes/<class_id>/students', methods=['GET'])
+@token_required
+@teacher_required
+def get_student_analytics(class_id):
+    """Per-student metrics, distributions and at-risk students (teachers only)"""
+    return _analytics_response(
+        lambda cursor: (jsonify(analytics.student_report(cursor, class_id)), 200)
+    )
+
+
 # ==================== LECTURE GENERATION ROUTES ====================
 
 @app.route('/api/lectures/voices', methods=['GET'])
@@ -547,7 +944,8 @@ def get_available_voices():
         'voices': {
             'male': list(VOICES['male'].keys()),
             'female': list(VOICES['female'].keys())
-        }
+        },
+        'generationEnabled': Config.LECTURE_GENERATION_ENABLED
     }), 200
 
 
@@ -564,9 +962,13 @@ def generate_lecture():
         "voice": "liam",  // optional, default: liam
         "speed": 0.95,    // optional, default: 0.95
         "theme": "dark",  // optional: dark or light
-        "accentColor": "#6366f1"  // optional
+        "accentColor": "#6366f1",  // optional
+        "lowBandwidth": false  // optional: 16 kHz audio
     }
     """
+    if not Config.LECTURE_GENERATION_ENABLED:
+        return jsonify({'error': 'Lecture generation is disabled on this server'}), 503
+    
     data = request.get_json()
     
     title = data.get('title')
@@ -579,13 +981,19 @@ def generate_lecture():
     speed = data.get('speed', 0.95)
     theme = data.get('theme', 'dark')
     accent_color = data.get('accentColor', '#6366f1')
+    low_bandwidth = bool(data.get('lowBandwidth', False))
     
     # Generate unique lecture ID
     lecture_id = f"lecture_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{request.user_id}"
     
     try:
-        # Initialize generator
-        generator = LectureGenerator(voice=voice, speed=speed)
+        # Validate the script before paying for model initialization
+        script_warnings = []
+        parse_script(script, script_warnings)
+        
+        # Initialize generator on the shared engine; its chunks queue behind /api/tts requests
+        tts = tts_service.get_scheduler().bind(tts_service.LECTURE)
+        generator = LectureGenerator(voice=voice, speed=speed, low_bandwidth=low_bandwidth, tts=tts)
         
         # Generate lecture
         lecture_data = generator.generate_lecture(
@@ -605,6 +1013,7 @@ def generate_lecture():
                     INSERT INTO lectures (id, title, created_by, metadata)
                     VALUES (%s, %s, %s, %s)
                 """, (lecture_id, title, request.user_id, json.dumps(lecture_data)))
+                search_index.index_lecture(cursor, lecture_data, request.user_id)
                 conn.commit()
             except Exception as db_err:
                 print(f"Warning: Could not save to database: {db_err}")
@@ -614,13 +1023,69 @@ def generate_lecture():
         
         return jsonify({
             'message': 'Lecture generated successfully',
-            'lecture': lecture_data
+            'lecture': lecture_data,
+            'warnings': script_warnings
         }), 201
         
+    except ScriptParseError as e:
+        return jsonify({'error': f'Invalid script: {e}', 'details': e.to_dict()}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to generate lecture: {str(e)}'}), 500
 
 
+@app.route('/api/tts', methods=['POST'])
+@token_required
+def text_to_speech():
+    """
+    Speak a short text (streamed 16-bit mono WAV)
+    
+    Runs ahead of queued lecture generation on the shared engine; audio
+    starts as soon as the first sentence fragment is synthesized.
+    
+    Request body:
+    {
+        "text": "Short answer to read out",
+        "voice": "sarah",  // optional, default: sarah
+        "speed": 1.0       // optional, 0.5-2.0
+    }
+    """
+    if not Config.LECTURE_GENERATION_ENABLED:
+        return jsonify({'error': 'Speech synthesis is disabled on this server'}), 503
+    
+    data = request.get_json() or {}
+    text = (data.get('text') or '').strip()
+    if not text:
+        return jsonify({'error': 'Text is required'}), 400
+    if len(text) > Config.TTS_MAX_CHARS:
+        return jsonify({'error': f'Text is limited to {Config.TTS_MAX_CHARS} characters'}), 400
+    
+    voice = resolve_voice(data.get('voice', 'sarah'))
+    if voice not in [v for group in VOICES.values() for v in group.values()]:
+        return jsonify({'error': 'Unknown voice'}), 400
+    try:
+        speed = float(data.get('speed', 1.0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Speed must be a number'}), 400
+    if not 0.5 <= speed <= 2.0:
+        return jsonify({'error': 'Speed must be between 0.5 and 2.0'}), 400
+    
+    cached = tts_service.phrase_cache.get(tts_service.phrase_key(text, voice, speed))
+    if cached is not None:
+        return Response(cached, mimetype='audio/wav', headers={'X-TTS-Cache': 'hit'})
+    
+    try:
+        scheduler = tts_service.get_scheduler()
+    except Exception as e:
+        print(f"[TTS] ✗ Engine unavailable: {e}")
+        return jsonify({'error': 'Speech synthesis is unavailable'}), 503
+    
+    return Response(
+        stream_with_context(tts_service.stream_speech(scheduler, text, voice, speed)),
+        mimetype='audio/wav',
+        headers={'X-TTS-Cache': 'miss'}
+    )
+
+
 @app.route('/api/lectures', methods=['GET'])
 @token_required
 def list_lectures():
@@ -671,6 +1136,51 @@ def list_lectures():
         conn.close()
 
 
+@app.route('/api/search', methods=['GET'])
+@token_required
+def search_lectures():
+    """
+    Full-text search over the lectures visible to the user
+    
+    Students search the lectures assigned to their class, teachers their own
+    lectures (or those assigned to `classId`).
+    
+    Query params:
+        q: Search text; "quoted phrases" must match exactly
+        classId: Teachers only: restrict to lectures assigned to this class
+        limit: Max results (default 10, max 50)
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        cursor = conn.cursor()
+        created_by, class_id = None, request.args.get('classId')
+        if request.user_type != 'teacher':
+            cursor.execute("SELECT class_id FROM users WHERE id = %s", (request.user_id,))
+            row = cursor.fetchone()
+            class_id = row[0] if row else None
+            if not class_id:
+                return jsonify({'query': query, 'results': []}), 200
+        elif not class_id:
+            created_by = request.user_id
+        
+        results = search_index.search(cursor, query, created_by=created_by, class_id=class_id, limit=limit)
+        return jsonify({'query': query, 'results': results}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+
 @app.route('/api/lectures/<lecture_id>', methods=['GET'])
 def get_lecture(lecture_id):
     """Get a specific lecture by ID"""
@@ -682,11 +1192,68 @@ def get_lecture(lecture_id):
     try:
         with open(lecture_path, 'r', encoding='utf-8') as f:
             lecture_data = json.load(f)
-        return jsonify({'lecture': lecture_data}), 200
+        return jsonify({'lecture': lecture_data, 'playbackSpeeds': [1.0] + Config.PLAYBACK_SPEEDS}), 200
     except Exception as e:
         return jsonify({'error': f'Failed to load lecture: {str(e)}'}), 500
 
 
+@app.route('/api/lectures/<lecture_id>/audio/<int:slide_num>', methods=['GET'])
+def get_lecture_audio(lecture_id, slide_num):
+    """
+    Audio of one lecture segment, optionally at another playback speed
+    
+    Query params:
+        speed: 1.0 (default) or one of Config.PLAYBACK_SPEEDS; other speeds
+               are time-stretched from the generated audio on first request
+    """
+    speed = speed_variants.parse_speed(request.args.get('speed', 1.0))
+    if speed is None:
+        speeds = ', '.join(f'{s:g}' for s in [1.0] + Config.PLAYBACK_SPEEDS)
+        return jsonify({'error': f'Speed must be one of: {speeds}'}), 400
+    
+    audio_path = safe_join(str(LECTURES_DIR), lecture_id, 'audio', f'audio{slide_num}.wav')
+    if audio_path is None or not os.path.isfile(audio_path):
+        return jsonify({'error': 'Audio not found'}), 404
+    
+    try:
+        path = speed_variants.ensure_variant(Path(audio_path), speed)
+    except Exception as e:
+        return jsonify({'error': f'Failed to prepare audio: {str(e)}'}), 500
+    return send_from_directory(path.parent, path.name, mimetype='audio/wav')
+
+
+@app.route('/api/lectures/<lecture_id>/ask', methods=['POST'])
+@token_required
+def ask_lecture(lecture_id):
+    """
+    Passages of a lecture that best match a question, with their slide numbers
+    
+    Request body:
+        question: Question text (max 500 characters)
+        k: Max passages (default 3, max 10)
+    """
+    data = request.get_json(silent=True) or {}
+    question = (data.get('question') or '').strip()
+    if not question:
+        return jsonify({'error': 'Question is required'}), 400
+    if len(question) > 500:
+        return jsonify({'error': 'Question must be at most 500 characters'}), 400
+    try:
+        k = min(max(int(data.get('k', 3)), 1), 10)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'k must be an integer'}), 400
+    
+    lecture_dir = safe_join(str(LECTURES_DIR), lecture_id)
+    if lecture_dir is None or not os.path.isfile(os.path.join(lecture_dir, 'lecture.json')):
+        return jsonify({'error': 'Lecture not found'}), 404
+    
+    try:
+        passages = retrieval.ask(lecture_dir, question, k)
+        return jsonify({'lectureId': lecture_id, 'question': question, 'passages': passages}), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to search lecture: {str(e)}'}), 500
+
+
 @app.route('/api/lectures/<lecture_id>/assign', methods=['POST'])
 @token_required
 def assign_lecture_to_class(lecture_id):
@@ -751,5 +1318,6 @@ if __name__ == '__main__':
     print("🚀 Starting AetherLearn Backend...")
     print("📦 Initializing database...")
     init_database()
+    grading.dispatcher.start()  # Grade submissions left queued by an earlier run
     print("🌐 Starting Flask server...")
     app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
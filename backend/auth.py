@@ -66,3 +66,16 @@ def token_required(f):
         return f(*args, **kwargs)
     
     return decorated
+
+def teacher_required(f):
+    """Decorator (after token_required) to restrict routes to teachers"""
+    from functools import wraps
+    from flask import request, jsonify
+    
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if request.user_type != 'teacher':
+            return jsonify({'error': 'Teacher access required'}), 403
+        return f(*args, **kwargs)
+    
+    return decorated
@@ -0,0 +1,69 @@
+"""
+Lecture Captions for AetherLearn
+WebVTT files and compact timing tracks from synthesis timings
+
+KokoroTTS.save(..., timing=[]) reports where each synthesized chunk starts
+and ends in the written WAV, so captions need no alignment pass over the
+audio. A chunk holding several sentences is split into one cue per
+sentence, with the chunk's time divided by character count; cue boundaries
+at chunk edges are exact.
+
+lecture.json carries the chunk timing per segment as
+    "captions": {"path": ".../captions/caption3.vtt", "timing": [[start_ms, end_ms, chars], ...]}
+where chars is the length of the chunk's text; chunks follow each other in
+speech_clean (whitespace collapsed) separated by one space.
+"""
+
+import re
+from pathlib import Path
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def caption_cues(timing: list[dict]) -> list[tuple[float, float, str]]:
+    """(start, end, text) per sentence from per-chunk timing"""
+    cues = []
+    for chunk in timing:
+        sentences = [s for s in SENTENCE_END.split(chunk["text"]) if s]
+        total = sum(len(s) for s in sentences)
+        start, span = chunk["start"], chunk["end"] - chunk["start"]
+        done = 0
+        for sentence in sentences:
+            cue_start = start + span * done / total
+            done += len(sentence)
+            cues.append((cue_start, start + span * done / total, sentence))
+    return cues
+
+
+def format_timestamp(seconds: float) -> str:
+    """WebVTT timestamp: HH:MM:SS.mmm"""
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}"
+
+
+def to_webvtt(cues: list[tuple[float, float, str]]) -> str:
+    """WebVTT document for (start, end, text) cues"""
+    lines = ["WEBVTT", ""]
+    for i, (start, end, text) in enumerate(cues, 1):
+        # "-->" would end the cue timing line early in some parsers
+        lines += [str(i), f"{format_timestamp(start)} --> {format_timestamp(end)}", text.replace("-->", "->"), ""]
+    return "\n".join(lines)
+
+
+def write_webvtt(path, timing: list[dict]) -> Path:
+    """Write the captions of one segment; returns the path"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(to_webvtt(caption_cues(timing)), encoding="utf-8")
+    return path
+
+
+def compact_timing(timing: list[dict]) -> list[list[int]]:
+    """[[start_ms, end_ms, chars], ...] per chunk for lecture.json"""
+    return [
+        [int(round(chunk["start"] * 1000)), int(round(chunk["end"] * 1000)), len(chunk["text"])]
+        for chunk in timing
+    ]
@@ -0,0 +1,177 @@
+"""
+Class Export for AetherLearn
+Streams a class's results (students, leaderboard, lectures, quizzes, tests)
+as CSV or NDJSON for term reports
+
+One query returns every student's records ordered by student. Rows are read
+from an unbuffered cursor with fetchmany() and written out batch by batch,
+so memory stays flat however large the school is, and the header goes out
+before the query has even run.
+
+CSV has one line per record (lecture, quiz or test); NDJSON has one object
+per student with the records nested.
+"""
+
+import csv
+import io
+import json
+
+BATCH_SIZE = 500
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+# Quizzes are summarized per quiz (best result, attempt count); tests are listed individually
+EXPORT_QUERY = """
+    SELECT u.id, u.roll_number, u.name,
+           COALESCE(lb.total_score, 0), COALESCE(lb.streak_days, 0),
+           COALESCE(lb.lectures_completed, 0), COALESCE(lb.quizzes_passed, 0), COALESCE(lb.tests_completed, 0),
+           r.kind, r.item_id, r.score, r.total, r.percentage, r.flag, r.progress, r.attempts, r.at
+    FROM users u
+    LEFT JOIN leaderboard lb ON lb.user_id = u.id
+    LEFT JOIN (
+        SELECT user_id, 'lecture' AS kind, lecture_id AS item_id, NULL AS score, NULL AS total,
+               NULL AS percentage, completed AS flag, progress_percent AS progress, NULL AS attempts,
+               COALESCE(completed_at, updated_at) AS at
+        FROM lecture_progress
+        WHERE user_id IN (SELECT id FROM users WHERE class_id = %s)
+        UNION ALL
+        SELECT user_id, 'quiz', quiz_id, best_score, total_questions, best_percentage,
+               passed_at IS NOT NULL, NULL, attempts, last_attempt_at
+        FROM quiz_summary
+        WHERE user_id IN (SELECT id FROM users WHERE class_id = %s)
+        UNION ALL
+        SELECT user_id, 'test', test_id, ai_score, total_marks, percentage, NULL, NULL, NULL, submitted_at
+        FROM test_results
+        WHERE user_id IN (SELECT id FROM users WHERE class_id = %s)
+    ) r ON r.user_id = u.id
+    WHERE u.class_id = %s AND u.user_type = 'student'
+    ORDER BY u.roll_number, u.id, r.kind, r.item_id, r.at
+"""
+
+CSV_COLUMNS = [
+    'roll_number', 'name', 'total_score', 'streak_days',
+    'type', 'item_id', 'score', 'total', 'percentage', 'passed_or_completed',
+    'progress_percent', 'attempts', 'date'
+]
+
+
+def _value(value):
+    """JSON/CSV-friendly form of a DB value"""
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (int, str, float)):
+        return value
+    return float(value)  # DECIMAL
+
+
+def _fetch_batches(cursor, class_id: str, batch_size: int):
+    cursor.execute(EXPORT_QUERY, (class_id, class_id, class_id, class_id))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue()
+
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            (_, roll_number, name, total_score, streak, _, _, _,
+             kind, item_id, score, total, percentage, flag, progress, attempts, at) = row
+            writer.writerow([
+                roll_number, name, total_score, streak,
+                kind or '', item_id or '', _value(score), _value(total), _value(percentage),
+                '' if flag is None else int(flag), _value(progress), _value(attempts), _value(at)
+            ])
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(batches):
+    current = None
+    for rows in batches:
+        lines = []
+        for row in rows:
+            (user_id, roll_number, name, total_score, streak, lectures_completed,
+             quizzes_passed, tests_completed, kind, item_id, score, total, percentage,
+             flag, progress, attempts, at) = row
+
+            if current is None or current['userId'] != user_id:
+                if current is not None:
+                    lines.append(json.dumps(current))
+                current = {
+                    'userId': user_id,
+                    'rollNumber': roll_number,
+                    'name': name,
+                    'stats': {
+                        'totalScore': total_score,
+                        'streakDays': streak,
+                        'lecturesCompleted': lectures_completed,
+                        'quizzesPassed': quizzes_passed,
+                        'testsCompleted': tests_completed
+                    },
+                    'lectures': [],
+                    'quizzes': [],
+                    'tests': []
+                }
+
+            if kind == 'lecture':
+                current['lectures'].append({
+                    'lectureId': item_id, 'progressPercent': progress,
+                    'completed': bool(flag), 'date': _value(at)
+                })
+            elif kind == 'quiz':
+                current['quizzes'].append({
+                    'quizId': item_id, 'bestScore': score, 'totalQuestions': total,
+                    'bestPercentage': _value(percentage), 'passed': bool(flag),
+                    'attempts': attempts, 'lastAttempt': _value(at)
+                })
+            elif kind == 'test':
+                current['tests'].append({
+                    'testId': item_id, 'score': score, 'totalMarks': total,
+                    'percentage': _value(percentage), 'submittedAt': _value(at)
+                })
+
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    if current is not None:
+        yield json.dumps(current) + '\n'
+
+
+def stream_class_export(conn, class_id: str, fmt: str = 'csv', batch_size: int = BATCH_SIZE):
+    """
+    Generator of response chunks for a class export
+
+    Owns conn: the cursor and connection are closed when the generator
+    finishes or the client disconnects.
+
+    Args:
+        conn: Open DB connection
+        class_id: Class to export
+        fmt: 'csv' or 'ndjson'
+        batch_size: Rows per fetchmany()
+    """
+    cursor = conn.cursor(buffered=False)
+    try:
+        batches = _fetch_batches(cursor, class_id, batch_size)
+        chunks = _csv_chunks(batches) if fmt == 'csv' else _ndjson_chunks(batches)
+        yield from chunks
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass  # Unread rows left behind when the client disconnects mid-stream
+        conn.close()
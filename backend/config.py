@@ -4,6 +4,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
+    # Storage backend: 'mysql' (server) or 'sqlite' (embedded file, WAL mode)
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', os.path.join(os.path.dirname(__file__), 'data', 'aetherlearn.db'))
+    
     # MySQL Database
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_USER = os.getenv('DB_USER', 'root')
@@ -16,3 +20,47 @@ class Config:
     
     # Flask
     DEBUG = os.getenv('FLASK_DEBUG', 'True') == 'True'
+    
+    # Lecture generation (False for API-only workers; the TTS stack is then never imported)
+    LECTURE_GENERATION_ENABLED = os.getenv('LECTURE_GENERATION_ENABLED', 'True') == 'True'
+    
+    # TTS inference profile (see KokoroTTS/inference_profiles.py)
+    TTS_PROFILE = os.getenv('TTS_PROFILE', 'fp32')  # fp32 or int8
+    TTS_INTRA_OP_THREADS = int(os.getenv('TTS_INTRA_OP_THREADS', '0'))  # 0 = one per core
+    TTS_INTER_OP_THREADS = int(os.getenv('TTS_INTER_OP_THREADS', '1'))
+    TTS_GRAPH_OPTIMIZATION = os.getenv('TTS_GRAPH_OPTIMIZATION', 'all')  # disabled/basic/extended/all
+    
+    # Short ad-hoc speech (/api/tts), served by the shared engine ahead of lecture jobs
+    TTS_MAX_CHARS = int(os.getenv('TTS_MAX_CHARS', '1000'))
+    TTS_FIRST_CHUNK_CHARS = int(os.getenv('TTS_FIRST_CHUNK_CHARS', '80'))  # Short first chunk = fast first audio
+    TTS_CHUNK_CHARS = int(os.getenv('TTS_CHUNK_CHARS', '200'))
+    TTS_PHRASE_CACHE_ENTRIES = int(os.getenv('TTS_PHRASE_CACHE_ENTRIES', '256'))  # 0 disables
+    
+    # Playback speeds offered for lecture audio, made by time-stretching on first request
+    PLAYBACK_SPEEDS = [float(s) for s in os.getenv('PLAYBACK_SPEEDS', '0.75,0.8,1.25,1.5').split(',') if s]
+    
+    # Live class updates over Server-Sent Events (see live_updates.py)
+    LIVE_UPDATES_ENABLED = os.getenv('LIVE_UPDATES_ENABLED', 'True') == 'True'
+    LIVE_COALESCE_MS = float(os.getenv('LIVE_COALESCE_MS', '250'))  # Publishes within this window become one event
+    LIVE_QUEUE_EVENTS = int(os.getenv('LIVE_QUEUE_EVENTS', '64'))  # Per stream; a client further behind is resynced
+    LIVE_BROKER_ADDRESS = os.getenv('LIVE_BROKER_ADDRESS', '')  # host:port of `live_updates.py --broker`; empty = single process
+    
+    # Teacher-driven classroom sessions (see live_session.py)
+    SESSION_LEAD_MS = int(os.getenv('SESSION_LEAD_MS', '300'))  # Play starts this far ahead so every device starts together
+    SESSION_PREFETCH_FRACTION = float(os.getenv('SESSION_PREFETCH_FRACTION', '0.5'))  # Share of a slide over which devices fetch the next one
+    
+    # Server-side test grading (see grading.py)
+    GRADING_WORKERS = int(os.getenv('GRADING_WORKERS', '0'))  # Grading processes; 0 = one per core
+    GRADING_BATCH_MS = float(os.getenv('GRADING_BATCH_MS', '2000'))  # Submissions within this window are graded together
+    GRADING_BATCH_SIZE = int(os.getenv('GRADING_BATCH_SIZE', '500'))  # Queued submissions read per batch
+    GRADING_RETRY_SECONDS = float(os.getenv('GRADING_RETRY_SECONDS', '60'))  # Queue re-checked this often without new submissions
+    GRADING_SIMILARITY_WEIGHT = float(os.getenv('GRADING_SIMILARITY_WEIGHT', '0.3'))  # Share of marks from similarity to the model answer
+    TEST_MAX_ANSWER_CHARS = int(os.getenv('TEST_MAX_ANSWER_CHARS', '5000'))  # Longest accepted answer to one question
+    
+    # Instrumentation
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Bearer token for /api/metrics; empty = endpoint off
+    
+    # Progress dashboard cache (seconds, 0 disables)
+    PROGRESS_CACHE_SECONDS = float(os.getenv('PROGRESS_CACHE_SECONDS', '60'))
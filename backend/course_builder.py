@@ -0,0 +1,412 @@
+"""
+Course Builder for AetherLearn
+Bulk-generates many lectures (slides + audio) from a directory or manifest of scripts
+
+Every segment of every lecture becomes one synthesis job. Jobs are scheduled
+longest-first across a pool of worker processes, each of which loads the TTS
+model exactly once, so a whole term of content keeps every core busy.
+
+A lecture is built in a staging folder next to its output folder and swapped
+in only once all of its audio succeeded, so a failed rebuild leaves the
+previous build untouched.
+
+Usage:
+    python course_builder.py scripts/                  # every *.txt in the folder
+    python course_builder.py course.json --workers 4   # manifest
+    python course_builder.py scripts/ --force          # rebuild up-to-date lectures
+
+Manifest format:
+    {
+        "defaults": {"voice": "liam", "speed": 0.95, "theme": "dark"},
+        "lectures": [
+            {"id": "bio_01", "title": "Photosynthesis", "script": "bio_01.txt"},
+            {"id": "bio_02", "script": "bio_02.txt", "voice": "sarah"}
+        ]
+    }
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from captions import write_webvtt
+from retrieval import build_index
+from lecture_generator import (
+    KOKORO_PATH,
+    OUTPUT_BASE,
+    resolve_voice,
+    segment_metadata,
+    tts_profile,
+    write_slides
+)
+from script_parser import ScriptParseError, parse_script
+
+DEFAULTS = {
+    "voice": "liam",
+    "speed": 0.95,
+    "theme": "dark",
+    "accentColor": "#6366f1",
+    "lowBandwidth": False
+}
+
+SCRIPT_SUFFIXES = (".txt", ".script")
+
+# ==================== MANIFEST ====================
+
+def load_course(source: Path) -> list[dict]:
+    """
+    Load lecture entries from a directory of scripts or a JSON manifest
+
+    Returns:
+        List of entries with id, title, script_path, voice, speed, theme, accentColor
+    """
+    source = Path(source)
+
+    if source.is_dir():
+        defaults = dict(DEFAULTS)
+        raw_entries = [
+            {"id": path.stem, "script": path.name}
+            for path in sorted(source.iterdir())
+            if path.suffix in SCRIPT_SUFFIXES
+        ]
+        base_dir = source
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        defaults = {**DEFAULTS, **manifest.get("defaults", {})}
+        raw_entries = manifest.get("lectures", [])
+        base_dir = source.parent
+
+    entries = []
+    seen = set()
+    for raw in raw_entries:
+        if "id" not in raw or "script" not in raw:
+            raise ValueError(f"Manifest entry needs 'id' and 'script': {raw}")
+        if raw["id"] in seen:
+            raise ValueError(f"Duplicate lecture id: {raw['id']}")
+        seen.add(raw["id"])
+
+        entry = {**defaults, **raw}
+        entry["script_path"] = base_dir / raw["script"]
+        entry.setdefault("title", raw["id"].replace("_", " ").title())
+        entries.append(entry)
+
+    return entries
+
+
+def build_fingerprint(entry: dict, script: str) -> str:
+    """Hash of everything that affects a lecture's generated output"""
+    key = json.dumps({
+        "script": script,
+        "title": entry["title"],
+        "voice": resolve_voice(entry["voice"]),
+        "speed": entry["speed"],
+        "theme": entry["theme"],
+        "accentColor": entry["accentColor"],
+        "lowBandwidth": entry["lowBandwidth"]
+    }, sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def is_up_to_date(output_dir: Path, fingerprint: str) -> bool:
+    """True if lecture.json was built from the same inputs and all audio exists"""
+    metadata_path = output_dir / "lecture.json"
+    if not metadata_path.exists():
+        return False
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            lecture_data = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if lecture_data.get("build", {}).get("fingerprint") != fingerprint:
+        return False
+    return all(
+        (output_dir / "audio" / f"audio{seg['index']}.wav").exists()
+        and (output_dir / "captions" / f"caption{seg['index']}.vtt").exists()
+        for seg in lecture_data.get("segments", [])
+        if seg["audio"]["path"]
+    )
+
+
+def staging_dir(output_base: Path, lecture_id: str) -> Path:
+    """Where a lecture is built before it replaces the published folder"""
+    return output_base / f".{lecture_id}.building"
+
+
+def publish_build(output_base: Path, lecture_id: str):
+    """Swap a finished staging folder in place of the lecture's output folder"""
+    output_dir = output_base / lecture_id
+    previous = output_base / f".{lecture_id}.previous"
+    shutil.rmtree(previous, ignore_errors=True)
+    if output_dir.exists():
+        output_dir.rename(previous)
+    staging_dir(output_base, lecture_id).rename(output_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+# ==================== WORKERS ====================
+
+_worker_tts = None
+_postprocessors = {}
+
+
+def _init_worker(model_dir: str | None, profile: dict):
+    """Load the TTS model once per worker process"""
+    global _worker_tts
+    import sys
+    sys.path.insert(0, str(KOKORO_PATH))
+    from tts_engine import KokoroTTS
+    from audio_processing import AudioPostProcessor, LOW_BANDWIDTH_RATE
+    _worker_tts = KokoroTTS(model_dir, profile=profile)
+    _postprocessors[False] = _worker_tts.postprocessor
+    _postprocessors[True] = AudioPostProcessor(target_sample_rate=LOW_BANDWIDTH_RATE)
+
+
+def _synthesize_job(job: dict) -> dict:
+    """Synthesize one segment's audio inside a worker process"""
+    start = time.perf_counter()
+    timing = []
+    _worker_tts.save(
+        text=job["text"],
+        output_path=job["audio_path"],
+        voice=job["voice"],
+        speed=job["speed"],
+        postprocessor=_postprocessors[job["low_bandwidth"]],
+        timing=timing
+    )
+    write_webvtt(job["captions_path"], timing)
+    return {
+        "lecture_id": job["lecture_id"],
+        "index": job["index"],
+        "seconds": time.perf_counter() - start,
+        "timing": timing
+    }
+
+
+# ==================== BUILD ====================
+
+def build_course(
+    entries: list[dict],
+    output_base: Path = OUTPUT_BASE,
+    workers: int | None = None,
+    force: bool = False,
+    model_dir: str | None = None,
+    profile: str | None = None
+) -> dict:
+    """
+    Build every lecture in the course
+
+    Args:
+        entries: Lecture entries from load_course()
+        output_base: Directory that receives one folder per lecture
+        workers: Worker process count (default: all cores)
+        force: Rebuild lectures even if they are up to date
+        model_dir: KokoroTTS model directory
+        profile: Inference profile name (default: Config.TTS_PROFILE)
+
+    Returns:
+        Build report with per-lecture status and timings
+    """
+    build_start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    output_base = Path(output_base)
+
+    # Workers share the cores instead of each starting one ONNX thread per core
+    engine_profile = tts_profile(**({"name": profile} if profile else {}))
+    if not engine_profile["intra_op_threads"]:
+        engine_profile["intra_op_threads"] = max(1, (os.cpu_count() or 1) // workers)
+
+    lectures = {}
+    jobs = []
+    report = {
+        "started_at": datetime.now().isoformat(),
+        "workers": workers,
+        "profile": engine_profile,
+        "lectures": {}
+    }
+
+    # Parse scripts and render slides up front; audio becomes jobs
+    for entry in entries:
+        lecture_id = entry["id"]
+        output_dir = output_base / lecture_id
+
+        try:
+            with open(entry["script_path"], "r", encoding="utf-8") as f:
+                script = f.read()
+            script_warnings = []
+            segments = parse_script(script, script_warnings)
+        except (OSError, ScriptParseError) as e:
+            print(f"  ✗ {lecture_id}: {e}")
+            report["lectures"][lecture_id] = {"status": "failed", "error": str(e)}
+            continue
+        for warning in script_warnings:
+            print(f"  ⚠ {lecture_id}: line {warning['line']}, column {warning['column']}: {warning['message']}")
+
+        fingerprint = build_fingerprint(entry, script)
+        if not force and is_up_to_date(output_dir, fingerprint):
+            print(f"  = {lecture_id}: up to date")
+            report["lectures"][lecture_id] = {"status": "skipped"}
+            continue
+
+        slides_start = time.perf_counter()
+        build_dir = staging_dir(output_base, lecture_id)
+        shutil.rmtree(build_dir, ignore_errors=True)  # Left over from an interrupted build
+        (build_dir / "slides").mkdir(parents=True)
+        (build_dir / "audio").mkdir()
+        write_slides(build_dir / "slides", segments, entry["theme"], entry["accentColor"])
+
+        voice_id = resolve_voice(entry["voice"])
+        lectures[lecture_id] = {
+            "entry": entry,
+            "segments": segments,
+            "fingerprint": fingerprint,
+            "voice_id": voice_id,
+            "pending": 0,
+            "synthesis_seconds": 0.0,
+            "timing": {},
+            "slides_seconds": time.perf_counter() - slides_start,
+            "error": None
+        }
+
+        for i, segment in enumerate(segments):
+            if not segment["speech_clean"]:
+                continue
+            lectures[lecture_id]["pending"] += 1
+            jobs.append({
+                "lecture_id": lecture_id,
+                "index": i + 1,
+                "text": segment["speech_clean"],
+                "voice": voice_id,
+                "speed": entry["speed"],
+                "low_bandwidth": entry["lowBandwidth"],
+                "audio_path": str(build_dir / "audio" / f"audio{i + 1}.wav"),
+                "captions_path": str(build_dir / "captions" / f"caption{i + 1}.vtt")
+            })
+
+    # Longest job first: synthesis time is roughly proportional to text length
+    jobs.sort(key=lambda job: len(job["text"]), reverse=True)
+    print(f"\nScheduling {len(jobs)} segments from {len(lectures)} lectures on {workers} workers\n")
+
+    for lecture_id, lecture in lectures.items():
+        if lecture["pending"] == 0:
+            _finish_lecture(lecture_id, lecture, output_base, report, build_start)
+
+    if jobs:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(model_dir, engine_profile)
+        ) as executor:
+            futures = {executor.submit(_synthesize_job, job): job for job in jobs}
+
+            for future in as_completed(futures):
+                job = futures[future]
+                lecture = lectures[job["lecture_id"]]
+                try:
+                    result = future.result()
+                    lecture["synthesis_seconds"] += result["seconds"]
+                    lecture["timing"][job["index"]] = result["timing"]
+                except Exception as e:
+                    lecture["error"] = lecture["error"] or f"segment {job['index']}: {e}"
+
+                lecture["pending"] -= 1
+                if lecture["pending"] == 0:
+                    _finish_lecture(job["lecture_id"], lecture, output_base, report, build_start)
+
+    report["finished_at"] = datetime.now().isoformat()
+    report["wall_seconds"] = round(time.perf_counter() - build_start, 3)
+    report["summary"] = {
+        status: sum(1 for l in report["lectures"].values() if l["status"] == status)
+        for status in ("built", "skipped", "failed")
+    }
+    return report
+
+
+def _finish_lecture(lecture_id: str, lecture: dict, output_base: Path, report: dict, build_start: float):
+    """Write lecture.json once all of a lecture's audio jobs are done"""
+    entry = lecture["entry"]
+    timings = {
+        "slides_seconds": round(lecture["slides_seconds"], 3),
+        "synthesis_seconds": round(lecture["synthesis_seconds"], 3),
+        "completed_after_seconds": round(time.perf_counter() - build_start, 3)
+    }
+
+    if lecture["error"]:
+        # The previous build (if any) stays published; the next build retries this lecture
+        shutil.rmtree(staging_dir(output_base, lecture_id), ignore_errors=True)
+        print(f"  ✗ {lecture_id}: {lecture['error']}")
+        report["lectures"][lecture_id] = {"status": "failed", "error": lecture["error"], **timings}
+        return
+
+    segments = lecture["segments"]
+    lecture_data = {
+        "id": lecture_id,
+        "title": entry["title"],
+        "created_at": datetime.now().isoformat(),
+        "voice": lecture["voice_id"],
+        "theme": entry["theme"],
+        "total_slides": len(segments),
+        "segments": [
+            segment_metadata(lecture_id, i + 1, segment, bool(segment["speech_clean"]),
+                             lecture["timing"].get(i + 1))
+            for i, segment in enumerate(segments)
+        ],
+        "build": {"fingerprint": lecture["fingerprint"]}
+    }
+
+    metadata_path = staging_dir(output_base, lecture_id) / "lecture.json"
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(lecture_data, f, indent=2)
+    build_index(lecture_data, metadata_path.parent)
+    publish_build(output_base, lecture_id)
+
+    print(f"  ✓ {lecture_id}: {len(segments)} slides ({timings['synthesis_seconds']:.1f}s synthesis)")
+    report["lectures"][lecture_id] = {"status": "built", "slides": len(segments), **timings}
+
+
+# ==================== CLI INTERFACE ====================
+
+def main():
+    """CLI for building a whole course"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build many AetherLearn lectures at once")
+    parser.add_argument("source", help="Directory of *.txt scripts or a JSON manifest")
+    parser.add_argument("--output", default=str(OUTPUT_BASE), help="Lecture output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Rebuild lectures that are up to date")
+    parser.add_argument("--model-dir", default=None, help="KokoroTTS model directory")
+    parser.add_argument("--profile", choices=["fp32", "int8"], default=None,
+                        help="Inference profile (default: TTS_PROFILE from .env)")
+    parser.add_argument("--report", default="build_report.json", help="Build report path")
+    args = parser.parse_args()
+
+    entries = load_course(Path(args.source))
+    print(f"Loaded {len(entries)} lectures from {args.source}")
+
+    report = build_course(
+        entries,
+        output_base=Path(args.output),
+        workers=args.workers,
+        force=args.force,
+        model_dir=args.model_dir,
+        profile=args.profile
+    )
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    summary = report["summary"]
+    print(f"\nBuilt {summary['built']}, skipped {summary['skipped']}, failed {summary['failed']} "
+          f"in {report['wall_seconds']:.1f}s")
+    print(f"Report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
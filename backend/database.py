@@ -1,23 +1,23 @@
-import mysql.connector
-from mysql.connector import Error
 from config import Config
+from instrumentation import instrument_connection
+from storage import get_storage
 
 def get_db_connection():
-    """Create and return a database connection"""
-    try:
-        connection = mysql.connector.connect(
-            host=Config.DB_HOST,
-            user=Config.DB_USER,
-            password=Config.DB_PASSWORD,
-            database=Config.DB_NAME
-        )
-        return connection
-    except Error as e:
-        print(f"Error connecting to MySQL: {e}")
+    """Create and return a database connection for the configured backend"""
+    connection = get_storage().connect()
+    if connection is None:
         return None
+    return instrument_connection(connection)
 
 def init_database():
     """Initialize database and create tables"""
+    storage = get_storage()
+    if storage.dialect == 'sqlite':
+        return storage.init_schema()
+
+    import mysql.connector
+    from mysql.connector import Error
+
     try:
         # First connect without database to create it
         connection = mysql.connector.connect(
@@ -107,6 +107,36 @@ def init_database():
             )
         """)
         
+        # Create quiz_summary table (best result per user and quiz; quiz_scores keeps history)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS quiz_summary (
+                user_id INT NOT NULL,
+                quiz_id VARCHAR(50) NOT NULL,
+                attempts INT NOT NULL DEFAULT 0,
+                best_percentage DECIMAL(5,2) NOT NULL DEFAULT 0,
+                best_score INT NOT NULL DEFAULT 0,
+                total_questions INT NOT NULL DEFAULT 0,
+                passed_at TIMESTAMP NULL,
+                last_best_gain DECIMAL(5,2) NOT NULL DEFAULT 0,
+                first_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, quiz_id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        
+        # Backfill summaries once for databases created before quiz_summary existed
+        cursor.execute("SELECT 1 FROM quiz_summary LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute("""
+                INSERT INTO quiz_summary (user_id, quiz_id, attempts, best_percentage, best_score,
+                                          total_questions, passed_at, first_attempt_at, last_attempt_at)
+                SELECT user_id, quiz_id, COUNT(*), MAX(percentage), MAX(score), MAX(total_questions),
+                       MIN(IF(passed, completed_at, NULL)), MIN(completed_at), MAX(completed_at)
+                FROM quiz_scores
+                GROUP BY user_id, quiz_id
+            """)
+        
         # Create test_results table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS test_results (
@@ -153,6 +183,121 @@ def init_database():
             )
         """)
         
+        # Create analytics rollup tables (see analytics.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_class (
+                class_id VARCHAR(50) PRIMARY KEY,
+                students INT DEFAULT 0,
+                lecture_completions INT DEFAULT 0,
+                quiz_attempts INT DEFAULT 0,
+                quiz_percentage_sum DECIMAL(14,2) DEFAULT 0,
+                quiz_passes INT DEFAULT 0,
+                test_submissions INT DEFAULT 0,
+                test_percentage_sum DECIMAL(14,2) DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_lecture (
+                class_id VARCHAR(50) NOT NULL,
+                lecture_id VARCHAR(100) NOT NULL,
+                students_started INT DEFAULT 0,
+                students_completed INT DEFAULT 0,
+                progress_sum BIGINT DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (class_id, lecture_id)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_quiz (
+                class_id VARCHAR(50) NOT NULL,
+                quiz_id VARCHAR(50) NOT NULL,
+                attempts INT DEFAULT 0,
+                students_attempted INT DEFAULT 0,
+                students_passed INT DEFAULT 0,
+                percentage_sum DECIMAL(14,2) DEFAULT 0,
+                percentage_sq_sum DOUBLE DEFAULT 0,
+                best_percentage_sum DECIMAL(14,2) DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (class_id, quiz_id)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_student (
+                user_id INT PRIMARY KEY,
+                class_id VARCHAR(50),
+                lectures_started INT DEFAULT 0,
+                lectures_completed INT DEFAULT 0,
+                progress_sum BIGINT DEFAULT 0,
+                quiz_attempts INT DEFAULT 0,
+                quizzes_attempted INT DEFAULT 0,
+                quizzes_passed INT DEFAULT 0,
+                quiz_percentage_sum DECIMAL(14,2) DEFAULT 0,
+                best_percentage_sum DECIMAL(14,2) DEFAULT 0,
+                tests_taken INT DEFAULT 0,
+                test_percentage_sum DECIMAL(14,2) DEFAULT 0,
+                last_activity_at TIMESTAMP NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                INDEX idx_class (class_id)
+            )
+        """)
+        
+        # Create lecture search index tables (see search_index.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_documents (
+                lecture_id VARCHAR(100) PRIMARY KEY,
+                title VARCHAR(200) NOT NULL,
+                created_by INT,
+                length INT NOT NULL DEFAULT 0,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_created_by (created_by)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_postings (
+                term VARCHAR(64) NOT NULL,
+                lecture_id VARCHAR(100) NOT NULL,
+                tf INT NOT NULL,
+                title_tf INT NOT NULL DEFAULT 0,
+                positions MEDIUMTEXT NOT NULL,
+                PRIMARY KEY (term, lecture_id),
+                INDEX idx_lecture (lecture_id)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_segments (
+                lecture_id VARCHAR(100) NOT NULL,
+                slide INT NOT NULL,
+                title VARCHAR(200),
+                text MEDIUMTEXT,
+                PRIMARY KEY (lecture_id, slide)
+            )
+        """)
+        
+        # Create test grading tables (see grading.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS test_answer_keys (
+                test_id VARCHAR(50) PRIMARY KEY,
+                answer_key MEDIUMTEXT NOT NULL,
+                created_by INT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS test_grading_queue (
+                result_id INT PRIMARY KEY,
+                test_id VARCHAR(50) NOT NULL,
+                queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (result_id) REFERENCES test_results(id) ON DELETE CASCADE
+            )
+        """)
+        
         connection.commit()
         print("✅ Database initialized successfully!")
         return True
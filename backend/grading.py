@@ -0,0 +1,501 @@
+"""
+Written Test Grading for AetherLearn
+Scores submitted test answers on the server against a teacher's answer key
+
+An answer key per test (test_answer_keys) has, for each question, its marks,
+expected keywords, an optional rubric and a model answer, in the same shape
+as frontend/src/data/tests.json:
+
+    {"id": "test_001", "total_marks": 20, "questions": [
+        {"id": "q1", "marks": 5,
+         "expected_keywords": ["light", "glucose", "oxygen"],
+         "rubric": [{"points": 2, "any": ["light energy", "sunlight"]}],
+         "sample_answer": "Plants use light energy to ..."}]}
+
+A question scores marks * ((1 - GRADING_SIMILARITY_WEIGHT) * coverage +
+GRADING_SIMILARITY_WEIGHT * similarity), where coverage is the rubric points
+earned (or, without a rubric, the share of keywords used) and similarity is
+the TF-IDF cosine to the model answer, full credit from SIMILARITY_FULL.
+Words are stemmed as for search, so "plants" matches the keyword "plant".
+
+Submissions of a test with a key are queued (test_grading_queue) instead of
+trusting a client-side score. A dispatcher thread waits GRADING_BATCH_MS so a
+class finishing together is graded as one batch: per test, every question's
+answers become one sparse (CSR) n-gram count matrix that keyword, rubric and
+TF-IDF scoring read with NumPy, on a process pool off the request threads.
+Its size follows the text graded (answers are capped at TEST_MAX_ANSWER_CHARS),
+not answers x vocabulary. Results, the leaderboard and the analytics rollups
+are then written with bulk statements in one transaction. Rows are claimed by
+deleting them from the queue inside that transaction, so several server
+processes never grade a row twice.
+
+The dispatcher drains the queue when the server starts (app.py's entry point
+calls dispatcher.start()) and looks again every GRADING_RETRY_SECONDS, so a
+failed batch or a restart loses nothing. Each test's batch is its own pool
+task: one that fails stays queued without holding up other tests, and a pool
+whose worker died is replaced.
+
+    python grading.py --import-keys ../frontend/src/data/tests.json
+    python grading.py --regrade test_001
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+from search_index import analyze
+
+MAX_NGRAM = 3           # Longest keyword or rubric phrase, in words
+SIMILARITY_FULL = 0.6   # Cosine to the model answer that earns full similarity credit
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class AnswerKeyError(ValueError):
+    """An answer key cannot be used (missing questions, bad marks or phrases)"""
+
+
+# ==================== ANSWER KEYS ====================
+
+def _phrase(text) -> str:
+    """Stemmed terms of a keyword or rubric phrase, as an n-gram feature"""
+    if not isinstance(text, str):
+        raise AnswerKeyError(f"Phrases must be strings, got {text!r}")
+    terms = [term for term, _ in analyze(text)[0]]
+    if not terms:
+        raise AnswerKeyError(f"Phrase {text!r} has no searchable words")
+    if len(terms) > MAX_NGRAM:
+        raise AnswerKeyError(f"Phrase {text!r} is longer than {MAX_NGRAM} words")
+    return " ".join(terms)
+
+
+def normalize_key(test: dict) -> dict:
+    """
+    Validate an answer key and precompute its phrase features
+
+    Returns:
+        {"testId", "totalMarks", "questions": [{"id", "marks", "keywords",
+        "rubric": [{"points", "any"}], "sampleAnswer"}]}
+    """
+    test_id = test.get("id") or test.get("testId")
+    questions = test.get("questions")
+    if not test_id or not isinstance(questions, list) or not questions:
+        raise AnswerKeyError("Answer key needs an id and a list of questions")
+
+    normalized = []
+    for question in questions:
+        if not isinstance(question, dict) or not question.get("id"):
+            raise AnswerKeyError("Every question needs an id")
+        marks = question.get("marks")
+        if not isinstance(marks, (int, float)) or marks <= 0:
+            raise AnswerKeyError(f"Question {question['id']}: marks must be a positive number")
+        rubric = []
+        for criterion in question.get("rubric") or []:
+            points = criterion.get("points") if isinstance(criterion, dict) else None
+            if not isinstance(points, (int, float)) or points <= 0 or not criterion.get("any"):
+                raise AnswerKeyError(f"Question {question['id']}: rubric criteria need points and 'any' phrases")
+            rubric.append({"points": points, "any": [_phrase(p) for p in criterion["any"]]})
+        normalized.append({
+            "id": str(question["id"]),
+            "marks": marks,
+            "keywords": [_phrase(k) for k in question.get("expected_keywords") or question.get("keywords") or []],
+            "rubric": rubric,
+            "sampleAnswer": question.get("sample_answer") or question.get("sampleAnswer") or ""
+        })
+
+    total_marks = test.get("total_marks") or test.get("totalMarks") or sum(q["marks"] for q in normalized)
+    return {"testId": str(test_id), "totalMarks": total_marks, "questions": normalized}
+
+
+def save_key(cursor, test: dict, created_by: int | None) -> dict:
+    """Store (or replace) a test's answer key; returns the normalized key"""
+    key = normalize_key(test)
+    cursor.execute("""
+        INSERT INTO test_answer_keys (test_id, answer_key, created_by) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE answer_key = VALUES(answer_key), created_by = VALUES(created_by)
+    """, (key["testId"], json.dumps(key), created_by))
+    return key
+
+
+def load_key(cursor, test_id: str) -> dict | None:
+    cursor.execute("SELECT answer_key FROM test_answer_keys WHERE test_id = %s", (test_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return json.loads(row["answer_key"] if isinstance(row, dict) else row[0])
+
+
+# ==================== SCORING ====================
+
+def ngrams(text: str) -> list[str]:
+    """Stemmed words and word n-grams up to MAX_NGRAM of a text"""
+    terms = [term for term, _ in analyze(text)[0]]
+    return [" ".join(terms[i:i + n]) for n in range(1, MAX_NGRAM + 1) for i in range(len(terms) - n + 1)]
+
+
+def score_question(question: dict, answers: list[str], similarity_weight: float):
+    """
+    Marks for one question across a batch of answers
+
+    Returns:
+        float array, one score per answer
+    """
+    import numpy as np
+
+    # One vocabulary and sparse (CSR) count matrix for the batch; the model answer
+    # is the last row. Memory grows with the text graded, not answers x vocabulary.
+    vocabulary = {}
+    indptr, indices, data = [0], [], []
+    for text in answers + [question["sampleAnswer"]]:
+        row = {}
+        for gram in ngrams(text):
+            column = vocabulary.setdefault(gram, len(vocabulary))
+            row[column] = row.get(column, 0) + 1
+        indices += row.keys()
+        data += row.values()
+        indptr.append(len(indices))
+    phrases = question["keywords"] + [p for criterion in question["rubric"] for p in criterion["any"]]
+    for phrase in phrases:
+        vocabulary.setdefault(phrase, len(vocabulary))
+
+    n_rows = len(answers) + 1
+    indices = np.array(indices, dtype=np.intp)
+    counts = np.array(data, dtype=np.float32)
+    row_of = np.repeat(np.arange(n_rows), np.diff(indptr))
+
+    # Dense only over the key's phrases: answers x phrases
+    phrase_columns = sorted({vocabulary[p] for p in phrases})
+    phrase_index = {column: i for i, column in enumerate(phrase_columns)}
+    lookup = np.full(len(vocabulary), -1, dtype=np.intp)
+    lookup[phrase_columns] = np.arange(len(phrase_columns))
+    hits = lookup[indices] >= 0
+    present = np.zeros((n_rows, len(phrase_columns)), dtype=bool)
+    present[row_of[hits], lookup[indices[hits]]] = True
+    present = present[:-1]
+
+    if question["rubric"]:
+        earned = np.zeros(len(answers), dtype=np.float64)
+        for criterion in question["rubric"]:
+            met = present[:, [phrase_index[vocabulary[p]] for p in criterion["any"]]].any(axis=1)
+            earned += met * criterion["points"]
+        coverage = np.minimum(earned / sum(c["points"] for c in question["rubric"]), 1.0)
+    elif question["keywords"]:
+        coverage = present[:, [phrase_index[vocabulary[k]] for k in question["keywords"]]].mean(axis=1)
+    else:
+        coverage = None
+
+    if question["sampleAnswer"].strip() and len(vocabulary):
+        # IDF over the batch: wording the whole class shares counts less than what sets an answer apart
+        document_frequency = np.bincount(indices, minlength=len(vocabulary))
+        idf = np.log((1 + n_rows) / (1 + document_frequency)) + 1
+        weighted = np.log1p(counts) * idf[indices]
+        norms = np.sqrt(np.bincount(row_of, weights=weighted * weighted, minlength=n_rows))
+        model = np.zeros(len(vocabulary))
+        model[indices[indptr[-2]:]] = weighted[indptr[-2]:] / max(norms[-1], 1e-9)
+        dots = np.bincount(row_of, weights=weighted * model[indices], minlength=n_rows)
+        similarity = np.minimum(dots[:-1] / np.maximum(norms[:-1], 1e-9) / SIMILARITY_FULL, 1.0)
+    else:
+        similarity = None
+
+    if coverage is None and similarity is None:
+        return np.zeros(len(answers))
+    if coverage is None:
+        share = similarity
+    elif similarity is None:
+        share = coverage
+    else:
+        share = (1 - similarity_weight) * coverage + similarity_weight * similarity
+    return question["marks"] * np.clip(share, 0.0, 1.0)
+
+
+def answer_text(answers, question_id: str) -> str:
+    if isinstance(answers, dict):
+        value = answers.get(question_id)
+        return value if isinstance(value, str) else ""
+    return ""
+
+
+def grade_batch(key: dict, submissions: list, similarity_weight: float) -> list[float]:
+    """
+    Total marks for each submission of one test (runs on the grading pool)
+
+    Args:
+        key: Normalized answer key
+        submissions: Decoded answers of each submission ({question_id: text})
+    """
+    import numpy as np
+
+    totals = np.zeros(len(submissions))
+    for question in key["questions"]:
+        totals += score_question(question, [answer_text(a, question["id"]) for a in submissions], similarity_weight)
+    return totals.tolist()
+
+
+# ==================== BATCHES ====================
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all grading batches (NumPy work stays off request threads)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=Config.GRADING_WORKERS or os.cpu_count() or 1)
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died (e.g. killed when out of memory); the next batch starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _score_tests(by_test: dict, keys: dict) -> tuple[list, list]:
+    """
+    Grade each test's submissions on the pool, one future per test
+
+    Returns:
+        (grades as _apply_grades takes them, tests that failed and stay queued)
+    """
+    futures = {}
+    for test_id, items in by_test.items():
+        if keys[test_id] is None:
+            continue
+        args = (grade_batch, keys[test_id], [answers for _, _, answers in items], Config.GRADING_SIMILARITY_WEIGHT)
+        pool = _get_pool()
+        try:
+            futures[test_id] = pool, pool.submit(*args)
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            pool = _get_pool()
+            futures[test_id] = pool, pool.submit(*args)
+
+    grades, failed = [], []
+    for test_id, (pool, future) in futures.items():
+        try:
+            scores = future.result()
+        except BrokenProcessPool as e:
+            _reset_pool(pool)
+            print(f"[Grading] ⚠ Grading process died on {test_id}, starting a new pool: {e}")
+            failed.append(test_id)
+            continue
+        except Exception as e:
+            print(f"[Grading] ⚠ Could not grade {test_id}, will retry within {Config.GRADING_RETRY_SECONDS:g} s: {e}")
+            failed.append(test_id)
+            continue
+        total_marks = keys[test_id]["totalMarks"]
+        grades += [(result_id, user_id, test_id, score, total_marks)
+                   for (result_id, user_id, _), score in zip(by_test[test_id], scores)]
+    return grades, failed
+
+
+def enqueue(cursor, result_id: int, test_id: str):
+    cursor.execute("INSERT IGNORE INTO test_grading_queue (result_id, test_id) VALUES (%s, %s)",
+                   (result_id, test_id))
+
+
+def requeue_test(cursor, test_id: str) -> int:
+    """Queue every stored submission of a test, e.g. after its key changed"""
+    cursor.execute("""
+        INSERT IGNORE INTO test_grading_queue (result_id, test_id)
+        SELECT id, test_id FROM test_results WHERE test_id = %s
+    """, (test_id,))
+    return cursor.rowcount
+
+
+def _apply_grades(cursor, grades: list[tuple[int, int, str, float, float]]) -> list[int] | None:
+    """
+    Write one batch of grades: results, leaderboard and analytics, in bulk
+
+    Args:
+        grades: (result_id, user_id, test_id, score, total_marks)
+
+    Returns:
+        Users whose totals changed, or None if another process claimed
+        part of the batch first (the caller rolls back and retries)
+    """
+    import analytics
+
+    result_ids = [g[0] for g in grades]
+    marks = ", ".join(["%s"] * len(result_ids))
+    cursor.execute(f"DELETE FROM test_grading_queue WHERE result_id IN ({marks})", result_ids)
+    if cursor.rowcount != len(result_ids):
+        return None
+
+    # Read after the claim: a regrade replaces an earlier percentage instead of adding to it
+    cursor.execute(f"SELECT id, percentage FROM test_results WHERE id IN ({marks})", result_ids)
+    previous = {row[0]: row[1] for row in cursor.fetchall()}
+
+    updates, per_user = [], {}
+    for result_id, user_id, _, score, total_marks in grades:
+        if result_id not in previous:
+            continue  # Deleted while being graded
+        percentage = round(score / total_marks * 100, 2) if total_marks else 0
+        updates.append((round(score), total_marks, percentage, result_id))
+        old = previous[result_id]
+        entry = per_user.setdefault(user_id, [0, 0, 0.0])  # tests, score delta, percentage delta
+        entry[0] += old is None
+        entry[1] += int(percentage) - int(old or 0)
+        entry[2] += percentage - float(old or 0)
+
+    cursor.executemany("""
+        UPDATE test_results SET ai_score = %s, total_marks = %s, percentage = %s WHERE id = %s
+    """, updates)
+    cursor.executemany("""
+        INSERT INTO leaderboard (user_id, tests_completed, total_score) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            tests_completed = tests_completed + VALUES(tests_completed),
+            total_score = total_score + VALUES(total_score)
+    """, [(user_id, tests, delta) for user_id, (tests, delta, _) in per_user.items()])
+    analytics.record_test_grades(cursor, [(user_id, tests, delta) for user_id, (tests, _, delta) in per_user.items()])
+    return list(per_user)
+
+
+def grade_pending(limit: int | None = None) -> int:
+    """
+    Grade queued submissions in batches until the queue is empty
+
+    Returns:
+        Number of submissions graded
+    """
+    import live_updates
+    from database import get_db_connection
+    from progress_service import progress_cache
+
+    batch_size = limit or Config.GRADING_BATCH_SIZE
+    graded = 0
+    failed = []  # Tests skipped for the rest of this pass so they cannot hold up the queue
+    while True:
+        conn = get_db_connection()
+        if not conn:
+            print("[Grading] ⚠ Database connection failed; queued submissions stay queued")
+            return graded
+        cursor = conn.cursor()
+        try:
+            skip = f"WHERE q.test_id NOT IN ({', '.join(['%s'] * len(failed))})" if failed else ""
+            cursor.execute(f"""
+                SELECT q.result_id, r.user_id, q.test_id, r.answers
+                FROM test_grading_queue q JOIN test_results r ON r.id = q.result_id
+                {skip} ORDER BY q.result_id LIMIT %s
+            """, (*failed, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                conn.commit()
+                return graded
+
+            by_test = {}
+            for result_id, user_id, test_id, answers in rows:
+                by_test.setdefault(test_id, []).append((result_id, user_id, json.loads(answers)))
+            keys = {test_id: load_key(cursor, test_id) for test_id in by_test}
+            conn.commit()  # Do not hold a read transaction while grading
+
+            grades, failed_now = _score_tests(by_test, keys)
+            failed += failed_now
+            # A key deleted after queueing: nothing to grade against, leave the client's row alone
+            orphaned = [result_id for test_id, items in by_test.items() if keys[test_id] is None
+                        for result_id, _, _ in items]
+            if orphaned:
+                marks = ", ".join(["%s"] * len(orphaned))
+                cursor.execute(f"DELETE FROM test_grading_queue WHERE result_id IN ({marks})", orphaned)
+
+            users = _apply_grades(cursor, grades) if grades else []
+            if users is None:
+                conn.rollback()
+                continue
+            changes = [live_updates.read_change(cursor, user_id) for user_id in users]
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"[Grading] ⚠ Batch failed, will retry within {Config.GRADING_RETRY_SECONDS:g} s: {e}")
+            return graded
+        finally:
+            cursor.close()
+            conn.close()
+
+        for user_id, change in zip(users, changes):
+            progress_cache.invalidate(user_id)
+            live_updates.publish_score(change)
+        graded += len(grades)
+        if grades:
+            print(f"[Grading] ✓ Graded {len(grades)} submissions of {len({g[2] for g in grades})} tests")
+
+
+class GradingDispatcher:
+    """Background thread that grades the queue a short while after submissions arrive"""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the thread; its first pass grades whatever an earlier run left queued"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="grading", daemon=True)
+                self._thread.start()
+
+    def notify(self):
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            # Let the rest of the class's submissions arrive, then grade them together
+            time.sleep(Config.GRADING_BATCH_MS / 1000)
+            self._wake.clear()
+            grade_pending()
+            # Without new submissions, look again later so a failed batch is retried
+            self._wake.wait(Config.GRADING_RETRY_SECONDS)
+
+
+dispatcher = GradingDispatcher()
+
+
+# ==================== CLI INTERFACE ====================
+
+def main():
+    """CLI for loading answer keys and regrading"""
+    import argparse
+    from database import get_db_connection
+
+    parser = argparse.ArgumentParser(description="AetherLearn written test grading")
+    parser.add_argument("--import-keys", metavar="TESTS_JSON", help="Store answer keys from a tests.json file")
+    parser.add_argument("--regrade", metavar="TEST_ID", help="Grade every stored submission of a test again")
+    parser.add_argument("--pending", action="store_true", help="Grade everything queued")
+    args = parser.parse_args()
+
+    if not (args.import_keys or args.regrade or args.pending):
+        parser.print_help()
+        return
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if args.import_keys:
+            with open(args.import_keys, "r", encoding="utf-8") as f:
+                tests = json.load(f)
+            for test in tests.get("tests", tests if isinstance(tests, list) else []):
+                key = save_key(cursor, test, None)
+                print(f"✓ {key['testId']}: {len(key['questions'])} questions, {key['totalMarks']} marks")
+        if args.regrade:
+            print(f"✓ Queued {requeue_test(cursor, args.regrade)} submissions of {args.regrade}")
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if args.regrade or args.pending:
+        start = time.perf_counter()
+        graded = grade_pending()
+        print(f"✓ Graded {graded} submissions in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Request Instrumentation for AetherLearn
+Per-route latency histograms, SQL query counting/timing and a slow-query log
+
+Every connection from get_db_connection() is wrapped so each cursor.execute()
+is counted and timed against the current request. After the request the
+totals are recorded per route and returned to the client in the
+X-Query-Count and Server-Timing headers. /api/metrics serves everything in
+Prometheus text format to requests carrying `Authorization: Bearer
+<METRICS_TOKEN>`; without METRICS_TOKEN the endpoint is not registered.
+
+Overhead is two perf_counter() calls per statement and one short lock per
+request, so it is meant to stay on in production.
+
+Usage:
+    from instrumentation import init_app
+    init_app(app)
+"""
+
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, jsonify, request
+
+from config import Config
+
+# Prometheus default buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_query_log = logging.getLogger("aetherlearn.slow_query")
+
+
+# ==================== METRICS REGISTRY ====================
+
+class _Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe store of per-route request and query metrics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}        # (method, route) -> _Histogram
+        self.responses = {}      # (method, route, status) -> count
+        self.queries = {}        # (method, route) -> [count, seconds]
+        self.slow_queries = 0
+
+    def record_request(self, method, route, status, seconds, query_count, query_seconds):
+        key = (method, route)
+        with self.lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = _Histogram()
+            histogram.observe(seconds)
+
+            status_key = (method, route, status)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+            totals = self.queries.setdefault(key, [0, 0.0])
+            totals[0] += query_count
+            totals[1] += query_seconds
+
+    def record_slow_query(self):
+        with self.lock:
+            self.slow_queries += 1
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP aetherlearn_request_duration_seconds Request latency by route",
+            "# TYPE aetherlearn_request_duration_seconds histogram"
+        ]
+        with self.lock:
+            for (method, route), histogram in sorted(self.latency.items()):
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'aetherlearn_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'aetherlearn_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"aetherlearn_request_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"aetherlearn_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            lines.append("# HELP aetherlearn_responses_total Responses by route and status")
+            lines.append("# TYPE aetherlearn_responses_total counter")
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f'aetherlearn_responses_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            lines.append("# HELP aetherlearn_db_queries_total SQL statements executed by route")
+            lines.append("# TYPE aetherlearn_db_queries_total counter")
+            for (method, route), (count, _) in sorted(self.queries.items()):
+                lines.append(f'aetherlearn_db_queries_total{{method="{method}",route="{route}"}} {count}')
+
+            lines.append("# HELP aetherlearn_db_query_seconds_total Time spent in SQL by route")
+            lines.append("# TYPE aetherlearn_db_query_seconds_total counter")
+            for (method, route), (_, seconds) in sorted(self.queries.items()):
+                lines.append(f'aetherlearn_db_query_seconds_total{{method="{method}",route="{route}"}} {seconds:.6f}')
+
+            lines.append("# HELP aetherlearn_slow_queries_total SQL statements slower than SLOW_QUERY_MS")
+            lines.append("# TYPE aetherlearn_slow_queries_total counter")
+            lines.append(f"aetherlearn_slow_queries_total {self.slow_queries}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# ==================== SQL INSTRUMENTATION ====================
+
+def redact_params(params):
+    """Describe query parameters without their values (e.g. ['str', 'int'])"""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def _record_query(statement, params, seconds):
+    if has_request_context():
+        g.query_count = g.get("query_count", 0) + 1
+        g.query_seconds = g.get("query_seconds", 0.0) + seconds
+
+    if seconds * 1000 >= Config.SLOW_QUERY_MS:
+        metrics.record_slow_query()
+        route = request.url_rule.rule if has_request_context() and request.url_rule else "-"
+        slow_query_log.warning(
+            "Slow query (%.1f ms) on %s: %s params=%s",
+            seconds * 1000, route, " ".join(str(statement).split()), redact_params(params)
+        )
+
+
+class InstrumentedCursor:
+    """Cursor proxy that counts and times every statement"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, statement, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(statement, params, *args, **kwargs)
+        finally:
+            _record_query(statement, params, time.perf_counter() - start)
+
+    def executemany(self, statement, seq_params, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(statement, seq_params, *args, **kwargs)
+        finally:
+            _record_query(statement, None, time.perf_counter() - start)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are InstrumentedCursors"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def instrument_connection(connection):
+    """Wrap a DB-API connection if metrics are enabled"""
+    if connection is None or not Config.METRICS_ENABLED:
+        return connection
+    return InstrumentedConnection(connection)
+
+
+# ==================== FLASK HOOKS ====================
+
+def _before_request():
+    g.request_start = time.perf_counter()
+    g.query_count = 0
+    g.query_seconds = 0.0
+
+
+def _after_request(response):
+    start = g.get("request_start")
+    if start is None:
+        return response
+
+    seconds = time.perf_counter() - start
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    query_count = g.get("query_count", 0)
+    query_seconds = g.get("query_seconds", 0.0)
+
+    metrics.record_request(request.method, route, response.status_code,
+                           seconds, query_count, query_seconds)
+
+    response.headers["X-Query-Count"] = str(query_count)
+    response.headers["Server-Timing"] = (
+        f"db;desc=\"{query_count} queries\";dur={query_seconds * 1000:.1f}, "
+        f"app;dur={seconds * 1000:.1f}"
+    )
+    return response
+
+
+def metrics_endpoint():
+    """Prometheus scrape endpoint (METRICS_TOKEN as a bearer token)"""
+    header = request.headers.get("Authorization", "")
+    if not (header.startswith("Bearer ")
+            and hmac.compare_digest(header[7:].encode(), Config.METRICS_TOKEN.encode())):
+        return jsonify({"error": "Metrics token is missing or invalid"}), 401
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Register request hooks, and /api/metrics if METRICS_TOKEN is set, on the Flask app"""
+    if not Config.METRICS_ENABLED:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    # Client addresses say nothing behind a reverse proxy, so there is no unauthenticated mode
+    if Config.METRICS_TOKEN:
+        app.add_url_rule("/api/metrics", "metrics", metrics_endpoint, methods=["GET"])
@@ -6,7 +6,6 @@ Generates audio (using KokoroTTS) and slides (SVG) for 3D classroom lectures
 import os
 import sys
 import json
-import re
 from pathlib import Path
 from datetime import datetime
 import uuid
@@ -15,7 +14,11 @@ import uuid
 KOKORO_PATH = Path(__file__).parent.parent / "KokoroTTS"
 sys.path.insert(0, str(KOKORO_PATH))
 
-from tts_engine import KokoroTTS
+# tts_engine/audio_processing (NumPy, kokoro_onnx) are imported by LectureGenerator
+# on first use, so importing this module stays cheap for API-only processes
+from captions import compact_timing, write_webvtt
+from retrieval import build_index
+from script_parser import ANIMATION_CUES, ScriptParseError, parse_script
 
 # ==================== CONSTANTS ====================
 
@@ -32,18 +35,38 @@ VOICES = {
     }
 }
 
-ANIMATION_CUES = {
-    "[POINT]": "PointToBoard",      # Point at the whiteboard
-    "[GESTURE]": "Gesture",          # Hand gesture while explaining
-    "[THINK]": "Thinking",           # Thoughtful pose
-    "[NOD]": "Nod",                  # Nodding agreement
-    "[WAVE]": "Wave",                # Greeting wave
-    "[IDLE]": "Idle"                 # Return to idle
-}
-
 # Default output directory (relative to frontend/public)
 OUTPUT_BASE = Path(__file__).parent.parent / "frontend" / "public" / "lectures"
 
+# Phonemes of previously generated lectures, reused across runs
+PHONEME_CACHE_PATH = KOKORO_PATH / "phoneme_cache.json"
+
+
+def tts_profile(**overrides) -> dict:
+    """Inference profile settings from Config (see KokoroTTS/inference_profiles.py)"""
+    from config import Config
+    
+    profile = {
+        "name": Config.TTS_PROFILE,
+        "intra_op_threads": Config.TTS_INTRA_OP_THREADS or None,
+        "inter_op_threads": Config.TTS_INTER_OP_THREADS,
+        "graph_optimization": Config.TTS_GRAPH_OPTIMIZATION
+    }
+    profile.update(overrides)
+    return profile
+
+
+def resolve_voice(voice: str) -> str:
+    """Resolve a voice name (liam, sarah, ...) to a Kokoro voice ID"""
+    voice_lower = voice.lower()
+    if voice_lower in VOICES["male"]:
+        return VOICES["male"][voice_lower]
+    if voice_lower in VOICES["female"]:
+        return VOICES["female"][voice_lower]
+    # Try direct voice ID
+    return voice
+
+
 # ==================== SLIDE GENERATOR ====================
 
 def generate_slide_svg(
@@ -141,6 +164,63 @@ def generate_slide_svg(
     return svg
 
 
+def write_slides(
+    slides_dir: Path,
+    segments: list[dict],
+    theme: str = "dark",
+    accent_color: str = "#6366f1"
+) -> list[Path]:
+    """
+    Render and save one SVG per parsed segment (slide1.svg, slide2.svg, ...)
+    
+    Returns:
+        List of written slide paths
+    """
+    total_slides = len(segments)
+    paths = []
+    for i, segment in enumerate(segments):
+        slide_num = i + 1
+        slide_svg = generate_slide_svg(
+            title=segment["slide"]["title"],
+            content=segment["slide"]["content"],
+            slide_number=slide_num,
+            total_slides=total_slides,
+            theme=theme,
+            accent_color=accent_color
+        )
+        slide_path = slides_dir / f"slide{slide_num}.svg"
+        with open(slide_path, "w", encoding="utf-8") as f:
+            f.write(slide_svg)
+        paths.append(slide_path)
+    return paths
+
+
+def segment_metadata(lecture_id: str, slide_num: int, segment: dict, has_audio: bool,
+                     timing: list[dict] | None = None) -> dict:
+    """
+    Build the lecture.json entry for one segment
+    
+    timing: Chunk timings reported by KokoroTTS.save (see captions.py)
+    """
+    return {
+        "index": slide_num,
+        "slide": {
+            "title": segment["slide"]["title"],
+            "content": segment["slide"]["content"],
+            "path": f"/lectures/{lecture_id}/slides/slide{slide_num}.svg"
+        },
+        "audio": {
+            "path": f"/lectures/{lecture_id}/audio/audio{slide_num}.wav" if has_audio else None,
+            "text": segment["speech_clean"]
+        },
+        "captions": {
+            "path": f"/lectures/{lecture_id}/captions/caption{slide_num}.vtt",
+            "timing": compact_timing(timing)
+        } if timing else None,
+        "animations": segment["animations"]
+    }
+
+
 def escape_xml(text: str) -> str:
     """Escape special XML characters"""
     return (text
@@ -158,26 +238,26 @@ class LectureGenerator:
     Generate complete lectures with audio and slides
     """
     
-    def __init__(self, voice: str = "liam", speed: float = 0.95):
+    def __init__(self, voice: str = "liam", speed: float = 0.95, low_bandwidth: bool = False, tts=None,
+                 profile=None):
         """
         Initialize the lecture generator
         
         Args:
             voice: Voice name (michael, adam, liam, sarah, nicole, sky)
             speed: Speech speed (0.5-2.0)
+            low_bandwidth: Resample audio to 16 kHz for bandwidth-constrained devices
+            tts: Shared KokoroTTS instance (default: load a new one)
+            profile: Inference profile for a new KokoroTTS (default: from Config)
         """
-        self.tts = KokoroTTS()
-        self.speed = speed
+        from tts_engine import KokoroTTS
+        from audio_processing import AudioPostProcessor, LOW_BANDWIDTH_RATE
         
-        # Resolve voice name to voice ID
-        voice_lower = voice.lower()
-        if voice_lower in VOICES["male"]:
-            self.voice_id = VOICES["male"][voice_lower]
-        elif voice_lower in VOICES["female"]:
-            self.voice_id = VOICES["female"][voice_lower]
-        else:
-            # Try direct voice ID
-            self.voice_id = voice
+        sample_rate = LOW_BANDWIDTH_RATE if low_bandwidth else None
+        self.postprocessor = AudioPostProcessor(target_sample_rate=sample_rate)
+        self.tts = tts or KokoroTTS(phoneme_cache_path=PHONEME_CACHE_PATH, profile=profile or tts_profile())
+        self.speed = speed
+        self.voice_id = resolve_voice(voice)
         
         print(f"[LectureGenerator] Initialized with voice: {self.voice_id}")
     
@@ -194,68 +274,10 @@ class LectureGenerator:
         SPEECH: The narration text goes here. [POINT] As you can see on the board...
         ---
         
-        Returns list of segments with slide content, speech, and animation cues
+        Returns list of segments with slide content, speech, and animation cues.
+        Raises ScriptParseError (with line/column) on malformed scripts.
         """
-        segments = []
-        
-        # Split by --- dividers or double newlines
-        raw_segments = re.split(r'\n---+\n|\n\n\n+', script.strip())
-        
-        for seg in raw_segments:
-            if not seg.strip():
-                continue
-            
-            segment = {
-                "slide": {"title": "", "content": []},
-                "speech": "",
-                "animations": []
-            }
-            
-            lines = seg.strip().split('\n')
-            current_section = None
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check for section headers
-                if line.upper().startswith("SLIDE:"):
-                    current_section = "slide"
-                    segment["slide"]["title"] = line[6:].strip()
-                elif line.upper().startswith("SPEECH:"):
-                    current_section = "speech"
-                    speech_text = line[7:].strip()
-                    if speech_text:
-                        segment["speech"] = speech_text
-                elif current_section == "slide":
-                    # Add to slide content
-                    segment["slide"]["content"].append(line)
-                elif current_section == "speech":
-                    # Append to speech
-                    segment["speech"] += " " + line if segment["speech"] else line
-            
-            # Extract animation cues from speech
-            for cue, anim_name in ANIMATION_CUES.items():
-                if cue in segment["speech"]:
-                    # Find position (rough timing based on text position)
-                    pos = segment["speech"].find(cue)
-                    ratio = pos / len(segment["speech"]) if segment["speech"] else 0
-                    segment["animations"].append({
-                        "animation": anim_name,
-                        "timing": ratio  # 0-1 representing position in audio
-                    })
-            
-            # Clean animation cues from speech text (for TTS)
-            clean_speech = segment["speech"]
-            for cue in ANIMATION_CUES.keys():
-                clean_speech = clean_speech.replace(cue, "")
-            segment["speech_clean"] = clean_speech.strip()
-            
-            if segment["slide"]["title"] or segment["speech"]:
-                segments.append(segment)
-        
-        return segments
+        return parse_script(script)
     
     def generate_lecture(
         self,
@@ -289,8 +311,10 @@ class LectureGenerator:
         
         slides_dir = output_dir / "slides"
         audio_dir = output_dir / "audio"
+        captions_dir = output_dir / "captions"
         slides_dir.mkdir(exist_ok=True)
         audio_dir.mkdir(exist_ok=True)
+        captions_dir.mkdir(exist_ok=True)
         
         # Parse script
         segments = self.parse_script(script)
@@ -309,54 +333,38 @@ class LectureGenerator:
             "segments": []
         }
         
+        slide_paths = write_slides(slides_dir, segments, theme, accent_color)
+        
         for i, segment in enumerate(segments):
             slide_num = i + 1
             print(f"[{slide_num}/{total_slides}] {segment['slide']['title']}")
-            
-            # Generate slide SVG
-            slide_svg = generate_slide_svg(
-                title=segment["slide"]["title"],
-                content=segment["slide"]["content"],
-                slide_number=slide_num,
-                total_slides=total_slides,
-                theme=theme,
-                accent_color=accent_color
-            )
-            
-            slide_path = slides_dir / f"slide{slide_num}.svg"
-            with open(slide_path, "w", encoding="utf-8") as f:
-                f.write(slide_svg)
-            print(f"  ✓ Slide saved: {slide_path.name}")
+            print(f"  ✓ Slide saved: {slide_paths[i].name}")
             
             # Generate audio
             audio_path = audio_dir / f"audio{slide_num}.wav"
+            timing = []
             if segment["speech_clean"]:
                 self.tts.save(
                     text=segment["speech_clean"],
                     output_path=str(audio_path),
                     voice=self.voice_id,
-                    speed=self.speed
+                    speed=self.speed,
+                    postprocessor=self.postprocessor,
+                    timing=timing
                 )
                 audio_size = os.path.getsize(audio_path) / 1024
                 print(f"  ✓ Audio saved: {audio_path.name} ({audio_size:.1f} KB)")
+                
+                # Captions come straight from the chunk offsets of synthesis
+                write_webvtt(captions_dir / f"caption{slide_num}.vtt", timing)
             else:
                 print(f"  ⚠ No speech for this segment")
                 audio_path = None
             
             # Add segment data
-            segment_data = {
-                "index": slide_num,
-                "slide": {
-                    "title": segment["slide"]["title"],
-                    "path": f"/lectures/{lecture_id}/slides/slide{slide_num}.svg"
-                },
-                "audio": {
-                    "path": f"/lectures/{lecture_id}/audio/audio{slide_num}.wav" if audio_path else None,
-                    "text": segment["speech_clean"]
-                },
-                "animations": segment["animations"]
-            }
-            lecture_data["segments"].append(segment_data)
+            lecture_data["segments"].append(
+                segment_metadata(lecture_id, slide_num, segment, audio_path is not None, timing)
+            )
         
         # Save lecture metadata
         metadata_path = output_dir / "lecture.json"
@@ -364,6 +372,12 @@ class LectureGenerator:
             json.dump(lecture_data, f, indent=2)
         print(f"\n✓ Metadata saved: {metadata_path}")
         
+        # Passage index for questions about this lecture (see retrieval.py)
+        passage_count = build_index(lecture_data, output_dir)
+        print(f"✓ Passage index saved: {passage_count} passages")
+        
+        self.tts.save_phoneme_cache()
+        
         print(f"\n{'='*60}")
         print(f"Lecture Generated Successfully!")
         print(f"Output: {output_dir}")
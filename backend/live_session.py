@@ -0,0 +1,288 @@
+"""
+Live Classroom Sessions for AetherLearn
+A teacher drives one lecture for the whole room: play, pause and slide
+changes reach every joined device over one Server-Sent Events connection
+
+Timing: the state carries server timestamps, never "now". A play command
+is scheduled SESSION_LEAD_MS ahead (startAt), so devices that receive it
+tens of milliseconds apart still start together. Each device estimates its
+clock offset from GET /api/sessions/clock (several samples, keep the one
+with the lowest round trip; offset = serverTime - midpoint) and plays
+slide `slide` from
+
+    position + (serverNow - startAt) / 1000       when playing
+
+Prefetch plan: the session carries every slide's assets and duration.
+Each device gets a slot when it joins and is told when to fetch the next
+slide's assets: a different point in the first SESSION_PREFETCH_FRACTION
+of the current slide, spread by the golden ratio so any number of devices
+stays evenly spaced. A room of 40 devices therefore pulls the next slide
+over the hotspot a few at a time instead of all at the slide change.
+
+Sessions live in process memory. With several server processes, state
+changes are relayed through the live_updates broker (LIVE_BROKER_ADDRESS)
+like leaderboard updates; devices may be connected to any process. A
+process started after a session began does not know it until the
+teacher's next command.
+"""
+
+import json
+import secrets
+import threading
+import time
+import wave
+from pathlib import Path
+
+import live_updates
+from config import Config
+
+GOLDEN_RATIO = 0.6180339887
+IDLE_SECONDS = 6 * 3600      # Sessions without any change for this long are dropped
+WORDS_PER_SECOND = 2.5       # Duration estimate for slides without audio timing
+
+ACTIONS = ("play", "pause", "seek", "slide", "end")
+
+
+def server_time_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# ==================== PREFETCH PLAN ====================
+
+def _slide_duration(lecture_dir: Path, segment: dict) -> float:
+    """Seconds of a segment's audio: caption timing, else the WAV header, else a word-count estimate"""
+    timing = (segment.get("captions") or {}).get("timing")
+    if timing:
+        return timing[-1][1] / 1000
+    audio_path = lecture_dir / "audio" / f"audio{segment['index']}.wav"
+    if audio_path.exists():
+        try:
+            with wave.open(str(audio_path), "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError):
+            pass
+    return len(((segment.get("audio") or {}).get("text") or "").split()) / WORDS_PER_SECOND
+
+
+def build_plan(lecture_dir) -> list[dict]:
+    """[{slide, duration, assets}, ...] from a lecture's lecture.json"""
+    lecture_dir = Path(lecture_dir)
+    with open(lecture_dir / "lecture.json", "r", encoding="utf-8") as f:
+        lecture = json.load(f)
+    plan = []
+    for segment in lecture.get("segments", []):
+        assets = [segment["slide"]["path"], (segment.get("audio") or {}).get("path"),
+                  (segment.get("captions") or {}).get("path")]
+        plan.append({
+            "slide": segment["index"],
+            "duration": round(_slide_duration(lecture_dir, segment), 3),
+            "assets": [asset for asset in assets if asset]
+        })
+    return plan
+
+
+def prefetch_time(state: dict, plan: list[dict], slot: int, now_ms: int) -> int | None:
+    """Server time at which the device in `slot` should fetch the slide after the current one"""
+    if state["slide"] >= len(plan):
+        return None
+    duration = plan[state["slide"] - 1]["duration"]
+    remaining = max(0.0, duration - state["position"])
+    window_ms = remaining * Config.SESSION_PREFETCH_FRACTION * 1000
+    base = state["startAt"] if state["playing"] else now_ms
+    return int(max(base, now_ms) + (slot * GOLDEN_RATIO) % 1 * window_ms)
+
+
+# ==================== SESSIONS ====================
+
+class Session:
+    """One teacher-driven lecture; streams wait on `changed` for a new version"""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.changed = threading.Condition()
+        self.version = 0
+        self.joined = 0
+        self.updated = time.monotonic()
+
+    @property
+    def ended(self) -> bool:
+        return self.data["ended"]
+
+    def replace(self, data: dict):
+        with self.changed:
+            # Last writer wins across processes: states are ordered by their server timestamp
+            if data["state"]["at"] < self.data["state"]["at"]:
+                return
+            self.data = data
+            self.version += 1
+            self.updated = time.monotonic()
+            self.changed.notify_all()
+
+    def next_slot(self) -> int:
+        with self.changed:
+            slot = self.joined
+            self.joined += 1
+            return slot
+
+
+class SessionRegistry:
+    """Sessions of this process, by id and by class"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def get(self, session_id: str) -> Session | None:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def for_class(self, class_id: str) -> Session | None:
+        """The class's running session, if any"""
+        with self._lock:
+            running = [s for s in self._sessions.values() if s.data["classId"] == class_id and not s.ended]
+        return max(running, key=lambda s: s.data["createdAt"], default=None)
+
+    def apply(self, event: dict):
+        """Create or update a session from a published state (this or another process)"""
+        data = event["session"]
+        with self._lock:
+            cutoff = time.monotonic() - IDLE_SECONDS
+            for session_id in [k for k, s in self._sessions.items() if s.updated < cutoff]:
+                del self._sessions[session_id]
+            session = self._sessions.get(data["id"])
+            if session is None:
+                self._sessions[data["id"]] = Session(data)
+                return
+        session.replace(data)
+
+
+registry = SessionRegistry()
+live_updates.hub.handlers["session"] = registry.apply
+# Listen from startup: a session started on another process must be known here before any device asks
+live_updates.hub.ensure_broker()
+
+
+def _publish(data: dict):
+    live_updates.hub.publish({"type": "session", "session": data})
+
+
+def create_session(lecture_id: str, lecture_dir, class_id: str, teacher_id: int) -> dict:
+    """
+    Start a session for a class, ending the class's previous one
+
+    Returns:
+        Session data: id, lectureId, classId, teacherId, plan, state, ended
+    """
+    previous = registry.for_class(class_id)
+    if previous is not None:
+        control(previous, "end")
+
+    now = server_time_ms()
+    data = {
+        "id": secrets.token_urlsafe(8),
+        "lectureId": lecture_id,
+        "classId": class_id,
+        "teacherId": teacher_id,
+        "createdAt": now,
+        "plan": build_plan(lecture_dir),
+        "state": {"playing": False, "slide": 1, "position": 0.0, "startAt": now, "at": now},
+        "ended": False
+    }
+    _publish(data)
+    return data
+
+
+def current_position(state: dict, now_ms: int) -> float:
+    """Seconds into the current slide at server time now_ms"""
+    if state["playing"] and now_ms > state["startAt"]:
+        return state["position"] + (now_ms - state["startAt"]) / 1000
+    return state["position"]
+
+
+def control(session: Session, action: str, slide: int | None = None, position: float | None = None) -> dict:
+    """
+    Apply a teacher command and broadcast the new state
+
+    Args:
+        action: play, pause, seek (slide and/or position), slide (slide, from its start) or end
+        slide: 1-based slide number
+        position: Seconds into the slide
+
+    Returns:
+        The new state
+    """
+    data = dict(session.data)
+    state = dict(data["state"])
+    now = server_time_ms()
+    plan_length = len(data["plan"])
+    if slide is not None and not 1 <= slide <= plan_length:
+        raise ValueError(f"Slide must be between 1 and {plan_length}")
+    if position is not None and position < 0:
+        raise ValueError("Position must not be negative")
+
+    if action == "play":
+        state["position"] = current_position(state, now) if position is None else position
+        state["playing"] = True
+    elif action == "pause":
+        state["position"] = current_position(state, now) if position is None else position
+        state["playing"] = False
+    elif action in ("seek", "slide"):
+        state["slide"] = slide if slide is not None else state["slide"]
+        state["position"] = 0.0 if action == "slide" else (position if position is not None
+                                                           else current_position(state, now))
+    elif action == "end":
+        state["playing"] = False
+        data["ended"] = True
+    else:
+        raise ValueError(f"Action must be one of: {', '.join(ACTIONS)}")
+
+    # Everyone starts together a little in the future instead of whenever the event arrives
+    state["startAt"] = now + Config.SESSION_LEAD_MS if state["playing"] else now
+    state["at"] = now
+    data["state"] = state
+    _publish(data)
+    return state
+
+
+# ==================== STREAMING ====================
+
+def _device_events(data: dict, slot: int) -> list[dict]:
+    now = server_time_ms()
+    state = data["state"]
+    events = [{"type": "state", "serverTime": now, **state}]
+    at = prefetch_time(state, data["plan"], slot, now)
+    if at is not None:
+        upcoming = data["plan"][state["slide"]]
+        events.append({"type": "prefetch", "slide": upcoming["slide"], "assets": upcoming["assets"], "at": at})
+    if data["ended"]:
+        events.append({"type": "end"})
+    return events
+
+
+def stream_session(session: Session):
+    """SSE body for one device: session info, then the latest state after every change"""
+    live_updates.hub.ensure_broker()
+    slot = session.next_slot()
+    data = session.data
+    yield f"retry: {live_updates.HEARTBEAT_SECONDS * 1000}\n\n"
+    yield live_updates.format_event({
+        "type": "session", "id": data["id"], "lectureId": data["lectureId"], "classId": data["classId"],
+        "slot": slot, "plan": data["plan"], "leadMs": Config.SESSION_LEAD_MS
+    })
+
+    version = -1
+    while True:
+        with session.changed:
+            # Only the newest state is sent: a slow device skips the ones it missed
+            session.changed.wait_for(lambda: session.version != version, timeout=live_updates.HEARTBEAT_SECONDS)
+            if session.version == version:
+                data = None
+            else:
+                version, data = session.version, session.data
+        if data is None:
+            yield ": ping\n\n"
+            continue
+        for event in _device_events(data, slot):
+            yield live_updates.format_event(event)
+        if data["ended"]:
+            return
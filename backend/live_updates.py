@@ -0,0 +1,516 @@
+"""
+Live Class Updates for AetherLearn
+Pushes leaderboard rank changes and lecture progress to a class over
+Server-Sent Events, so devices stop polling /api/leaderboard and /api/progress
+
+Routes that change scores publish the student's new totals after commit.
+The hub keeps each watched class's standings in memory and, at most every
+LIVE_COALESCE_MS, turns everything published since the last flush into one
+event per class:
+
+    event: snapshot     full standings, sent on connect and after a resync
+    event: ranks        students whose score or rank changed, with previousRank
+    event: progress     latest lecture progress per (student, lecture);
+                        teachers get the whole class, students only their own
+
+Ten submissions in the same window cost one rank computation and one event.
+
+Backpressure: publishing never blocks. Each subscriber has a queue of at
+most LIVE_QUEUE_EVENTS events; a client that falls further behind has its
+queue dropped and gets a fresh snapshot when it next reads, so a stalled
+device costs a bounded amount of memory and never delays the others.
+
+Several server processes: each process has its own hub, so a submission
+handled by one process must reach devices connected to another. Run the
+broker once per machine and point every process at it:
+
+    python live_updates.py --broker             # listens on LIVE_BROKER_ADDRESS
+
+Processes relay what they publish through the broker (multiprocessing
+connections, authenticated with JWT_SECRET_KEY) and deliver what the others
+publish to their own subscribers. Without LIVE_BROKER_ADDRESS, updates stay
+within the process that handled the write. A process that starts before the
+broker, or loses it to a restart, reconnects on its next write or stream
+heartbeat once BROKER_RETRY_SECONDS have passed.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+from config import Config
+
+HEARTBEAT_SECONDS = 15  # Comment line sent on idle streams; also detects closed connections
+BROKER_RETRY_SECONDS = 5
+
+STANDINGS_QUERY = """
+    SELECT u.id, u.name, l.total_score, l.streak_days
+    FROM leaderboard l
+    JOIN users u ON l.user_id = u.id
+    WHERE u.class_id = %s
+"""
+
+CHANGE_QUERY = """
+    SELECT u.class_id, u.name, l.total_score, l.streak_days
+    FROM users u
+    LEFT JOIN leaderboard l ON l.user_id = u.id
+    WHERE u.id = %s
+"""
+
+
+# ==================== SUBSCRIBERS ====================
+
+class Subscriber:
+    """One open event stream: a bounded queue the hub fills and the stream drains"""
+
+    def __init__(self, class_id: str, user_id: int, is_teacher: bool):
+        self.class_id = class_id
+        self.user_id = user_id
+        self.is_teacher = is_teacher
+        self.events = deque()
+        self.resync = False
+        self.ready = threading.Event()
+
+    def wants(self, event: dict) -> bool:
+        return event["type"] != "progress" or self.is_teacher or event["userId"] == self.user_id
+
+    def offer(self, event: dict):
+        """Queue an event (hub lock held); on overflow drop the queue and resync"""
+        if self.resync:
+            pass  # A snapshot is due anyway
+        elif len(self.events) >= Config.LIVE_QUEUE_EVENTS:
+            self.events.clear()
+            self.resync = True
+        else:
+            self.events.append(event)
+        self.ready.set()
+
+
+class _Channel:
+    """Watched class: subscribers, standings and what was published since the last flush"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.standings = {}         # user_id -> {"name", "score", "streak"}
+        self.ranks = {}             # user_id -> rank at the last flush
+        self.scores = {}            # pending: user_id -> {"name", "score", "streak"}
+        self.progress = {}          # pending: (user_id, lecture_id) -> progress event
+        self.loaded = False
+
+
+def _ranking(standings: dict) -> list:
+    """User ids by score, highest first (ties by id, stable between flushes)"""
+    return sorted(standings, key=lambda user_id: (-standings[user_id]["score"], user_id))
+
+
+def _merge(standings: dict, user_id: int, entry: dict):
+    # total_score only grows, so the higher value is the newer one whichever
+    # of a publish and the initial standings query came first
+    current = standings.get(user_id)
+    if current is None or entry["score"] >= current["score"]:
+        standings[user_id] = entry
+
+
+# ==================== HUB ====================
+
+class LiveHub:
+    """In-process fan-out of class events to open streams"""
+
+    def __init__(self, load_standings=None, broker=None):
+        self._load_standings = load_standings or _load_standings
+        self._broker = broker
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._channels = {}
+        self._dirty = set()
+        self._flusher = None
+        # Other event types relayed through the broker (e.g. "session" from live_session.py)
+        self.handlers = {}
+
+    def active(self) -> bool:
+        """True if a publish can reach anyone (local streams or other processes)"""
+        return bool(self._channels) or (self._broker is not None and self._broker.connected)
+
+    # ---- Streams ----
+
+    def subscribe(self, class_id: str, user_id: int, is_teacher: bool) -> Subscriber:
+        """Open a stream on a class; its first event is a snapshot"""
+        subscriber = Subscriber(class_id, user_id, is_teacher)
+        with self._lock:
+            channel = self._channels.setdefault(class_id, _Channel())
+            channel.subscribers.add(subscriber)
+            needs_load = not channel.loaded
+            channel.loaded = True
+        if needs_load:
+            standings = self._load_standings(class_id)
+            with self._lock:
+                for user_id, entry in standings.items():
+                    _merge(channel.standings, user_id, entry)
+                channel.ranks = {u: i + 1 for i, u in enumerate(_ranking(channel.standings))}
+                # Streams that joined while loading got an empty snapshot
+                waiting = list(channel.subscribers)
+        else:
+            waiting = [subscriber]
+        with self._lock:
+            for stream in waiting:
+                stream.resync = True
+                stream.ready.set()
+        self._ensure_flusher()
+        self.ensure_broker()
+        return subscriber
+
+    def ensure_broker(self):
+        """Connect to the broker (if configured) so other processes' publishes arrive"""
+        if self._broker is not None:
+            self._broker.ensure_connected()
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            channel = self._channels.get(subscriber.class_id)
+            if channel is None:
+                return
+            channel.subscribers.discard(subscriber)
+            if not channel.subscribers:
+                # Nobody watching: standings would only go stale
+                del self._channels[subscriber.class_id]
+                self._dirty.discard(subscriber.class_id)
+
+    def next_events(self, subscriber: Subscriber, timeout: float = HEARTBEAT_SECONDS) -> list[dict]:
+        """Events for a stream, waiting up to timeout; [] means send a heartbeat"""
+        if not subscriber.ready.wait(timeout):
+            self.ensure_broker()  # Heartbeat: rejoin a broker that restarted
+            return []
+        with self._lock:
+            subscriber.ready.clear()
+            if subscriber.resync:
+                subscriber.resync = False
+                subscriber.events.clear()
+                channel = self._channels.get(subscriber.class_id)
+                return [self._snapshot(channel)] if channel else []
+            events = list(subscriber.events)
+            subscriber.events.clear()
+            return events
+
+    def _snapshot(self, channel: _Channel) -> dict:
+        return {
+            "type": "snapshot",
+            "leaderboard": [
+                {"rank": i + 1, "userId": user_id, **self._public(channel.standings[user_id])}
+                for i, user_id in enumerate(_ranking(channel.standings))
+            ]
+        }
+
+    @staticmethod
+    def _public(entry: dict) -> dict:
+        return {"name": entry["name"], "score": entry["score"], "streak": entry["streak"]}
+
+    # ---- Publishing ----
+
+    def publish(self, event: dict):
+        """Deliver an event here and, through the broker, in every other process"""
+        self.deliver(event)
+        if self._broker is not None:
+            self._broker.send(event)
+
+    def deliver(self, event: dict):
+        """Queue an event for this process's streams (coalesced until the next flush)"""
+        handler = self.handlers.get(event["type"])
+        if handler is not None:
+            handler(event)
+            return
+        with self._lock:
+            channel = self._channels.get(event["classId"])
+            if channel is None:
+                return
+            if event["type"] == "score":
+                entry = {"name": event["name"], "score": event["score"], "streak": event["streak"]}
+                _merge(channel.scores, event["userId"], entry)
+            elif event["type"] == "progress":
+                channel.progress[(event["userId"], event["lectureId"])] = event
+            self._dirty.add(event["classId"])
+            self._wake.notify()
+
+    # ---- Flushing ----
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="live-updates", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._dirty:
+                    self._wake.wait()
+            # Let the rest of a burst arrive, then handle it in one pass
+            time.sleep(Config.LIVE_COALESCE_MS / 1000)
+            self.flush()
+
+    def flush(self):
+        """Turn pending publishes into one ranks/progress event per class"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            for class_id in dirty:
+                channel = self._channels.get(class_id)
+                if channel is not None:
+                    for event in self._channel_events(channel):
+                        for subscriber in channel.subscribers:
+                            if subscriber.wants(event):
+                                subscriber.offer(event)
+
+    def _channel_events(self, channel: _Channel) -> list[dict]:
+        events = []
+        if channel.scores:
+            for user_id, entry in channel.scores.items():
+                _merge(channel.standings, user_id, entry)
+            changed_scores = set(channel.scores)
+            channel.scores = {}
+
+            ranks = {u: i + 1 for i, u in enumerate(_ranking(channel.standings))}
+            changes = [
+                {"userId": user_id, **self._public(channel.standings[user_id]),
+                 "rank": rank, "previousRank": channel.ranks.get(user_id)}
+                for user_id, rank in ranks.items()
+                if user_id in changed_scores or channel.ranks.get(user_id) != rank
+            ]
+            channel.ranks = ranks
+            if changes:
+                events.append({"type": "ranks", "changes": sorted(changes, key=lambda c: c["rank"])})
+
+        events += [
+            {key: value for key, value in event.items() if key != "classId"}
+            for event in channel.progress.values()
+        ]
+        channel.progress = {}
+        return events
+
+
+def _load_standings(class_id: str) -> dict:
+    """Current class standings from the leaderboard table"""
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        return {}
+    try:
+        cursor = conn.cursor()
+        cursor.execute(STANDINGS_QUERY, (class_id,))
+        return {
+            user_id: {"name": name, "score": int(score or 0), "streak": int(streak or 0)}
+            for user_id, name, score, streak in cursor.fetchall()
+        }
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# ==================== BROKER ====================
+
+def _broker_address():
+    host, _, port = Config.LIVE_BROKER_ADDRESS.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def _authkey() -> bytes:
+    return Config.JWT_SECRET_KEY.encode("utf-8")
+
+
+class BrokerLink:
+    """This process's connection to the broker: sends publishes, delivers the others'"""
+
+    def __init__(self, address):
+        self.address = address
+        self.hub = None
+        self.connected = False
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._next_attempt = 0.0
+
+    def ensure_connected(self):
+        if self.connected or time.monotonic() < self._next_attempt:
+            return
+        from multiprocessing.connection import Client
+
+        with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                self._conn = Client(self.address, authkey=_authkey())
+            except (OSError, EOFError) as e:
+                self._next_attempt = time.monotonic() + BROKER_RETRY_SECONDS
+                print(f"[LiveUpdates] ⚠ Broker {self.address[0]}:{self.address[1]} unreachable ({e}); "
+                      f"updates stay in this process")
+                return
+            self.connected = True
+            threading.Thread(target=self._receive_loop, args=(self._conn,), name="live-broker", daemon=True).start()
+            print(f"[LiveUpdates] ✓ Connected to broker {self.address[0]}:{self.address[1]}")
+
+    def send(self, event: dict):
+        self.ensure_connected()
+        if not self.connected:
+            return
+        try:
+            with self._send_lock:
+                self._conn.send_bytes(json.dumps(event).encode("utf-8"))
+        except (OSError, EOFError):
+            self._disconnect()
+
+    def _receive_loop(self, conn):
+        try:
+            while True:
+                self.hub.deliver(json.loads(conn.recv_bytes()))
+        except (OSError, EOFError, ValueError):
+            self._disconnect()
+
+    def _disconnect(self):
+        with self._connect_lock:
+            if self.connected:
+                self.connected = False
+                self._next_attempt = time.monotonic() + BROKER_RETRY_SECONDS
+                print("[LiveUpdates] ⚠ Lost broker connection; updates stay in this process")
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+
+
+def run_broker(address):
+    """Relay every message from one process to all the others (blocks)"""
+    from multiprocessing.connection import Listener
+
+    peers = set()
+    peers_lock = threading.Lock()
+
+    def relay(conn):
+        try:
+            while True:
+                message = conn.recv_bytes()
+                with peers_lock:
+                    targets = [peer for peer in peers if peer is not conn]
+                for peer in targets:
+                    try:
+                        peer.send_bytes(message)
+                    except OSError:
+                        pass
+        except (OSError, EOFError):
+            pass
+        finally:
+            with peers_lock:
+                peers.discard(conn)
+            conn.close()
+
+    with Listener(address, authkey=_authkey()) as listener:
+        print(f"[LiveUpdates] ✓ Broker listening on {address[0]}:{address[1]}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:  # failed handshake (wrong key, port scan)
+                print(f"[LiveUpdates] ⚠ Rejected connection: {e}")
+                continue
+            with peers_lock:
+                peers.add(conn)
+            threading.Thread(target=relay, args=(conn,), daemon=True).start()
+
+
+# ==================== PUBLISHING FROM ROUTES ====================
+
+def _make_hub() -> LiveHub:
+    broker = BrokerLink(_broker_address()) if Config.LIVE_BROKER_ADDRESS else None
+    live_hub = LiveHub(broker=broker)
+    if broker is not None:
+        broker.hub = live_hub
+    return live_hub
+
+
+hub = _make_hub()
+
+
+def read_change(cursor, user_id: int) -> dict | None:
+    """
+    The user's class and leaderboard totals, read inside the writing transaction
+
+    Returns None (and skips the query) when no stream could receive an update.
+    """
+    if not Config.LIVE_UPDATES_ENABLED:
+        return None
+    # A process without streams of its own reconnects here, not only on subscribe()
+    # (attempts are rate-limited), so a broker that started late or restarted is rejoined
+    hub.ensure_broker()
+    if not hub.active():
+        return None
+    cursor.execute(CHANGE_QUERY, (user_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    if isinstance(row, dict):
+        row = (row["class_id"], row["name"], row["total_score"], row["streak_days"])
+    class_id, name, score, streak = row
+    if not class_id:
+        return None
+    return {"classId": class_id, "userId": user_id, "name": name,
+            "score": int(score or 0), "streak": int(streak or 0)}
+
+
+def publish_score(change: dict | None):
+    """After commit: push a student's new totals to their class"""
+    if change is not None:
+        hub.publish({"type": "score", **change})
+
+
+def publish_progress(change: dict | None, lecture_id: str, progress_percent, completed: bool):
+    """After commit: push lecture progress (and totals, if completion scored)"""
+    if change is None:
+        return
+    hub.publish({
+        "type": "progress", "classId": change["classId"], "userId": change["userId"],
+        "lectureId": lecture_id, "progressPercent": progress_percent, "completed": bool(completed)
+    })
+    if completed:
+        publish_score(change)
+
+
+def format_event(event: dict) -> str:
+    """One SSE message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+def stream_events(class_id: str, user_id: int, is_teacher: bool):
+    """SSE body for one client; unsubscribes when the client goes away"""
+    # Subscribed on first read, so a response that is never started leaks nothing
+    subscriber = hub.subscribe(class_id, user_id, is_teacher)
+    try:
+        yield f"retry: {HEARTBEAT_SECONDS * 1000}\n\n"
+        while True:
+            events = hub.next_events(subscriber)
+            if not events:
+                yield ": ping\n\n"
+            for event in events:
+                yield format_event(event)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+# ==================== CLI INTERFACE ====================
+
+def main():
+    """CLI for the cross-process broker"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AetherLearn live updates broker")
+    parser.add_argument("--broker", action="store_true", help="Run the broker")
+    parser.add_argument("--address", default=Config.LIVE_BROKER_ADDRESS or "127.0.0.1:6380",
+                        help="host:port to listen on (default: LIVE_BROKER_ADDRESS)")
+    args = parser.parse_args()
+
+    if not args.broker:
+        parser.print_help()
+        return
+    host, _, port = args.address.rpartition(":")
+    run_broker((host or "127.0.0.1", int(port)))
+
+
+if __name__ == "__main__":
+    main()
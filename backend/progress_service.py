@@ -0,0 +1,308 @@
+"""
+Progress Service for AetherLearn
+Builds a student's progress dashboard in a single database round trip
+
+One UNION ALL statement returns lecture progress, the best result per quiz
+(from quiz_summary), test results and leaderboard stats as tagged rows.
+Results are cached per user for PROGRESS_CACHE_SECONDS; routes that change a
+user's progress call progress_cache.invalidate(user_id).
+
+The cache lives in process memory, so with several server processes a
+user may see data up to the TTL old on a process that did not handle the
+write.
+"""
+
+import threading
+import time
+
+from config import Config
+
+PROGRESS_QUERY = """
+    SELECT 'lecture' AS kind, lecture_id AS item_id,
+           progress_percent AS v1, completed AS v2, last_position_seconds AS v3,
+           NULL AS v4, NULL AS v5, NULL AS v6
+    FROM lecture_progress WHERE user_id = %s
+    UNION ALL
+    SELECT 'quiz', quiz_id, best_score, total_questions, best_percentage, passed_at IS NOT NULL, attempts, NULL
+    FROM quiz_summary WHERE user_id = %s
+    UNION ALL
+    SELECT 'test', test_id, ai_score, total_marks, percentage, NULL, NULL, NULL
+    FROM test_results WHERE user_id = %s
+    UNION ALL
+    SELECT 'stats', NULL, total_score, lectures_completed, quizzes_passed,
+           tests_completed, streak_days, NULL
+    FROM leaderboard WHERE user_id = %s
+"""
+
+ATTEMPTS_QUERY = """
+    SELECT quiz_id, score, total_questions, percentage, passed, attempts, completed_at,
+           COUNT(*) OVER () AS total_rows
+    FROM quiz_scores
+    WHERE user_id = %s {quiz_filter}
+    ORDER BY completed_at DESC, id DESC
+    LIMIT %s OFFSET %s
+"""
+
+# Creates the summary row on a first attempt; on later ones the no-op update
+# still takes the row's exclusive lock (InnoDB locks the duplicate row; SQLite
+# takes the database write lock), so the next two statements cannot interleave
+# with another submission of the same quiz. A SELECT ... FOR UPDATE alone would
+# only take a gap lock when the row does not exist yet.
+QUIZ_SUMMARY_CLAIM = """
+    INSERT INTO quiz_summary (user_id, quiz_id, total_questions, first_attempt_at, last_attempt_at)
+    VALUES (%s, %s, %s, NOW(), NOW())
+    ON DUPLICATE KEY UPDATE last_attempt_at = NOW()
+"""
+
+QUIZ_SUMMARY_READ = """
+    SELECT attempts, best_percentage, best_score, total_questions, passed_at IS NOT NULL
+    FROM quiz_summary WHERE user_id = %s AND quiz_id = %s FOR UPDATE
+"""
+
+QUIZ_SUMMARY_UPDATE = """
+    UPDATE quiz_summary
+    SET attempts = %(attempts)s, last_best_gain = %(gain)s, best_percentage = %(best_percentage)s,
+        best_score = %(best_score)s, total_questions = %(total_questions)s,
+        passed_at = IF(%(first_pass)s, NOW(), passed_at), last_attempt_at = NOW()
+    WHERE user_id = %(user_id)s AND quiz_id = %(quiz_id)s
+"""
+
+EMPTY_STATS = {
+    'total_score': 0,
+    'lectures_completed': 0,
+    'quizzes_passed': 0,
+    'tests_completed': 0,
+    'streak_days': 0
+}
+
+MAX_PAGE_SIZE = 100
+
+
+def _number(value):
+    """DECIMAL/None -> float/None for JSON"""
+    return float(value) if value is not None else None
+
+
+def record_quiz_summary(cursor, user_id: int, quiz_id: str, score: int, total_questions: int,
+                        percentage: float, passed: bool) -> tuple[int, bool]:
+    """
+    Count one quiz submission in quiz_summary
+
+    The summary row stays locked until the caller commits, so concurrent
+    submissions of the same quiz get distinct attempt numbers and only one
+    of them can be the first pass.
+
+    Returns:
+        tuple: (attempt number, True if this submission is the first pass)
+    """
+    cursor.execute(QUIZ_SUMMARY_CLAIM, (user_id, quiz_id, total_questions))
+    cursor.execute(QUIZ_SUMMARY_READ, (user_id, quiz_id))
+    attempts, best_percentage, best_score, best_total, was_passed = cursor.fetchone()
+    best_percentage = float(best_percentage)
+
+    improved = percentage > best_percentage
+    first_pass = passed and not was_passed
+    cursor.execute(QUIZ_SUMMARY_UPDATE, {
+        'user_id': user_id,
+        'quiz_id': quiz_id,
+        'attempts': attempts + 1,
+        'gain': max(0.0, percentage - best_percentage),
+        'best_percentage': percentage if improved else best_percentage,
+        'best_score': score if improved else best_score,
+        'total_questions': total_questions if improved else best_total,
+        'first_pass': 1 if first_pass else 0
+    })
+    return attempts + 1, first_pass
+
+
+def fetch_progress(cursor, user_id: int) -> dict:
+    """
+    Load the full progress dashboard with one query
+
+    Args:
+        cursor: Tuple cursor (not dictionary=True)
+        user_id: Student's user id
+
+    Returns:
+        dict with lectures, quizzes (best attempt each), tests, stats and summary
+    """
+    cursor.execute(PROGRESS_QUERY, (user_id, user_id, user_id, user_id))
+
+    lectures, quizzes, tests = [], [], []
+    stats = dict(EMPTY_STATS)
+
+    for kind, item_id, v1, v2, v3, v4, v5, _ in cursor.fetchall():
+        if kind == 'lecture':
+            lectures.append({
+                'lecture_id': item_id,
+                'progress_percent': int(v1),
+                'completed': bool(v2),
+                'last_position_seconds': int(v3)
+            })
+        elif kind == 'quiz':
+            quizzes.append({
+                'quiz_id': item_id,
+                'score': int(v1),
+                'total_questions': int(v2),
+                'percentage': _number(v3),
+                'passed': bool(v4),
+                'attempts': int(v5)
+            })
+        elif kind == 'test':
+            tests.append({
+                'test_id': item_id,
+                'ai_score': int(v1) if v1 is not None else None,
+                'total_marks': int(v2),
+                'percentage': _number(v3)
+            })
+        else:
+            stats = {
+                'total_score': int(v1),
+                'lectures_completed': int(v2),
+                'quizzes_passed': int(v3),
+                'tests_completed': int(v4),
+                'streak_days': int(v5)
+            }
+
+    return {
+        'lectures': lectures,
+        'quizzes': quizzes,
+        'tests': tests,
+        'stats': stats,
+        'summary': summarize(lectures, quizzes, tests)
+    }
+
+
+def summarize(lectures: list, quizzes: list, tests: list) -> dict:
+    """Aggregates shown on the dashboard"""
+    def average(values):
+        values = [v for v in values if v is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    return {
+        'lectures_started': len(lectures),
+        'lectures_completed': sum(1 for l in lectures if l['completed']),
+        'average_lecture_progress': average(l['progress_percent'] for l in lectures),
+        'quizzes_attempted': len(quizzes),
+        'quizzes_passed': sum(1 for q in quizzes if q['passed']),
+        'quiz_attempts_total': sum(q['attempts'] for q in quizzes),
+        'average_best_quiz_percentage': average(q['percentage'] for q in quizzes),
+        'tests_taken': len(tests),
+        'average_test_percentage': average(t['percentage'] for t in tests)
+    }
+
+
+def fetch_attempts(cursor, user_id: int, page: int = 1, page_size: int = 20, quiz_id: str = None) -> dict:
+    """
+    One page of a student's quiz attempt history, newest first
+
+    Args:
+        cursor: Tuple cursor
+        user_id: Student's user id
+        page: 1-based page number
+        page_size: Rows per page (capped at MAX_PAGE_SIZE)
+        quiz_id: Only attempts of this quiz
+
+    Returns:
+        dict with attempts, page, pageSize, total, totalPages
+    """
+    page = max(1, page)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    params = [user_id]
+    quiz_filter = ''
+    if quiz_id:
+        quiz_filter = 'AND quiz_id = %s'
+        params.append(quiz_id)
+    params += [page_size, (page - 1) * page_size]
+
+    cursor.execute(ATTEMPTS_QUERY.format(quiz_filter=quiz_filter), tuple(params))
+    rows = cursor.fetchall()
+
+    total = rows[0][7] if rows else 0
+    if not rows and page > 1:
+        # Past the last page: COUNT(*) OVER () has no row to ride on
+        cursor.execute(
+            f"SELECT COUNT(*) FROM quiz_scores WHERE user_id = %s {quiz_filter}",
+            tuple(params[:-2])
+        )
+        total = cursor.fetchone()[0]
+
+    return {
+        'attempts': [
+            {
+                'quiz_id': quiz,
+                'score': score,
+                'total_questions': total_questions,
+                'percentage': _number(percentage),
+                'passed': bool(passed),
+                'attempt': attempt,
+                'completed_at': completed_at.isoformat() if completed_at else None
+            }
+            for quiz, score, total_questions, percentage, passed, attempt, completed_at, _ in rows
+        ],
+        'page': page,
+        'pageSize': page_size,
+        'total': total,
+        'totalPages': (total + page_size - 1) // page_size
+    }
+
+
+class ProgressCache:
+    """
+    Per-user TTL cache of progress dashboards
+
+    Each user has a version number that invalidate() bumps; put() only stores
+    a result computed against the current version, so a slow read can never
+    overwrite the cache with data from before a concurrent write.
+    """
+
+    def __init__(self, ttl_seconds: float, max_users: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.lock = threading.Lock()
+        self.entries = {}   # user_id -> (expires_at, version, payload)
+        self.versions = {}  # user_id -> version
+
+    def get(self, user_id: int):
+        """Cached payload or None"""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, version, payload = entry
+            if expires_at < time.monotonic() or version != self.versions.get(user_id, 0):
+                del self.entries[user_id]
+                return None
+            return payload
+
+    def version(self, user_id: int) -> int:
+        with self.lock:
+            return self.versions.get(user_id, 0)
+
+    def put(self, user_id: int, payload: dict, version: int):
+        if self.ttl_seconds <= 0:
+            return
+        with self.lock:
+            if version != self.versions.get(user_id, 0):
+                return
+            if len(self.entries) >= self.max_users:
+                self._evict_expired()
+            self.entries[user_id] = (time.monotonic() + self.ttl_seconds, version, payload)
+
+    def invalidate(self, user_id: int):
+        with self.lock:
+            self.versions[user_id] = self.versions.get(user_id, 0) + 1
+            self.entries.pop(user_id, None)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for user_id in [u for u, (expires_at, _, _) in self.entries.items() if expires_at < now]:
+            del self.entries[user_id]
+        if len(self.entries) >= self.max_users:
+            # Still full: drop the entry closest to expiry
+            oldest = min(self.entries, key=lambda u: self.entries[u][0])
+            del self.entries[oldest]
+
+
+progress_cache = ProgressCache(Config.PROGRESS_CACHE_SECONDS)
@@ -0,0 +1,288 @@
+"""
+Lecture Passage Retrieval for AetherLearn
+Finds the passages of one lecture that best answer a question, offline on CPU
+
+Each slide (title, bullets, narration) is cut into passages of a few
+sentences, and every passage becomes a hashed feature vector: stemmed words,
+word pairs and character trigrams (for misspellings and word forms) hashed
+into DIMENSIONS signed buckets, weighted by in-lecture IDF and L2-normalized.
+No model or vocabulary file is involved, so indexes never go stale when the
+code moves between machines, and a question is embedded the same way.
+
+The index is written next to lecture.json when a lecture is generated:
+
+    passages.npy    float16 matrix, one row per passage
+    passages.json   slide number, slide title and text per row
+
+Lectures generated before this existed are indexed on their first question.
+"""
+
+import json
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from search_index import analyze, fold
+
+INDEX_VERSION = 1
+DIMENSIONS = 2048
+PASSAGE_WORDS = 60      # Sentences are grouped into passages up to this length
+TRIGRAM_WEIGHT = 0.5    # Words and word pairs count 1
+MAX_LOADED = 64         # Lecture indexes kept in memory
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+_loaded = OrderedDict()
+_loaded_lock = threading.Lock()
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+# ==================== PASSAGES ====================
+
+def split_passages(text: str, max_words: int = PASSAGE_WORDS) -> list[str]:
+    """
+    Sentence-aligned passages of up to max_words words
+
+    Consecutive passages share one sentence, so an answer spanning a
+    boundary is still found whole in one of them.
+    """
+    sentences = [s for s in SENTENCE_END.split(text.strip()) if s]
+    passages, current, words = [], [], 0
+    for sentence in sentences:
+        length = len(sentence.split())
+        if current and words + length > max_words:
+            passages.append(" ".join(current))
+            current, words = current[-1:], len(current[-1].split())
+        current.append(sentence)
+        words += length
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def lecture_passages(lecture: dict) -> list[dict]:
+    """[{slide, slideTitle, text}, ...] for every slide of a lecture"""
+    passages = []
+    for segment in lecture.get("segments", []):
+        # Each bullet reads as its own sentence ahead of the narration
+        bullets = [line.strip().lstrip("-•* ") for line in segment["slide"].get("content", [])]
+        bullets = [b if b[-1] in ".!?" else f"{b}." for b in bullets if b]
+        speech = (segment.get("audio") or {}).get("text") or ""
+        title = segment["slide"]["title"]
+        passages += [
+            {"slide": segment["index"], "slideTitle": title, "text": text}
+            for text in split_passages(" ".join(bullets + [speech])) or [title]
+        ]
+    return passages
+
+
+# ==================== EMBEDDING ====================
+
+def features(text: str) -> list[tuple[str, float]]:
+    """Hashed features of a text: (feature, weight)"""
+    terms = [term for term, _ in analyze(text)[0]]
+    found = [(f"w:{term}", 1.0) for term in terms]
+    found += [(f"b:{a}_{b}", 1.0) for a, b in zip(terms, terms[1:])]
+    for word in re.findall(r"[a-z0-9]{3,}", fold(text)):
+        padded = f"<{word}>"
+        found += [(f"c:{padded[i:i + 3]}", TRIGRAM_WEIGHT) for i in range(len(padded) - 2)]
+    return found
+
+
+def embed(texts: list[str]):
+    """
+    Signed feature-hashed vectors, log-scaled counts, one row per text
+
+    Returns:
+        float32 array of shape (len(texts), DIMENSIONS), rows not normalized
+    """
+    import numpy as np
+
+    rows, columns, values = [], [], []
+    for row, text in enumerate(texts):
+        for feature, weight in features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            rows.append(row)
+            columns.append(h % DIMENSIONS)
+            values.append(weight if h & 0x80000000 else -weight)
+
+    matrix = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)),
+              np.array(values, dtype=np.float32))
+    return np.sign(matrix) * np.log1p(np.abs(matrix))
+
+
+def _normalize(matrix):
+    import numpy as np
+
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+# ==================== INDEX ====================
+
+def build_index(lecture: dict, lecture_dir) -> int:
+    """
+    Write passages.npy and passages.json for a lecture
+
+    Args:
+        lecture: lecture.json data
+        lecture_dir: Directory holding lecture.json
+
+    Returns:
+        Number of passages
+    """
+    import numpy as np
+
+    lecture_dir = Path(lecture_dir)
+    passages = lecture_passages(lecture)
+    # Slide titles are embedded with each passage so short passages keep their topic
+    matrix = embed([f"{p['slideTitle']}. {p['text']}" for p in passages])
+
+    # Buckets present in few passages of this lecture carry more weight
+    df = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(passages)) / (1 + df)) + 1
+    matrix = _normalize(matrix * idf).astype(np.float16)
+
+    # Written under temporary names and swapped in, so readers never see half an index
+    suffix = f".{os.getpid()}.{threading.get_ident()}.part"
+    with open(lecture_dir / f"passages.npy{suffix}", "wb") as f:
+        np.save(f, matrix, allow_pickle=False)
+    with open(lecture_dir / f"passages.json{suffix}", "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "dimensions": DIMENSIONS, "passages": passages}, f)
+    os.replace(lecture_dir / f"passages.npy{suffix}", lecture_dir / "passages.npy")
+    os.replace(lecture_dir / f"passages.json{suffix}", lecture_dir / "passages.json")
+    return len(passages)
+
+
+def _is_current(lecture_dir: Path) -> bool:
+    index_path = lecture_dir / "passages.json"
+    if not (index_path.exists() and (lecture_dir / "passages.npy").exists()):
+        return False
+    if index_path.stat().st_mtime < (lecture_dir / "lecture.json").stat().st_mtime:
+        return False
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get("version") == INDEX_VERSION and meta.get("dimensions") == DIMENSIONS
+
+
+def ensure_index(lecture_dir) -> None:
+    """Build the index of a lecture if it is missing or older than lecture.json"""
+    lecture_dir = Path(lecture_dir)
+    if _is_current(lecture_dir):
+        return
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(str(lecture_dir), threading.Lock())
+    with lock:
+        if _is_current(lecture_dir):
+            return
+        with open(lecture_dir / "lecture.json", "r", encoding="utf-8") as f:
+            lecture = json.load(f)
+        count = build_index(lecture, lecture_dir)
+        print(f"[Retrieval] ✓ Indexed {lecture_dir.name} ({count} passages)")
+
+
+def load_index(lecture_dir):
+    """(matrix, passages) of a lecture, cached while its files are unchanged"""
+    import numpy as np
+
+    lecture_dir = Path(lecture_dir)
+    key = str(lecture_dir)
+    index_path = lecture_dir / "passages.json"
+    lecture_mtime = (lecture_dir / "lecture.json").stat().st_mtime
+
+    # A cached index is reused without touching its files again
+    with _loaded_lock:
+        cached = _loaded.get(key)
+        if cached and cached[0] == (lecture_mtime, index_path.stat().st_mtime):
+            _loaded.move_to_end(key)
+            return cached[1], cached[2]
+
+    ensure_index(lecture_dir)
+    mtime = (lecture_mtime, index_path.stat().st_mtime)
+
+    with open(lecture_dir / "passages.json", "r", encoding="utf-8") as f:
+        passages = json.load(f)["passages"]
+    matrix = np.load(lecture_dir / "passages.npy", allow_pickle=False).astype(np.float32)
+
+    with _loaded_lock:
+        _loaded[key] = (mtime, matrix, passages)
+        _loaded.move_to_end(key)
+        while len(_loaded) > MAX_LOADED:
+            _loaded.popitem(last=False)
+    return matrix, passages
+
+
+# ==================== QUERY ====================
+
+def ask(lecture_dir, question: str, k: int = 3) -> list[dict]:
+    """
+    Passages of a lecture most similar to a question
+
+    Args:
+        lecture_dir: Directory holding lecture.json
+        question: Free text
+        k: Max passages
+
+    Returns:
+        [{slide, slideTitle, text, score}, ...], best first; passages
+        sharing no feature with the question are left out
+    """
+    import numpy as np
+
+    matrix, passages = load_index(lecture_dir)
+    if not passages:
+        return []
+
+    query = _normalize(embed([question])[0])
+    scores = matrix @ query
+    k = min(k, len(passages))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [
+        {**passages[i], "score": round(float(scores[i]), 4)}
+        for i in top
+        if scores[i] > 0
+    ]
+
+
+# ==================== CLI INTERFACE ====================
+
+def main():
+    """CLI for building lecture indexes and trying questions"""
+    import argparse
+    from lecture_generator import OUTPUT_BASE
+
+    parser = argparse.ArgumentParser(description="AetherLearn lecture passage retrieval")
+    parser.add_argument("--rebuild", action="store_true", help="Reindex every lecture")
+    parser.add_argument("--ask", nargs=2, metavar=("LECTURE_ID", "QUESTION"), help="Top passages for a question")
+    parser.add_argument("-k", type=int, default=3, help="Passages to return")
+    parser.add_argument("--lectures-dir", default=str(OUTPUT_BASE),
+                        help="Lecture directory (default: frontend/public/lectures)")
+    args = parser.parse_args()
+    lectures_dir = Path(args.lectures_dir)
+
+    if args.rebuild:
+        count = 0
+        for path in sorted(lectures_dir.glob("*/lecture.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                build_index(json.load(f), path.parent)
+            count += 1
+        print(f"✓ Indexed {count} lectures")
+    elif args.ask:
+        lecture_id, question = args.ask
+        for passage in ask(lectures_dir / lecture_id, question, args.k):
+            print(f"[slide {passage['slide']}, {passage['score']:.3f}] {passage['text']}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
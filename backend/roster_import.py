@@ -0,0 +1,184 @@
+"""
+Roster Import for AetherLearn
+Bulk-creates the students of a class from a CSV upload
+
+The upload is read as a stream, one chunk of rows at a time, so the file is
+never held in memory. For each chunk:
+
+    1. Rows are validated and checked against earlier rows of the same file
+    2. Existing roll numbers are found with one SELECT ... IN (...)
+    3. Passwords are bcrypt-hashed in parallel on a process pool
+    4. New students are written with one multi-row INSERT
+
+All chunks share one transaction, so an import is applied completely or not
+at all. The result is a report with an outcome for every row.
+
+CSV format (header required, column order free):
+    name,roll_number,password
+    Asha Verma,801,secret123
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from analytics import record_students_registered
+from auth import hash_password
+
+CHUNK_SIZE = 500
+
+# Accepted header spellings for each field
+COLUMNS = {
+    'name': ('name', 'student_name', 'full_name'),
+    'roll_number': ('roll_number', 'rollnumber', 'roll_no', 'roll'),
+    'password': ('password',)
+}
+
+MAX_LENGTHS = {'name': 100, 'roll_number': 50}
+
+_hash_pool = None
+
+
+class RosterImportError(ValueError):
+    """The upload as a whole cannot be imported (bad header, empty file)"""
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all imports (bcrypt is CPU-bound)"""
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _hash_pool
+
+
+def _resolve_columns(fieldnames) -> dict:
+    """Map our field names to the CSV's header names"""
+    if not fieldnames:
+        raise RosterImportError('CSV file is empty')
+
+    normalized = {name.strip().lower().replace(' ', '_'): name for name in fieldnames if name}
+    mapping = {}
+    for field, aliases in COLUMNS.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[field] = normalized[alias]
+                break
+
+    missing = [f for f in ('name', 'roll_number') if f not in mapping]
+    if missing:
+        raise RosterImportError(f"CSV is missing column(s): {', '.join(missing)}")
+    return mapping
+
+
+def _chunks(reader, size):
+    chunk = []
+    for row in reader:
+        chunk.append((reader.line_num, row))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_roster(cursor, stream, class_id: str, default_password: str = None,
+                  chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Import students from a CSV byte stream into a class
+
+    The caller owns the transaction: commit on success, roll back on error.
+
+    Args:
+        cursor: Tuple cursor
+        stream: Binary file-like object (e.g. request.files['file'].stream)
+        class_id: Class the students join
+        default_password: Used for rows without a password
+        chunk_size: Rows per SELECT/INSERT round trip
+
+    Returns:
+        dict with summary counts and a per-row results list
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    columns = _resolve_columns(reader.fieldnames)
+
+    results = []
+    seen = set()
+    pool = _get_hash_pool()
+
+    for chunk in _chunks(reader, chunk_size):
+        candidates = []
+
+        for line, row in chunk:
+            name = (row.get(columns['name']) or '').strip()
+            roll_number = (row.get(columns['roll_number']) or '').strip()
+            password = (row.get(columns['password']) or '').strip() if 'password' in columns else ''
+            password = password or default_password
+
+            error = None
+            if not name or not roll_number:
+                error = 'Name and roll number are required'
+            elif not password:
+                error = 'Password is required'
+            elif len(name) > MAX_LENGTHS['name'] or len(roll_number) > MAX_LENGTHS['roll_number']:
+                error = 'Name or roll number is too long'
+
+            if error:
+                results.append({'row': line, 'rollNumber': roll_number or None, 'status': 'invalid', 'error': error})
+            elif roll_number in seen:
+                results.append({'row': line, 'rollNumber': roll_number, 'status': 'duplicate',
+                                'error': 'Roll number repeated in file'})
+            else:
+                seen.add(roll_number)
+                candidates.append((line, name, roll_number, password))
+
+        if not candidates:
+            continue
+
+        # One set-based lookup for the whole chunk
+        placeholders = ', '.join(['%s'] * len(candidates))
+        cursor.execute(
+            f"SELECT roll_number FROM users WHERE roll_number IN ({placeholders})",
+            tuple(c[2] for c in candidates)
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+
+        new_rows = []
+        for candidate in candidates:
+            if candidate[2] in existing:
+                results.append({'row': candidate[0], 'rollNumber': candidate[2], 'status': 'duplicate',
+                                'error': 'Roll number already registered'})
+            else:
+                new_rows.append(candidate)
+
+        if not new_rows:
+            continue
+
+        chunksize = max(1, len(new_rows) // ((os.cpu_count() or 1) * 4))
+        hashes = list(pool.map(hash_password, [r[3] for r in new_rows], chunksize=chunksize))
+
+        values = ', '.join(["('student', %s, %s, %s, %s)"] * len(new_rows))
+        params = []
+        for (_, name, roll_number, _), password_hash in zip(new_rows, hashes):
+            params += [name, password_hash, roll_number, class_id]
+        cursor.execute(
+            f"INSERT INTO users (user_type, name, password_hash, roll_number, class_id) VALUES {values}",
+            tuple(params)
+        )
+        record_students_registered(cursor, class_id, [r[2] for r in new_rows])
+
+        results.extend(
+            {'row': line, 'rollNumber': roll_number, 'status': 'created'}
+            for line, _, roll_number, _ in new_rows
+        )
+
+    results.sort(key=lambda r: r['row'])
+    return {
+        'classId': class_id,
+        'summary': {
+            status: sum(1 for r in results if r['status'] == status)
+            for status in ('created', 'duplicate', 'invalid')
+        },
+        'rows': results
+    }
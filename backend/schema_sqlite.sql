@@ -0,0 +1,272 @@
+-- AetherLearn schema for the embedded SQLite backend (DB_BACKEND=sqlite)
+-- Mirrors setup_db.sql; applied by `python database.py` or on first start.
+-- ENUMs become CHECK constraints, ON UPDATE CURRENT_TIMESTAMP becomes a trigger,
+-- and timestamps are stored as local 'YYYY-MM-DD HH:MM:SS' text like MySQL's NOW().
+
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_type TEXT NOT NULL CHECK (user_type IN ('student', 'teacher')),
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    roll_number VARCHAR(50) UNIQUE,
+    class_id VARCHAR(50),
+    school VARCHAR(200),
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_users_class ON users (class_id);
+
+-- Classes table
+CREATE TABLE IF NOT EXISTS classes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    class_id VARCHAR(50) UNIQUE NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    grade VARCHAR(20) NOT NULL,
+    teacher_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Lectures table
+CREATE TABLE IF NOT EXISTS lectures (
+    id VARCHAR(100) PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    topic VARCHAR(200),
+    subject VARCHAR(100),
+    grade VARCHAR(20),
+    duration_seconds INTEGER,
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Class-Lecture assignment table
+CREATE TABLE IF NOT EXISTS class_lectures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    class_id VARCHAR(50) NOT NULL,
+    lecture_id VARCHAR(100) NOT NULL,
+    assigned_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    assigned_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    UNIQUE (class_id, lecture_id)
+);
+
+-- Lecture progress table
+CREATE TABLE IF NOT EXISTS lecture_progress (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    lecture_id VARCHAR(50) NOT NULL,
+    progress_percent INTEGER DEFAULT 0,
+    completed BOOLEAN DEFAULT 0,
+    last_position_seconds INTEGER DEFAULT 0,
+    completed_at TIMESTAMP NULL,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    UNIQUE (user_id, lecture_id)
+);
+
+-- Quiz scores table (attempt history)
+CREATE TABLE IF NOT EXISTS quiz_scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    quiz_id VARCHAR(50) NOT NULL,
+    score INTEGER NOT NULL,
+    total_questions INTEGER NOT NULL,
+    percentage DECIMAL(5,2) NOT NULL,
+    passed BOOLEAN DEFAULT 0,
+    attempts INTEGER DEFAULT 1,
+    completed_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_user_quiz ON quiz_scores (user_id, quiz_id);
+
+-- Quiz summary: one row per (user, quiz)
+CREATE TABLE IF NOT EXISTS quiz_summary (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    quiz_id VARCHAR(50) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    best_percentage DECIMAL(5,2) NOT NULL DEFAULT 0,
+    best_score INTEGER NOT NULL DEFAULT 0,
+    total_questions INTEGER NOT NULL DEFAULT 0,
+    passed_at TIMESTAMP NULL,
+    last_best_gain DECIMAL(5,2) NOT NULL DEFAULT 0,
+    first_attempt_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    last_attempt_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (user_id, quiz_id)
+) WITHOUT ROWID;
+
+-- Test results table
+CREATE TABLE IF NOT EXISTS test_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    test_id VARCHAR(50) NOT NULL,
+    answers TEXT NOT NULL,
+    ai_score INTEGER,
+    total_marks INTEGER NOT NULL,
+    percentage DECIMAL(5,2),
+    submitted_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_user_test ON test_results (user_id, test_id);
+
+-- Leaderboard table
+CREATE TABLE IF NOT EXISTS leaderboard (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+    total_score INTEGER DEFAULT 0,
+    lectures_completed INTEGER DEFAULT 0,
+    quizzes_passed INTEGER DEFAULT 0,
+    tests_completed INTEGER DEFAULT 0,
+    streak_days INTEGER DEFAULT 0,
+    last_activity_date DATE,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_score ON leaderboard (total_score DESC);
+
+-- Sessions table
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    token_hash VARCHAR(255) NOT NULL,
+    device_info VARCHAR(255),
+    is_offline_capable BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Analytics rollups (see analytics.py)
+CREATE TABLE IF NOT EXISTS analytics_class (
+    class_id VARCHAR(50) PRIMARY KEY,
+    students INTEGER DEFAULT 0,
+    lecture_completions INTEGER DEFAULT 0,
+    quiz_attempts INTEGER DEFAULT 0,
+    quiz_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    quiz_passes INTEGER DEFAULT 0,
+    test_submissions INTEGER DEFAULT 0,
+    test_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS analytics_lecture (
+    class_id VARCHAR(50) NOT NULL,
+    lecture_id VARCHAR(100) NOT NULL,
+    students_started INTEGER DEFAULT 0,
+    students_completed INTEGER DEFAULT 0,
+    progress_sum INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (class_id, lecture_id)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_quiz (
+    class_id VARCHAR(50) NOT NULL,
+    quiz_id VARCHAR(50) NOT NULL,
+    attempts INTEGER DEFAULT 0,
+    students_attempted INTEGER DEFAULT 0,
+    students_passed INTEGER DEFAULT 0,
+    percentage_sum DECIMAL(14,2) DEFAULT 0,
+    percentage_sq_sum DOUBLE DEFAULT 0,
+    best_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (class_id, quiz_id)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_student (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    class_id VARCHAR(50),
+    lectures_started INTEGER DEFAULT 0,
+    lectures_completed INTEGER DEFAULT 0,
+    progress_sum INTEGER DEFAULT 0,
+    quiz_attempts INTEGER DEFAULT 0,
+    quizzes_attempted INTEGER DEFAULT 0,
+    quizzes_passed INTEGER DEFAULT 0,
+    quiz_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    best_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    tests_taken INTEGER DEFAULT 0,
+    test_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    last_activity_at TIMESTAMP NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analytics_student_class ON analytics_student (class_id);
+
+-- Lecture search index (see search_index.py)
+CREATE TABLE IF NOT EXISTS search_documents (
+    lecture_id VARCHAR(100) PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    created_by INTEGER,
+    length INTEGER NOT NULL DEFAULT 0,
+    indexed_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_search_documents_created_by ON search_documents (created_by);
+
+CREATE TABLE IF NOT EXISTS search_postings (
+    term VARCHAR(64) NOT NULL,
+    lecture_id VARCHAR(100) NOT NULL,
+    tf INTEGER NOT NULL,
+    title_tf INTEGER NOT NULL DEFAULT 0,
+    positions TEXT NOT NULL,
+    PRIMARY KEY (term, lecture_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_search_postings_lecture ON search_postings (lecture_id);
+
+CREATE TABLE IF NOT EXISTS search_segments (
+    lecture_id VARCHAR(100) NOT NULL,
+    slide INTEGER NOT NULL,
+    title VARCHAR(200),
+    text TEXT,
+    PRIMARY KEY (lecture_id, slide)
+) WITHOUT ROWID;
+
+-- Server-side test grading (see grading.py)
+CREATE TABLE IF NOT EXISTS test_answer_keys (
+    test_id VARCHAR(50) PRIMARY KEY,
+    answer_key TEXT NOT NULL,
+    created_by INTEGER,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS test_grading_queue (
+    result_id INTEGER PRIMARY KEY REFERENCES test_results(id) ON DELETE CASCADE,
+    test_id VARCHAR(50) NOT NULL,
+    queued_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- ON UPDATE CURRENT_TIMESTAMP
+CREATE TRIGGER IF NOT EXISTS users_updated_at AFTER UPDATE ON users
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE users SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS lecture_progress_updated_at AFTER UPDATE ON lecture_progress
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE lecture_progress SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS leaderboard_updated_at AFTER UPDATE ON leaderboard
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE leaderboard SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS test_answer_keys_updated_at AFTER UPDATE ON test_answer_keys
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE test_answer_keys SET updated_at = datetime('now', 'localtime') WHERE test_id = NEW.test_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS analytics_class_updated_at AFTER UPDATE ON analytics_class
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE analytics_class SET updated_at = datetime('now', 'localtime') WHERE class_id = NEW.class_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS analytics_lecture_updated_at AFTER UPDATE ON analytics_lecture
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE analytics_lecture SET updated_at = datetime('now', 'localtime')
+    WHERE class_id = NEW.class_id AND lecture_id = NEW.lecture_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS analytics_quiz_updated_at AFTER UPDATE ON analytics_quiz
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE analytics_quiz SET updated_at = datetime('now', 'localtime')
+    WHERE class_id = NEW.class_id AND quiz_id = NEW.quiz_id;
+END;
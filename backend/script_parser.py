@@ -0,0 +1,226 @@
+"""
+Lecture Script Parser for AetherLearn
+Single-pass tokenizer/parser for SLIDE:/SPEECH: lecture scripts with animation cues
+
+Format:
+    SLIDE: Title Here
+    - Bullet point 1
+    - Bullet point 2
+
+    SPEECH: The narration text goes here. [POINT] As you can see on the board...
+    ---
+    SLIDE: Next Title
+    ...
+
+A new segment starts at a `---` divider line, or at a SLIDE:/SPEECH: header
+that would otherwise overwrite a section the current segment already has.
+Blank lines never split segments.
+"""
+
+import re
+
+# ==================== CONSTANTS ====================
+
+ANIMATION_CUES = {
+    "[POINT]": "PointToBoard",      # Point at the whiteboard
+    "[GESTURE]": "Gesture",          # Hand gesture while explaining
+    "[THINK]": "Thinking",           # Thoughtful pose
+    "[NOD]": "Nod",                  # Nodding agreement
+    "[WAVE]": "Wave",                # Greeting wave
+    "[IDLE]": "Idle"                 # Return to idle
+}
+
+# Bracketed upper-case words are cue candidates. Known cues become animations;
+# anything else ([ATP], [DNA]) is ordinary narration, and likely typos of a
+# cue ([PIONT]) are reported as warnings.
+CUE_TOKEN = re.compile(r'(\[[A-Z_]+\])')
+CUE_NAMES = [cue[1:-1] for cue in ANIMATION_CUES]
+DIVIDER = re.compile(r'-{3,}$')
+HEADER = re.compile(r'(SLIDE|SPEECH):', re.IGNORECASE)
+
+
+# ==================== CUE MATCHING ====================
+
+def _misspelled_cue(token: str) -> str | None:
+    """
+    The known cue a bracketed word is probably a typo of, if any
+
+    Only cues of 5+ letters with two neighbouring letters swapped ([PIONT]) or
+    one letter missing ([GESTRE]) count. Looser matching flags real words:
+    [NOT] is one letter from [NOD], [POINTS] one from [POINT].
+    """
+    name = token[1:-1]
+    for known in CUE_NAMES:
+        if len(known) < 5:
+            continue
+        if len(name) == len(known) - 1:
+            if any(known[:i] + known[i + 1:] == name for i in range(len(known))):
+                return f"[{known}]"
+        elif len(name) == len(known):
+            diff = [i for i in range(len(name)) if name[i] != known[i]]
+            if (len(diff) == 2 and diff[1] == diff[0] + 1
+                    and name[diff[0]] == known[diff[1]] and name[diff[1]] == known[diff[0]]):
+                return f"[{known}]"
+    return None
+
+
+# ==================== ERRORS ====================
+
+class ScriptParseError(ValueError):
+    """Raised when a lecture script is malformed"""
+
+    def __init__(self, message: str, line: int, column: int = 1):
+        self.message = message
+        self.line = line
+        self.column = column
+        super().__init__(f"line {line}, column {column}: {message}")
+
+    def to_dict(self) -> dict:
+        """Structured form for API error responses"""
+        return {"message": self.message, "line": self.line, "column": self.column}
+
+
+# ==================== PARSER ====================
+
+class _SegmentBuilder:
+    """Accumulates one segment while the parser walks the script"""
+
+    def __init__(self, line: int, warnings: list | None = None):
+        self.line = line
+        self.warnings = warnings
+        self.title = None
+        self.content = []
+        self.speech_parts = []       # raw speech, cues included
+        self.clean_parts = []        # speech with cues removed
+        self.speech_len = 0          # length of " ".join(speech_parts)
+        self.cues = []               # (offset in raw speech, animation name)
+        self.has_speech = False
+
+    def add_speech_line(self, text: str, line_no: int, raw_line: str):
+        """Append one line of narration, extracting cues in the same scan"""
+        if self.speech_parts:
+            self.speech_len += 1     # joining space
+        base = self.speech_len
+
+        if "[" not in text:
+            self.clean_parts.append(text)
+        else:
+            # Capturing split: even items are narration, odd items are cue candidates
+            pieces = CUE_TOKEN.split(text)
+            narration = [pieces[0]]
+            pos = base + len(pieces[0])
+            for i in range(1, len(pieces), 2):
+                cue = pieces[i]
+                anim_name = ANIMATION_CUES.get(cue)
+                if anim_name is not None:
+                    self.cues.append((pos, anim_name))
+                    narration.append(pieces[i + 1])
+                else:
+                    suggestion = _misspelled_cue(cue) if self.warnings is not None else None
+                    if suggestion is not None:
+                        self.warnings.append({
+                            "message": f"{cue} is read as narration; did you mean the cue {suggestion}?",
+                            "line": line_no,
+                            "column": raw_line.find(text) + pos - base + 1
+                        })
+                    narration[-1] += cue + pieces[i + 1]
+                pos += len(cue) + len(pieces[i + 1])
+            self.clean_parts.extend(narration)
+
+        self.speech_parts.append(text)
+        self.speech_len += len(text)
+
+    def is_empty(self) -> bool:
+        return self.title is None and not self.content and not self.has_speech
+
+    def build(self) -> dict:
+        speech = " ".join(self.speech_parts)
+        length = len(speech)
+        return {
+            "slide": {"title": self.title or "", "content": self.content},
+            "speech": speech,
+            "speech_clean": " ".join(" ".join(self.clean_parts).split()),
+            "animations": [
+                {
+                    "animation": anim_name,
+                    "timing": pos / length if length else 0  # 0-1 position in audio
+                }
+                for pos, anim_name in self.cues
+            ],
+            "line": self.line
+        }
+
+
+def _column(raw_line: str) -> int:
+    """1-based column of the first non-blank character"""
+    return len(raw_line) - len(raw_line.lstrip()) + 1
+
+
+def parse_script(script: str, warnings: list | None = None) -> list[dict]:
+    """
+    Parse a lecture script with animation cues in a single pass
+
+    Args:
+        script: Script text with SLIDE: and SPEECH: sections
+        warnings: If given, likely cue typos are appended to it as
+            {"message", "line", "column"}; the text stays narration
+
+    Returns:
+        List of segments, each with "slide" ({"title", "content"}), "speech"
+        (raw, cues included), "speech_clean" (for TTS), "animations" (every
+        cue occurrence with its 0-1 timing) and "line" (1-based start line)
+
+    Raises:
+        ScriptParseError: On text outside a section or an empty SLIDE title
+    """
+    segments = []
+    current = None
+    section = None
+
+    def flush():
+        if current is not None and not current.is_empty():
+            segments.append(current.build())
+
+    for line_no, raw_line in enumerate(script.split("\n"), start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+        first = line[0]
+
+        if first == "-" and DIVIDER.match(line):
+            flush()
+            current, section = None, None
+            continue
+
+        header = HEADER.match(line) if first in "Ss" else None
+        if header is None:
+            if section == "slide":
+                current.content.append(line)
+            elif section == "speech":
+                current.add_speech_line(line, line_no, raw_line)
+            else:
+                raise ScriptParseError(
+                    "Text outside a SLIDE: or SPEECH: section", line_no, _column(raw_line)
+                )
+            continue
+
+        text = line[header.end():].strip()
+        if header.group(1).upper() == "SLIDE":
+            if current is None or current.title is not None or current.has_speech:
+                flush()
+                current = _SegmentBuilder(line_no, warnings)
+            if not text:
+                raise ScriptParseError("SLIDE: header has no title", line_no, _column(raw_line))
+            current.title = text
+            section = "slide"
+        else:
+            if current is None or current.has_speech:
+                flush()
+                current = _SegmentBuilder(line_no, warnings)
+            current.has_speech = True
+            section = "speech"
+            if text:
+                current.add_speech_line(text, line_no, raw_line)
+
+    flush()
+    return segments
@@ -0,0 +1,454 @@
+"""
+Lecture Search for AetherLearn
+Inverted index with BM25 ranking over lecture titles, slide titles, bullets
+and narration
+
+Each lecture is analyzed into stemmed terms with token positions and stored
+as one posting row per (term, lecture) in the database, so every server
+process searches the same index:
+
+    search_documents    one row per lecture: title, owner, length in terms
+    search_postings     term, lecture, term frequency, title frequency, positions
+    search_segments     per-slide text, used for snippets
+
+index_lecture() runs inside the generate_lecture transaction, replacing any
+previous postings of that lecture. Lectures created another way (course
+builds, older lectures) are indexed by:
+
+    python search_index.py --rebuild
+
+Queries are OR-ed terms ranked by BM25, with lecture-title matches boosted;
+"quoted phrases" must occur as written (checked against positions).
+"""
+
+import html
+import json
+import math
+import re
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 3         # A lecture-title occurrence counts this many times
+FIELD_GAP = 8           # Position gap between fields, so phrases never span two
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 16
+SNIPPET_TOKENS = 24
+PHRASE_BATCH = 50       # Candidates whose positions are fetched per round
+
+TOKEN = re.compile(r"[a-z0-9]+")
+PHRASE = re.compile(r'"([^"]+)"')
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in into is it its
+of on or our she so than that the their them then there these they this to was
+we were what when where which who will with you your
+""".split())
+
+# Derivational suffixes folded after inflections are removed (longest first)
+SUFFIXES = (
+    ("ational", "ate"), ("ization", "ize"), ("fulness", "ful"), ("iveness", "ive"),
+    ("ousness", "ous"), ("ation", "ate"), ("ement", ""), ("ment", ""), ("ness", ""),
+    ("ity", ""), ("ly", "")
+)
+VOWELS = set("aeiouy")
+
+
+# ==================== ANALYSIS ====================
+
+def _has_vowel(text: str) -> bool:
+    return any(c in VOWELS for c in text)
+
+
+def stem(word: str) -> str:
+    """
+    Light English stemmer (plural, -ed/-ing and common derivational suffixes)
+
+    Deliberately conservative: only used to make query and index terms agree,
+    never shown to users.
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+
+    for suffix in ("ing", "ed"):
+        base = word[:-len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3 and _has_vowel(base):
+            word = base
+            if word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+
+    for suffix, replacement in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+
+    # create/created/creates -> creat
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents"""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def analyze(text: str, start: int = 0) -> tuple[list[tuple[str, int]], int]:
+    """
+    Terms of a text with their positions
+
+    Stopwords are dropped but keep their position, so phrase offsets match
+    the original text.
+
+    Returns:
+        ([(term, position), ...], next free position)
+    """
+    terms = []
+    position = start
+    for token in TOKEN.findall(fold(text)):
+        if token not in STOPWORDS and len(token) <= MAX_TERM_LENGTH:
+            terms.append((stem(token), position))
+        position += 1
+    return terms, position
+
+
+def parse_query(query: str) -> tuple[list[str], list[list[tuple[str, int]]]]:
+    """
+    Query terms (unique, in order) and phrases as [(term, offset), ...]
+    """
+    phrases = []
+    for text in PHRASE.findall(query):
+        terms, _ = analyze(text)
+        if len(terms) > 1:
+            phrases.append([(term, position - terms[0][1]) for term, position in terms])
+
+    terms, _ = analyze(query.replace('"', " "))
+    unique = list(dict.fromkeys(term for term, _ in terms))
+    return unique[:MAX_QUERY_TERMS], phrases
+
+
+def _strip_bullet(line: str) -> str:
+    return line.strip().lstrip("-•* ")
+
+
+def lecture_fields(lecture: dict) -> tuple[str, list[tuple[int, str, str]]]:
+    """
+    (lecture title, [(slide number, slide title, slide text), ...]) from lecture.json data
+
+    Slide text is the bullets followed by the narration.
+    """
+    segments = []
+    for segment in lecture.get("segments", []):
+        bullets = [_strip_bullet(line) for line in segment["slide"].get("content", [])]
+        speech = (segment.get("audio") or {}).get("text") or ""
+        segments.append((segment["index"], segment["slide"]["title"], " ".join(bullets + [speech]).strip()))
+    return lecture.get("title", ""), segments
+
+
+# ==================== INDEXING ====================
+
+def remove_lecture(cursor, lecture_id: str):
+    """Drop a lecture from the index"""
+    for table in ("search_postings", "search_segments", "search_documents"):
+        cursor.execute(f"DELETE FROM {table} WHERE lecture_id = %s", (lecture_id,))
+
+
+def index_lecture(cursor, lecture: dict, created_by: int | None):
+    """
+    (Re)index one lecture; runs in the caller's transaction
+
+    Args:
+        cursor: Database cursor
+        lecture: lecture.json data (id, title, segments)
+        created_by: Owning teacher's user id
+    """
+    lecture_id = lecture["id"]
+    title, segments = lecture_fields(lecture)
+
+    postings = {}   # term -> [tf, title_tf, positions]
+    title_terms, position = analyze(title)
+    for term, pos in title_terms:
+        entry = postings.setdefault(term, [0, 0, []])
+        entry[0] += 1
+        entry[1] += 1
+        entry[2].append(pos)
+
+    for _, slide_title, text in segments:
+        for field in (slide_title, text):
+            terms, position = analyze(field, position + FIELD_GAP)
+            for term, pos in terms:
+                entry = postings.setdefault(term, [0, 0, []])
+                entry[0] += 1
+                entry[2].append(pos)
+
+    length = sum(entry[0] for entry in postings.values())
+
+    remove_lecture(cursor, lecture_id)
+    cursor.execute("""
+        INSERT INTO search_documents (lecture_id, title, created_by, length)
+        VALUES (%s, %s, %s, %s)
+    """, (lecture_id, title, created_by, length))
+    if postings:
+        cursor.executemany("""
+            INSERT INTO search_postings (term, lecture_id, tf, title_tf, positions)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [
+            (term, lecture_id, tf, title_tf, ",".join(map(str, positions)))
+            for term, (tf, title_tf, positions) in postings.items()
+        ])
+    if segments:
+        cursor.executemany("""
+            INSERT INTO search_segments (lecture_id, slide, title, text)
+            VALUES (%s, %s, %s, %s)
+        """, [(lecture_id, slide, slide_title, text) for slide, slide_title, text in segments])
+
+
+# ==================== SEARCH ====================
+
+def _has_phrase(positions: dict[str, set], phrase: list[tuple[str, int]]) -> bool:
+    """True if the phrase terms occur at consecutive (offset) positions"""
+    first, _ = phrase[0]
+    return any(
+        all(start + offset in positions.get(term, ()) for term, offset in phrase[1:])
+        for start in positions.get(first, ())
+    )
+
+
+def _phrase_matches(cursor, scores: dict, matched: dict, phrases: list, limit: int) -> list:
+    """
+    Best-scoring lectures containing every phrase, as [(lecture_id, score), ...]
+
+    Candidates are checked in score order, PHRASE_BATCH at a time, so only
+    the positions of the lectures that end up ranked are fetched and parsed.
+    """
+    phrase_terms = {term for phrase in phrases for term, _ in phrase}
+    candidates = sorted(
+        (item for item in scores.items() if phrase_terms <= matched[item[0]]),
+        key=lambda item: (-item[1], item[0])
+    )
+    placeholders = ", ".join(["%s"] * len(phrase_terms))
+    top = []
+    for i in range(0, len(candidates), PHRASE_BATCH):
+        batch = candidates[i:i + PHRASE_BATCH]
+        cursor.execute(f"""
+            SELECT lecture_id, term, positions FROM search_postings
+            WHERE term IN ({placeholders}) AND lecture_id IN ({", ".join(["%s"] * len(batch))})
+        """, tuple(phrase_terms) + tuple(lecture_id for lecture_id, _ in batch))
+        positions = {}
+        for lecture_id, term, term_positions in cursor.fetchall():
+            positions.setdefault(lecture_id, {})[term] = {int(p) for p in term_positions.split(",")}
+        for lecture_id, score in batch:
+            if all(_has_phrase(positions[lecture_id], phrase) for phrase in phrases):
+                top.append((lecture_id, score))
+                if len(top) == limit:
+                    return top
+    return top
+
+
+def snippet(text: str, terms: set[str], size: int = SNIPPET_TOKENS) -> tuple[str, int]:
+    """
+    HTML snippet of text around the densest run of matches, matches in <mark>
+
+    Returns:
+        (snippet, number of matching tokens in the whole text)
+    """
+    tokens = list(re.finditer(r"\S+", text))
+    hits = [i for i, t in enumerate(tokens)
+            if any(stem(w) in terms for w in TOKEN.findall(fold(t.group())))]
+    if not tokens:
+        return "", 0
+
+    # Window start with the most hits in it
+    start = 0
+    if hits:
+        start = max(hits, key=lambda h: sum(1 for x in hits if h <= x < h + size))
+        start = max(0, min(start - 3, len(tokens) - size))
+    window = tokens[start:start + size]
+
+    hit_set = set(hits)
+    parts = [
+        f"<mark>{html.escape(t.group())}</mark>" if start + i in hit_set else html.escape(t.group())
+        for i, t in enumerate(window)
+    ]
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if start + size < len(tokens) else ""
+    return prefix + " ".join(parts) + suffix, len(hits)
+
+
+def search(cursor, query: str, created_by: int | None = None, class_id: str | None = None,
+           limit: int = 10) -> list[dict]:
+    """
+    Top lectures for a query, BM25-ranked, with a snippet of the best slide
+
+    Args:
+        cursor: Database cursor (tuple rows)
+        query: Free text; "quoted phrases" must match exactly
+        created_by: Only lectures of this teacher
+        class_id: Only lectures assigned to this class
+        limit: Max results
+
+    Returns:
+        [{lectureId, title, score, slide, snippet}, ...]
+    """
+    terms, phrases = parse_query(query)
+    if not terms:
+        return []
+
+    cursor.execute("SELECT COUNT(*), AVG(length) FROM search_documents")
+    total, avg_length = cursor.fetchone()
+    if not total:
+        return []
+    avg_length = float(avg_length) or 1.0
+
+    placeholders = ", ".join(["%s"] * len(terms))
+    cursor.execute(f"""
+        SELECT term, COUNT(*) FROM search_postings WHERE term IN ({placeholders}) GROUP BY term
+    """, tuple(terms))
+    idf = {
+        term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+        for term, df in cursor.fetchall()
+    }
+
+    joins, filters, params = "", "", []
+    if class_id is not None:
+        joins = "JOIN class_lectures cl ON cl.lecture_id = p.lecture_id AND cl.class_id = %s"
+        params.append(class_id)
+    params += terms
+    if created_by is not None:
+        filters = "AND d.created_by = %s"
+        params.append(created_by)
+    cursor.execute(f"""
+        SELECT p.lecture_id, p.term, p.tf, p.title_tf, d.length, d.title
+        FROM search_postings p
+        JOIN search_documents d ON d.lecture_id = p.lecture_id
+        {joins}
+        WHERE p.term IN ({placeholders}) {filters}
+    """, tuple(params))
+
+    scores, titles, matched = {}, {}, {}
+    for lecture_id, term, tf, title_tf, length, title in cursor.fetchall():
+        tf = tf + (TITLE_BOOST - 1) * title_tf
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+        scores[lecture_id] = scores.get(lecture_id, 0.0) + idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+        titles[lecture_id] = title
+        if phrases:
+            matched.setdefault(lecture_id, set()).add(term)
+
+    if phrases:
+        top = _phrase_matches(cursor, scores, matched, phrases, limit)
+    else:
+        top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    if not top:
+        return []
+
+    # Snippets: best-matching slide of each hit
+    ids = [lecture_id for lecture_id, _ in top]
+    cursor.execute(f"""
+        SELECT lecture_id, slide, title, text FROM search_segments
+        WHERE lecture_id IN ({", ".join(["%s"] * len(ids))})
+    """, tuple(ids))
+    best = {}
+    term_set = set(terms)
+    for lecture_id, slide, slide_title, text in cursor.fetchall():
+        title_hits = sum(1 for term, _ in analyze(slide_title)[0] if term in term_set)
+        text_snippet, hits = snippet(text, term_set)
+        rank = (hits + TITLE_BOOST * title_hits, -slide)
+        if lecture_id not in best or rank > best[lecture_id][0]:
+            best[lecture_id] = (rank, slide, slide_title, text_snippet)
+
+    results = []
+    for lecture_id, score in top:
+        _, slide, slide_title, text_snippet = best.get(lecture_id, (None, None, None, ""))
+        results.append({
+            "lectureId": lecture_id,
+            "title": titles[lecture_id],
+            "score": round(score, 4),
+            "slide": slide,
+            "slideTitle": slide_title,
+            "snippet": text_snippet
+        })
+    return results
+
+
+# ==================== REBUILD ====================
+
+def rebuild(conn, lectures_dir: Path | None = None) -> int:
+    """
+    Reindex every lecture in the lectures table, plus lecture.json files in
+    lectures_dir that have no database row (e.g. from course_builder.py)
+
+    Returns:
+        Number of lectures indexed
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id, created_by, metadata FROM lectures")
+        rows = cursor.fetchall()
+        known = set()
+        count = 0
+        for lecture_id, created_by, metadata in rows:
+            known.add(lecture_id)
+            if not metadata:
+                continue
+            lecture = json.loads(metadata) if isinstance(metadata, (str, bytes)) else metadata
+            index_lecture(cursor, lecture, created_by)
+            count += 1
+
+        for path in sorted(Path(lectures_dir).glob("*/lecture.json")) if lectures_dir else []:
+            with open(path, "r", encoding="utf-8") as f:
+                lecture = json.load(f)
+            if lecture.get("id") not in known:
+                index_lecture(cursor, lecture, None)
+                count += 1
+
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# ==================== CLI INTERFACE ====================
+
+def main():
+    """CLI for (re)building the search index"""
+    import argparse
+    from database import get_db_connection
+    from lecture_generator import OUTPUT_BASE
+
+    parser = argparse.ArgumentParser(description="AetherLearn lecture search index")
+    parser.add_argument("--rebuild", action="store_true", help="Reindex all lectures")
+    parser.add_argument("--lectures-dir", default=str(OUTPUT_BASE),
+                        help="Also index lecture.json files found here (default: frontend/public/lectures)")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    try:
+        start = datetime.now()
+        count = rebuild(conn, Path(args.lectures_dir))
+        print(f"✓ Indexed {count} lectures in {(datetime.now() - start).total_seconds():.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -85,6 +85,23 @@ CREATE TABLE IF NOT EXISTS quiz_scores (
     INDEX idx_user_quiz (user_id, quiz_id)
 );
 
+-- Quiz summary: one row per (user, quiz), updated atomically on every submission.
+-- quiz_scores stays as the append-only attempt history.
+CREATE TABLE IF NOT EXISTS quiz_summary (
+    user_id INT NOT NULL,
+    quiz_id VARCHAR(50) NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    best_percentage DECIMAL(5,2) NOT NULL DEFAULT 0,
+    best_score INT NOT NULL DEFAULT 0,
+    total_questions INT NOT NULL DEFAULT 0,
+    passed_at TIMESTAMP NULL,
+    last_best_gain DECIMAL(5,2) NOT NULL DEFAULT 0,
+    first_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, quiz_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
 -- Test results table
 CREATE TABLE IF NOT EXISTS test_results (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -125,6 +142,103 @@ CREATE TABLE IF NOT EXISTS sessions (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- Analytics rollups (maintained by the submit routes, rebuilt by analytics.py --rebuild)
+CREATE TABLE IF NOT EXISTS analytics_class (
+    class_id VARCHAR(50) PRIMARY KEY,
+    students INT DEFAULT 0,
+    lecture_completions INT DEFAULT 0,
+    quiz_attempts INT DEFAULT 0,
+    quiz_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    quiz_passes INT DEFAULT 0,
+    test_submissions INT DEFAULT 0,
+    test_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS analytics_lecture (
+    class_id VARCHAR(50) NOT NULL,
+    lecture_id VARCHAR(100) NOT NULL,
+    students_started INT DEFAULT 0,
+    students_completed INT DEFAULT 0,
+    progress_sum BIGINT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (class_id, lecture_id)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_quiz (
+    class_id VARCHAR(50) NOT NULL,
+    quiz_id VARCHAR(50) NOT NULL,
+    attempts INT DEFAULT 0,
+    students_attempted INT DEFAULT 0,
+    students_passed INT DEFAULT 0,
+    percentage_sum DECIMAL(14,2) DEFAULT 0,
+    percentage_sq_sum DOUBLE DEFAULT 0,
+    best_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (class_id, quiz_id)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_student (
+    user_id INT PRIMARY KEY,
+    class_id VARCHAR(50),
+    lectures_started INT DEFAULT 0,
+    lectures_completed INT DEFAULT 0,
+    progress_sum BIGINT DEFAULT 0,
+    quiz_attempts INT DEFAULT 0,
+    quizzes_attempted INT DEFAULT 0,
+    quizzes_passed INT DEFAULT 0,
+    quiz_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    best_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    tests_taken INT DEFAULT 0,
+    test_percentage_sum DECIMAL(14,2) DEFAULT 0,
+    last_activity_at TIMESTAMP NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_class (class_id)
+);
+
+-- Lecture search index (written by generate_lecture, rebuilt by search_index.py --rebuild)
+CREATE TABLE IF NOT EXISTS search_documents (
+    lecture_id VARCHAR(100) PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    created_by INT,
+    length INT NOT NULL DEFAULT 0,
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_created_by (created_by)
+);
+
+CREATE TABLE IF NOT EXISTS search_postings (
+    term VARCHAR(64) NOT NULL,
+    lecture_id VARCHAR(100) NOT NULL,
+    tf INT NOT NULL,
+    title_tf INT NOT NULL DEFAULT 0,
+    positions MEDIUMTEXT NOT NULL,
+    PRIMARY KEY (term, lecture_id),
+    INDEX idx_lecture (lecture_id)
+);
+
+CREATE TABLE IF NOT EXISTS search_segments (
+    lecture_id VARCHAR(100) NOT NULL,
+    slide INT NOT NULL,
+    title VARCHAR(200),
+    text MEDIUMTEXT,
+    PRIMARY KEY (lecture_id, slide)
+);
+
+-- Server-side test grading (see grading.py)
+CREATE TABLE IF NOT EXISTS test_answer_keys (
+    test_id VARCHAR(50) PRIMARY KEY,
+    answer_key MEDIUMTEXT NOT NULL,
+    created_by INT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS test_grading_queue (
+    result_id INT PRIMARY KEY,
+    test_id VARCHAR(50) NOT NULL,
+    queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (result_id) REFERENCES test_results(id) ON DELETE CASCADE
+);
+
 -- Insert sample data for testing
 -- Password is 'password123' hashed with bcrypt
 INSERT INTO users (user_type, name, password_hash, roll_number, class_id) VALUES
@@ -133,4 +247,7 @@ INSERT INTO users (user_type, name, password_hash, roll_number, class_id) VALUES
 INSERT INTO leaderboard (user_id, total_score, lectures_completed, streak_days) VALUES
 (1, 100, 2, 3);
 
+INSERT INTO analytics_student (user_id, class_id) VALUES (1, 'CLASS-8A');
+INSERT INTO analytics_class (class_id, students) VALUES ('CLASS-8A', 1);
+
 SELECT 'Database setup complete!' AS status;
@@ -0,0 +1,81 @@
+"""
+Lecture Audio Speed Variants for AetherLearn
+Serves lecture audio at other playback speeds without re-synthesis
+
+A variant is time-stretched from the generated WAV (KokoroTTS/time_stretch.py,
+pitch preserved) the first time its speed is requested and stored next to
+the original:
+
+    audio/audio3.wav            as generated
+    audio/audio3@1.25x.wav      made on the first request for speed=1.25
+
+Only speeds listed in Config.PLAYBACK_SPEEDS are made, so the number of
+files per segment stays bounded. A variant older than its source (lecture
+regenerated) is rebuilt.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from config import Config
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def parse_speed(value) -> float | None:
+    """Requested speed as one of Config.PLAYBACK_SPEEDS (or 1.0); None if not offered"""
+    try:
+        speed = round(float(value), 2)
+    except (TypeError, ValueError):
+        return None
+    if speed == 1.0 or speed in Config.PLAYBACK_SPEEDS:
+        return speed
+    return None
+
+
+def variant_path(audio_path: Path, speed: float) -> Path:
+    """File of a speed variant: audio3.wav -> audio3@1.25x.wav"""
+    return audio_path.with_name(f"{audio_path.stem}@{speed:g}x{audio_path.suffix}")
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(str(path), threading.Lock())
+
+
+def ensure_variant(audio_path: Path, speed: float) -> Path:
+    """
+    Path of the audio at `speed`, time-stretching it on first use
+
+    Concurrent first requests for the same variant wait for one stretch
+    instead of each doing it; the file appears atomically when complete.
+
+    Args:
+        audio_path: Generated WAV of a segment
+        speed: Playback speed from parse_speed()
+
+    Returns:
+        Path: audio_path itself for 1.0, otherwise the variant file
+    """
+    if speed == 1.0:
+        return audio_path
+
+    target = variant_path(audio_path, speed)
+    if target.exists() and target.stat().st_mtime >= audio_path.stat().st_mtime:
+        return target
+
+    with _lock_for(target):
+        if target.exists() and target.stat().st_mtime >= audio_path.stat().st_mtime:
+            return target
+
+        # lecture_generator puts KokoroTTS on sys.path; NumPy is only imported here
+        from lecture_generator import KOKORO_PATH  # noqa: F401
+        from time_stretch import stretch_file
+
+        partial = target.with_name(f"{target.name}.{os.getpid()}.part")
+        stretch_file(audio_path, partial, speed)
+        os.replace(partial, target)
+        print(f"[SpeedVariants] ✓ {target.name}")
+    return target
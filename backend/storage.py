@@ -0,0 +1,321 @@
+"""
+Storage Backends for AetherLearn
+Lets the same routes run on MySQL or on an embedded SQLite file
+
+    DB_BACKEND=mysql    MySQL server configured by DB_HOST/DB_USER/... (default)
+    DB_BACKEND=sqlite   Single file at SQLITE_PATH in WAL mode, for one-box
+                        school servers where running MySQL is too heavy
+
+Both backends hand out connections with the subset of the mysql.connector
+API the routes use: cursor(dictionary=True), execute() with %s / %(name)s
+parameters, fetchone/fetchall/fetchmany, lastrowid, commit, rollback, close.
+
+For SQLite, MySQL-only SQL is translated once per distinct statement and
+cached (the sqlite3 module then keeps the prepared statement in its own
+statement cache):
+
+    %s, %(name)s                 -> ?, :name
+    INSERT IGNORE                -> INSERT OR IGNORE
+    ON DUPLICATE KEY UPDATE      -> ON CONFLICT(<key>) DO UPDATE SET
+    VALUES(col) (in the update)  -> excluded.col
+    IF(), GREATEST(), a DIV b    -> iif(), max(), a / b
+    SELECT ... FOR UPDATE        -> SELECT (lock by writing first: SQLite has one writer)
+    NOW()                        -> Python function registered per connection
+"""
+
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from config import Config
+
+SCHEMA_SQLITE = Path(__file__).parent / "schema_sqlite.sql"
+
+# Upsert conflict targets per table (SQLite needs them spelled out)
+CONFLICT_KEYS = {
+    'lecture_progress': 'user_id, lecture_id',
+    'leaderboard': 'user_id',
+    'class_lectures': 'class_id, lecture_id',
+    'quiz_summary': 'user_id, quiz_id',
+    'analytics_class': 'class_id',
+    'analytics_lecture': 'class_id, lecture_id',
+    'analytics_quiz': 'class_id, quiz_id',
+    'analytics_student': 'user_id',
+    'test_answer_keys': 'test_id'
+}
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",         # readers never block the single writer
+    "PRAGMA synchronous = NORMAL",       # durable at checkpoints; safe with WAL
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",        # wait for the writer instead of failing
+    "PRAGMA cache_size = -8000",         # 8 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 67108864"        # 64 MB memory-mapped reads
+)
+
+STATEMENT_CACHE_SIZE = 256
+
+
+# ==================== MYSQL ====================
+
+class MySQLStorage:
+    """MySQL server via mysql.connector"""
+
+    dialect = 'mysql'
+
+    def connect(self):
+        """Create and return a database connection (None on failure)"""
+        import mysql.connector
+        from mysql.connector import Error
+
+        try:
+            return mysql.connector.connect(
+                host=Config.DB_HOST,
+                user=Config.DB_USER,
+                password=Config.DB_PASSWORD,
+                database=Config.DB_NAME
+            )
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            return None
+
+
+# ==================== SQLITE ====================
+
+_UPSERT = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I)
+_INSERT_TABLE = re.compile(r"\bINSERT\s+(?:IGNORE\s+)?INTO\s+(\w+)", re.I)
+_VALUES_REF = re.compile(r"\bVALUES\((\w+)\)", re.I)
+_REWRITES = (
+    (re.compile(r"%\((\w+)\)s"), r":\1"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"\bIF\("), "iif("),
+    (re.compile(r"\bGREATEST\(", re.I), "max("),
+    (re.compile(r"\bDIV\b"), "/"),
+    (re.compile(r"\s+FOR\s+UPDATE\b", re.I), "")
+)
+
+_translations = {}
+_translations_lock = threading.Lock()
+
+
+def translate(sql: str) -> str:
+    """MySQL statement -> SQLite statement (cached per distinct string)"""
+    cached = _translations.get(sql)
+    if cached is not None:
+        return cached
+
+    translated = sql
+    for pattern, replacement in _REWRITES:
+        translated = pattern.sub(replacement, translated)
+
+    match = _UPSERT.search(translated)
+    if match:
+        table = _INSERT_TABLE.search(translated).group(1)
+        head, tail = translated[:match.start()], translated[match.end():]
+        tail = _VALUES_REF.sub(r"excluded.\1", tail)
+        translated = f"{head}ON CONFLICT({CONFLICT_KEYS[table]}) DO UPDATE SET{tail}"
+
+    with _translations_lock:
+        _translations[sql] = translated
+    return translated
+
+
+def _adapt_params(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return {k: float(v) if isinstance(v, Decimal) else v for k, v in params.items()}
+    return tuple(float(v) if isinstance(v, Decimal) else v for v in params)
+
+
+# Explicit adapters/converters (the sqlite3 defaults are deprecated)
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class _RawConnection(sqlite3.Connection):
+    """sqlite3 connection with MySQL's NOW()"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.create_function("NOW", 0, _now)
+
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over a sqlite3 cursor"""
+
+    def __init__(self, raw, dictionary=False):
+        self._raw = raw
+        self._cursor = raw.cursor()
+        self._dictionary = dictionary
+
+    def execute(self, statement, params=None):
+        self._cursor.execute(translate(statement), _adapt_params(params))
+
+    def executemany(self, statement, seq_params):
+        self._cursor.executemany(translate(statement), (_adapt_params(p) for p in seq_params))
+
+    def _dicts(self, rows):
+        names = [d[0] for d in self._cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is None or not self._dictionary:
+            return row
+        return self._dicts([row])[0]
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        return self._dicts(rows) if self._dictionary else rows
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        return self._dicts(rows) if self._dictionary else rows
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """mysql.connector-style connection over sqlite3"""
+
+    def __init__(self, raw, release=None):
+        self.raw = raw
+        self._release = release
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return SQLiteCursor(self.raw, dictionary=dictionary)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if self.raw is None:
+            return
+        if self._release is None:
+            self.raw.close()
+        else:
+            # Uncommitted work is discarded, as when a MySQL connection closes
+            self.raw.rollback()
+            self._release()
+        self.raw = None
+
+    def is_connected(self):
+        return self.raw is not None
+
+
+class SQLiteStorage:
+    """
+    Embedded SQLite file in WAL mode
+
+    Each thread keeps one sqlite3 connection open and hands it out again on
+    the next connect(), so pragmas run once and the prepared-statement cache
+    survives across requests. A connect() while the thread's connection is
+    still checked out gets a private connection that is closed on close().
+    """
+
+    dialect = 'sqlite'
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _open(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=5.0,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level="IMMEDIATE",  # take the write lock at the first write, no upgrade deadlocks
+            check_same_thread=False,      # a streamed response may be closed from another thread
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=_RawConnection
+        )
+        for pragma in SQLITE_PRAGMAS:
+            raw.execute(pragma)
+        return raw
+
+    def connect(self):
+        """Create and return a database connection (None on failure)"""
+        local = self._local
+        try:
+            if getattr(local, 'busy', False):
+                return SQLiteConnection(self._open())
+            if getattr(local, 'raw', None) is None:
+                local.raw = self._open()
+        except sqlite3.Error as e:
+            print(f"Error opening SQLite database: {e}")
+            return None
+
+        local.busy = True
+        return SQLiteConnection(local.raw, release=lambda: setattr(local, 'busy', False))
+
+    def init_schema(self):
+        """Create all tables (idempotent)"""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            raw = self._open()
+        except sqlite3.Error as e:
+            print(f"❌ Error opening SQLite database: {e}")
+            return False
+        try:
+            raw.executescript(SCHEMA_SQLITE.read_text(encoding="utf-8"))
+            raw.commit()
+            print(f"✅ SQLite database initialized at {self.path}")
+            return True
+        except sqlite3.Error as e:
+            print(f"❌ Error initializing SQLite database: {e}")
+            return False
+        finally:
+            raw.close()
+
+
+# ==================== SELECTION ====================
+
+_storage = None
+
+
+def get_storage():
+    """The configured backend (created once)"""
+    global _storage
+    if _storage is None:
+        if Config.DB_BACKEND == 'sqlite':
+            _storage = SQLiteStorage(Config.SQLITE_PATH)
+        elif Config.DB_BACKEND == 'mysql':
+            _storage = MySQLStorage()
+        else:
+            raise ValueError(f"Unknown DB_BACKEND: {Config.DB_BACKEND}")
+    return _storage
+
+
+def set_storage(storage):
+    """Swap the backend (benchmarks and parity checks)"""
+    global _storage
+    _storage = storage
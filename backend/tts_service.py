@@ -0,0 +1,265 @@
+"""
+Shared Speech Service for AetherLearn
+One KokoroTTS per process, fed by a priority scheduler
+
+All synthesis in the API process goes through a single worker thread that
+owns the model. Work is queued per text chunk (see KokoroTTS._split_text),
+so a lecture never holds the engine for longer than one chunk and an
+interactive request waits at most for the lecture chunk in progress:
+
+    FIRST_AUDIO   first chunk of an /api/tts request
+    INTERACTIVE   remaining chunks of /api/tts requests
+    LECTURE       lecture generation (LectureGenerator via scheduler.bind())
+
+/api/tts streams a WAV: the header and the first chunk's PCM are sent as
+soon as that (deliberately short) chunk is synthesized, later chunks follow
+as they finish. Finished WAVs of phrases requested more than once are kept
+in an in-process LRU (phrase_cache) and served without touching the engine.
+
+NumPy and the TTS stack are imported on first use only.
+"""
+
+import copy
+import itertools
+import queue
+import struct
+import threading
+from collections import OrderedDict
+
+from config import Config
+
+FIRST_AUDIO = 0
+INTERACTIVE = 1
+LECTURE = 2
+
+STREAM_DATA_SIZE = 0xFFFFFFFF  # "Unknown length" for WAV headers of streamed audio
+
+
+def wav_header(sample_rate: int, data_bytes: int = None) -> bytes:
+    """
+    44-byte header of a mono 16-bit PCM WAV
+
+    Args:
+        sample_rate: Samples per second
+        data_bytes: PCM length, or None for a stream of unknown length
+    """
+    if data_bytes is None:
+        riff_size = data_size = STREAM_DATA_SIZE
+    else:
+        riff_size, data_size = 36 + data_bytes, data_bytes
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size
+    )
+
+
+def phrase_key(text: str, voice: str, speed: float, lang: str = "en-us") -> tuple:
+    """Cache key: text with whitespace collapsed plus voice settings (case matters: "US" vs "us")"""
+    return " ".join(text.split()), voice, round(float(speed), 2), lang
+
+
+def speech_chunks(tts, text: str, first_chars: int, chars: int) -> list[str]:
+    """
+    Split text for streaming: a short first chunk, then regular ones
+
+    Synthesis time grows with chunk length, so a short first chunk is what
+    brings the first audio forward.
+    """
+    chunks = tts._split_text(text, max_chars=chars)
+    if chunks and len(chunks[0]) > first_chars:
+        chunks[:1] = tts._split_text(chunks[0], max_chars=first_chars)
+    return chunks
+
+
+# ==================== SCHEDULER ====================
+
+class SynthesisJob:
+    """One chunk of text waiting for (or done with) the engine"""
+
+    def __init__(self, text, voice, speed, lang):
+        self.text = text
+        self.voice = voice
+        self.speed = speed
+        self.lang = lang
+        self.cancelled = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def cancel(self):
+        """Skip this job if the worker has not started it yet"""
+        self.cancelled = True
+
+    def wait(self):
+        """Block until synthesized; returns (samples, sample_rate)"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class TTSScheduler:
+    """
+    Priority queue in front of a KokoroTTS, drained by one worker thread
+
+    Lower priority values run first; equal priorities run in submission order.
+    """
+
+    def __init__(self, tts):
+        self.tts = tts
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.worker = threading.Thread(target=self._run, name="tts-scheduler", daemon=True)
+        self.worker.start()
+
+    def submit(self, text, voice, speed=1.0, lang="en-us", priority=LECTURE) -> SynthesisJob:
+        job = SynthesisJob(text, voice, speed, lang)
+        self.queue.put((priority, next(self.counter), job))
+        return job
+
+    def synthesize(self, text, voice="af_sky", speed=1.0, lang="en-us", priority=LECTURE):
+        """Drop-in for KokoroTTS.synthesize that waits its turn"""
+        return self.submit(text, voice, speed, lang, priority).wait()
+
+    def bind(self, priority=LECTURE):
+        """
+        The shared KokoroTTS as seen by one caller
+
+        A shallow copy (model, phoneme cache and postprocessor are shared)
+        whose synthesize() - and therefore save() - queues at `priority`.
+        """
+        view = copy.copy(self.tts)
+        view.synthesize = lambda text, voice="af_sky", speed=1.0, lang="en-us": \
+            self.synthesize(text, voice, speed, lang, priority)
+        return view
+
+    def _run(self):
+        while True:
+            _, _, job = self.queue.get()
+            if job.cancelled:
+                continue
+            try:
+                job.result = self.tts.synthesize(job.text, job.voice, job.speed, job.lang)
+            except Exception as e:
+                job.error = e
+            job.done.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> TTSScheduler:
+    """The process-wide scheduler; loads the model on first call"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                from lecture_generator import PHONEME_CACHE_PATH, tts_profile
+                from tts_engine import KokoroTTS
+
+                tts = KokoroTTS(phoneme_cache_path=PHONEME_CACHE_PATH, profile=tts_profile())
+                _scheduler = TTSScheduler(tts)
+    return _scheduler
+
+
+def set_engine(tts):
+    """Serve from an already built KokoroTTS (benchmarks)"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = TTSScheduler(tts)
+    return _scheduler
+
+
+# ==================== HOT PHRASE CACHE ====================
+
+class PhraseCache:
+    """
+    LRU of finished WAVs for phrases that are requested repeatedly
+
+    A phrase is only stored on its second request, so one-off answers do not
+    push out the greetings and prompts that make up most repeat traffic.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.seen = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key):
+        with self.lock:
+            wav = self.entries.get(key)
+            if wav is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return wav
+
+    def put(self, key, wav: bytes):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            if key not in self.seen:
+                self.seen[key] = True
+                if len(self.seen) > 4 * self.max_entries:
+                    self.seen.popitem(last=False)
+                return
+            self.entries[key] = wav
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.seen.clear()
+
+
+phrase_cache = PhraseCache(Config.TTS_PHRASE_CACHE_ENTRIES)
+
+
+# ==================== STREAMING ====================
+
+def stream_speech(scheduler: TTSScheduler, text: str, voice: str, speed: float = 1.0, lang: str = "en-us"):
+    """
+    Generator of WAV bytes for a short text
+
+    Yields the header together with the first chunk's PCM, then one piece per
+    chunk. Chunks not yet synthesized are cancelled if the client goes away.
+    The complete WAV is offered to phrase_cache at the end.
+    """
+    from audio_processing import to_pcm16
+
+    tts = scheduler.tts
+    postprocessor = tts.postprocessor
+    chunks = speech_chunks(tts, text, Config.TTS_FIRST_CHUNK_CHARS, Config.TTS_CHUNK_CHARS)
+    jobs = [
+        scheduler.submit(chunk, voice, speed, lang, FIRST_AUDIO if i == 0 else INTERACTIVE)
+        for i, chunk in enumerate(chunks)
+    ]
+
+    sample_rate = postprocessor.target_sample_rate or tts.sample_rate
+    gap = bytes(2 * (sample_rate * postprocessor.sentence_pause_ms // 1000))
+    parts = []
+    try:
+        for i, job in enumerate(jobs):
+            samples, sr = job.wait()
+            samples, sr = postprocessor.process(samples, sr)
+            pcm = to_pcm16(samples).tobytes()
+            if i == 0:
+                parts.append(pcm)
+                yield wav_header(sample_rate) + pcm
+            else:
+                parts += (gap, pcm)
+                yield gap + pcm
+    finally:
+        for job in jobs:
+            job.cancel()
+
+    data = b"".join(parts)
+    phrase_cache.put(phrase_key(text, voice, speed, lang), wav_header(sample_rate, len(data)) + data)
@@ -0,0 +1,210 @@
+"""
+Server-side test grading: batched NumPy scoring and bulk writes
+Grades synthetic submissions of the first test in frontend/src/data/tests.json
+with backend/grading.py:
+
+    scoring     one submission at a time (what grading on each request would
+                do) vs one vectorized batch per class, per-submission cost
+    ordering    answers of four qualities (model answer, keywords only, half
+                the keywords, off-topic): mean percentage per quality, which
+                must be strictly decreasing
+    memory      one question over a full GRADING_BATCH_SIZE batch of
+                --long-words word answers with a large vocabulary: peak
+                traced allocation and time
+    pipeline    --classes x --students submissions queued in SQLite, then
+                grade_pending(): process pool, bulk UPDATE of test_results,
+                leaderboard and analytics rollups; submissions per second
+
+Usage:
+    python benchmarks/bench_grading.py --students 40 --classes 10
+    python benchmarks/bench_grading.py --check
+"""
+
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+TESTS_JSON = Path(__file__).parent.parent / "frontend" / "src" / "data" / "tests.json"
+QUALITIES = ("model", "keywords", "half", "off-topic")
+FILLER = ("the", "students", "think", "about", "this", "because", "we", "learned", "in", "class",
+          "it", "is", "important", "and", "very", "interesting", "for", "everyone")
+OFF_TOPIC = ("football", "weather", "holiday", "music", "cricket", "market", "river", "festival")
+
+
+def synthetic_answers(test: dict, quality: str, rng) -> dict:
+    """One student's answers at a given quality, with filler words like real writing"""
+    answers = {}
+    for question in test["questions"]:
+        keywords = list(question["expected_keywords"])
+        if quality == "model":
+            words = question["sample_answer"].split()
+        elif quality == "keywords":
+            words = keywords + list(rng.choice(FILLER, size=12))
+        elif quality == "half":
+            words = keywords[:len(keywords) // 2] + list(rng.choice(FILLER, size=12))
+        else:
+            words = list(rng.choice(OFF_TOPIC + FILLER, size=20))
+        if quality != "model":
+            rng.shuffle(words)
+        answers[question["id"]] = " ".join(words)
+    return answers
+
+
+def class_submissions(test: dict, students: int, rng) -> tuple[list, list]:
+    qualities = [QUALITIES[i % len(QUALITIES)] for i in range(students)]
+    return [synthetic_answers(test, q, rng) for q in qualities], qualities
+
+
+# ==================== SCORING ====================
+
+def bench_scoring(key: dict, submissions: list, qualities: list, weight: float) -> dict:
+    import grading
+
+    start = time.perf_counter()
+    single = [grading.grade_batch(key, [answers], weight)[0] for answers in submissions]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = grading.grade_batch(key, submissions, weight)
+    batch_seconds = time.perf_counter() - start
+
+    percentages = {q: statistics.mean(100 * s / key["totalMarks"] for s, sq in zip(batched, qualities) if sq == q)
+                   for q in QUALITIES}
+    return {
+        "single_us": single_seconds / len(submissions) * 1e6,
+        "batch_us": batch_seconds / len(submissions) * 1e6,
+        "max_difference": max(abs(a - b) for a, b in zip(single, batched)),
+        "percentages": percentages
+    }
+
+
+def bench_memory(key: dict, answers: int, words: int, weight: float, rng) -> dict:
+    import grading
+
+    vocabulary = [f"term{i}" for i in range(20_000)]
+    texts = [" ".join(rng.choice(vocabulary, size=words)) for _ in range(answers)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    grading.score_question(key["questions"][0], texts, weight)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"peak_mb": peak / 1e6, "seconds": seconds}
+
+
+# ==================== PIPELINE ====================
+
+def bench_pipeline(test: dict, classes: int, students: int, rng) -> dict:
+    import grading
+    import storage
+    from database import get_db_connection
+
+    storage.get_storage().init_schema()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO users (user_type, name, password_hash, roll_number, class_id) VALUES (%s, %s, %s, %s, %s)",
+        [("student", f"Student {i}", "x", f"R{i:05d}", f"CLASS-{i % classes}") for i in range(classes * students)]
+    )
+    grading.save_key(cursor, test, None)
+    cursor.execute("SELECT id FROM users ORDER BY id")
+    user_ids = [row[0] for row in cursor.fetchall()]
+    for user_id in user_ids:
+        cursor.execute("""
+            INSERT INTO test_results (user_id, test_id, answers, total_marks) VALUES (%s, %s, %s, %s)
+        """, (user_id, test["id"], json.dumps(synthetic_answers(test, QUALITIES[user_id % 4], rng)), test["total_marks"]))
+        grading.enqueue(cursor, cursor.lastrowid, test["id"])
+    conn.commit()
+
+    grading._get_pool().submit(int).result()  # Workers started outside the timing
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        graded = grading.grade_pending()
+    seconds = time.perf_counter() - start
+
+    cursor.execute("SELECT COUNT(*), SUM(tests_completed) FROM leaderboard")
+    leaderboard_rows, tests_completed = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) FROM test_results WHERE percentage IS NULL")
+    ungraded = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return {"graded": graded, "seconds": seconds, "ungraded": ungraded,
+            "leaderboard_rows": leaderboard_rows, "tests_completed": int(tests_completed or 0)}
+
+
+# ==================== MAIN ====================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Server-side test grading throughput and score ordering")
+    parser.add_argument("--students", type=int, default=40, help="Students per class")
+    parser.add_argument("--classes", type=int, default=10, help="Classes in the pipeline run")
+    parser.add_argument("--long-words", type=int, default=300, help="Words per answer in the memory run")
+    parser.add_argument("--max-mb", type=float, default=256, help="Peak memory allowed for one question's batch")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail unless quality ordering holds, batching is faster, a full batch stays under "
+                             "--max-mb and every submission is graded once")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.update(DB_BACKEND="sqlite", SQLITE_PATH=os.path.join(tmp, "grading.db"))
+    sys.path.insert(0, str(BACKEND_PATH))
+    import grading
+    from config import Config
+
+    test = json.loads(TESTS_JSON.read_text())["tests"][0]
+    key = grading.normalize_key(test)
+    rng = np.random.default_rng(0)
+    submissions, qualities = class_submissions(test, args.students, rng)
+
+    scoring = bench_scoring(key, submissions, qualities, Config.GRADING_SIMILARITY_WEIGHT)
+    print(f"scoring   {args.students} submissions x {len(key['questions'])} questions: "
+          f"one at a time {scoring['single_us']:.0f} µs, one class batch {scoring['batch_us']:.0f} µs per submission "
+          f"({scoring['single_us'] / scoring['batch_us']:.1f}x); batch IDF moves a score by at most "
+          f"{scoring['max_difference']:.2f} marks")
+    print("ordering  " + ", ".join(f"{q} {p:.0f}%" for q, p in scoring["percentages"].items()))
+
+    memory = bench_memory(key, Config.GRADING_BATCH_SIZE, args.long_words, Config.GRADING_SIMILARITY_WEIGHT, rng)
+    print(f"memory    {Config.GRADING_BATCH_SIZE} answers x {args.long_words} words, one question: "
+          f"peak {memory['peak_mb']:.0f} MB, {memory['seconds']:.1f} s")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = bench_pipeline(test, args.classes, args.students, rng)
+    total = args.classes * args.students
+    print(f"pipeline  {pipeline['graded']}/{total} queued submissions graded and written in "
+          f"{pipeline['seconds'] * 1000:.0f} ms ({pipeline['graded'] / pipeline['seconds']:.0f}/s, "
+          f"batches of {Config.GRADING_BATCH_SIZE}); leaderboard {pipeline['leaderboard_rows']} rows, "
+          f"{pipeline['tests_completed']} tests counted")
+
+    if args.check:
+        failed = []
+        values = [scoring["percentages"][q] for q in QUALITIES]
+        if any(a <= b for a, b in zip(values, values[1:])):
+            failed.append(f"quality ordering broken: {values}")
+        if scoring["batch_us"] >= scoring["single_us"]:
+            failed.append("batched scoring is not faster than one submission at a time")
+        if memory["peak_mb"] > args.max_mb:
+            failed.append(f"one question's batch peaked at {memory['peak_mb']:.0f} MB (limit {args.max_mb:.0f} MB)")
+        if pipeline["graded"] != total or pipeline["ungraded"] or pipeline["tests_completed"] != total:
+            failed.append(f"graded {pipeline['graded']}/{total}, {pipeline['ungraded']} left, "
+                          f"{pipeline['tests_completed']} tests on the leaderboard")
+        for message in failed:
+            print(f"✗ {message}")
+        if failed:
+            sys.exit(1)
+        print("✓ Grading check passed")
+
+
+if __name__ == "__main__":
+    main()
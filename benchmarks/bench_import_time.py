@@ -0,0 +1,84 @@
+"""
+Import-time profile of the Flask backend (python -X importtime)
+An API worker must be able to answer its first request without loading the
+TTS stack: NumPy, SciPy, sounddevice and kokoro_onnx are only imported when a
+lecture is generated.
+
+Usage:
+    python benchmarks/bench_import_time.py                  # profile, slowest modules
+    python benchmarks/bench_import_time.py --check          # exit 1 if a heavy module is imported
+                                                            # or the import exceeds --max-ms
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+
+# Must not be imported by `import app`
+HEAVY_MODULES = ("numpy", "scipy", "sounddevice", "kokoro_onnx", "onnxruntime", "tts_engine", "audio_processing")
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile() -> list[tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for every module imported by `import app`"""
+    env = dict(os.environ, LECTURE_GENERATION_ENABLED="False")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_PATH, env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import-time profile of backend/app.py")
+    parser.add_argument("--check", action="store_true", help="Fail on heavy imports or a slow import")
+    parser.add_argument("--max-ms", type=float, default=600, help="Upper bound for `import app` (best of --runs)")
+    parser.add_argument("--runs", type=int, default=3, help="Profiles to take; the fastest is reported")
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports of app.py to list")
+    args = parser.parse_args()
+
+    runs = [profile() for _ in range(args.runs)]
+    modules = min(runs, key=lambda m: next(c for name, _, c, _ in m if name == "app"))
+    total_ms = next(c for name, _, c, _ in modules if name == "app") / 1000
+
+    print(f"import app: {total_ms:.0f} ms ({len(modules)} modules, best of {args.runs})")
+    print("Slowest imports made directly by app.py:")
+    # importtime prints children before their parent: app's direct imports are the
+    # depth-1 lines between the previous top-level import and app itself
+    app_index = next(i for i, m in enumerate(modules) if m[0] == "app")
+    start = max((i for i, m in enumerate(modules[:app_index]) if m[3] == 0), default=-1) + 1
+    direct = [m for m in modules[start:app_index] if m[3] == 1]
+    for name, _, cumulative_us, _ in sorted(direct, key=lambda m: -m[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:>7.1f} ms  {name}")
+
+    imported = sorted({name for name, _, _, _ in modules if name.split(".")[0] in HEAVY_MODULES})
+    print(f"Heavy modules imported: {', '.join(imported) if imported else 'none'}")
+
+    if args.check:
+        failed = False
+        if imported:
+            print(f"✗ TTS stack loaded at import: {', '.join(imported)}")
+            failed = True
+        if total_ms > args.max_ms:
+            print(f"✗ import app took {total_ms:.0f} ms (limit {args.max_ms:.0f} ms)")
+            failed = True
+        if failed:
+            sys.exit(1)
+        print("✓ Import-time check passed")
+
+
+if __name__ == "__main__":
+    main()
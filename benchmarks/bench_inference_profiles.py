@@ -0,0 +1,143 @@
+"""
+Compare KokoroTTS inference profiles (fp32, int8) and thread counts
+Each configuration runs in a fresh process so RSS is not shared, and reports:
+
+    load     model/session load time
+    RTF      synthesis seconds per second of audio (best of --repeat)
+    RSS      peak resident memory of the process
+    vs fp32  audio difference against fp32 at the same thread count:
+             duration change and log-spectral distance (dB, lower is closer)
+
+Needs the real model files; create the int8 model first with
+`python KokoroTTS/inference_profiles.py quantize`.
+
+Usage:
+    python benchmarks/bench_inference_profiles.py
+    python benchmarks/bench_inference_profiles.py --threads 1,2,4 --repeat 5
+"""
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+KOKORO_PATH = ROOT / "KokoroTTS"
+
+TEXT = (
+    "Photosynthesis is the process plants use to turn light into chemical energy. "
+    "Chlorophyll absorbs red and blue light and reflects green light back to our eyes."
+)
+VOICE = "am_liam"
+
+
+def child(profile: str, threads: int, repeat: int, samples_path: str):
+    """Runs inside the measured process; prints one JSON line"""
+    import resource
+
+    sys.path.insert(0, str(KOKORO_PATH))
+    from tts_engine import KokoroTTS
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tts = KokoroTTS(profile={"name": profile, "intra_op_threads": threads}, phoneme_cache=False)
+    load = time.perf_counter() - start
+
+    tts.synthesize(TEXT, voice=VOICE)  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        samples, sr = tts.synthesize(TEXT, voice=VOICE)
+        best = min(best, (time.perf_counter() - start) / (len(samples) / sr))
+
+    np.save(samples_path, np.asarray(samples, dtype=np.float32))
+    print(json.dumps({
+        "load_s": load,
+        "rtf": best,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "sample_rate": sr
+    }))
+
+
+def log_spectral_distance(a: np.ndarray, b: np.ndarray, frame: int = 1024, hop: int = 256) -> float:
+    """Mean log-spectral distance in dB over the frames both signals cover"""
+    n = min(len(a), len(b))
+    window = np.hanning(frame).astype(np.float32)
+
+    def spectrum(x):
+        frames = np.lib.stride_tricks.sliding_window_view(x[:n], frame)[::hop]
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+        return 10 * np.log10(power + 1e-10)
+
+    diff = spectrum(a) - spectrum(b)
+    return float(np.mean(np.sqrt(np.mean(diff ** 2, axis=1))))
+
+
+def measure(profile: str, threads: int, repeat: int, workdir: Path) -> dict | None:
+    samples_path = workdir / f"{profile}_{threads}.npy"
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", profile, "--threads", str(threads),
+         "--repeat", str(repeat), "--samples", str(samples_path)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"  {profile} x{threads}: failed\n{result.stderr.strip().splitlines()[-1]}")
+        return None
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["samples"] = np.load(samples_path)
+    return report
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="RTF, RSS and audio difference per inference profile")
+    parser.add_argument("--profiles", default="fp32,int8", help="Comma-separated profiles")
+    parser.add_argument("--threads", default="4", help="Comma-separated intra-op thread counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed syntheses per configuration")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--samples", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, int(args.threads), args.repeat, args.samples)
+        return
+
+    if not (KOKORO_PATH / "kokoro-v1.0.onnx").exists():
+        print("Kokoro model files not found in KokoroTTS/; this benchmark needs the real model.")
+        return
+
+    sys.path.insert(0, str(KOKORO_PATH))
+    from inference_profiles import MODEL_FILES
+
+    print(f"{'profile':<8} {'threads':>7} {'load':>7} {'RTF':>7} {'RSS':>8} {'duration':>9} {'LSD':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in [int(t) for t in args.threads.split(",")]:
+            reference = None
+            for profile in args.profiles.split(","):
+                if not (KOKORO_PATH / MODEL_FILES[profile]).exists():
+                    print(f"{profile:<8} {MODEL_FILES[profile]} missing, skipped")
+                    continue
+                report = measure(profile, threads, args.repeat, Path(tmp))
+                if report is None:
+                    continue
+                if profile == "fp32":
+                    reference = report
+
+                duration, lsd = "", ""
+                if reference is not None and profile != "fp32":
+                    change = len(report["samples"]) / len(reference["samples"]) - 1
+                    duration = f"{change:+.1%}"
+                    lsd = f"{log_spectral_distance(report['samples'], reference['samples']):.2f}dB"
+                print(f"{profile:<8} {threads:>7} {report['load_s']:>6.2f}s {report['rtf']:>7.3f} "
+                      f"{report['rss_mb']:>6.0f}MB {duration:>9} {lsd:>7}")
+
+
+if __name__ == "__main__":
+    main()
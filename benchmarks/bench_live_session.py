@@ -0,0 +1,263 @@
+"""
+Teacher-driven sessions: start sync, control fan-out and prefetch load
+Three measurements for a room of --devices devices:
+
+    fan-out     POST /api/sessions/<id>/control to the state event arriving on
+                every device's stream (Flask test client, one thread per device)
+    sync        how far apart devices start a "play", simulated over a Wi-Fi
+                hotspot (skewed device clocks, jittery one-way delays):
+                naive (start on receipt) vs live_session (clock offset from
+                /api/sessions/clock samples + play scheduled SESSION_LEAD_MS ahead)
+    prefetch    the next slide's audio and image pulled over a shared link:
+                everyone at the slide change vs the session's staggered plan;
+                reports peak concurrent downloads and the longest wait after
+                the slide change
+
+Usage:
+    python benchmarks/bench_live_session.py --devices 40
+    python benchmarks/bench_live_session.py --check
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+CLOCK_SAMPLES = 5
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+# ==================== FAN-OUT ====================
+
+def write_lecture(lectures_dir: Path, slides: int, slide_seconds: float) -> str:
+    lecture_id = "bench_session"
+    lecture_dir = lectures_dir / lecture_id
+    lecture_dir.mkdir(parents=True)
+    lecture = {"id": lecture_id, "title": "Bench", "segments": [
+        {
+            "index": n,
+            "slide": {"title": f"Slide {n}", "content": [], "path": f"/lectures/{lecture_id}/slides/slide{n}.svg"},
+            "audio": {"path": f"/lectures/{lecture_id}/audio/audio{n}.wav", "text": "words " * 50},
+            "captions": {"path": f"/lectures/{lecture_id}/captions/caption{n}.vtt",
+                         "timing": [[0, int(slide_seconds * 1000), 250]]}
+        }
+        for n in range(1, slides + 1)
+    ]}
+    (lecture_dir / "lecture.json").write_text(json.dumps(lecture))
+    return lecture_id
+
+
+def bench_fanout(devices: int, commands: int) -> dict:
+    import app as app_module
+    import auth
+    import storage
+    from database import get_db_connection
+
+    storage.get_storage().init_schema()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO users (user_type, name, password_hash, roll_number, class_id) VALUES (%s, %s, %s, %s, %s)",
+        [("student", f"Student {i}", "x", f"R{i:03d}", "room") for i in range(devices)]
+    )
+    conn.commit()
+    cursor.execute("SELECT id FROM users WHERE class_id = %s", ("room",))
+    user_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+
+    lectures_dir = Path(tempfile.mkdtemp())
+    lecture_id = write_lecture(lectures_dir, slides=commands + 1, slide_seconds=30)
+    app_module.LECTURES_DIR = lectures_dir
+    client = app_module.app.test_client()
+    teacher = {"Authorization": f"Bearer {auth.generate_token(10_000, 'teacher', 'T')}"}
+    session_id = client.post("/api/sessions", json={"lectureId": lecture_id, "classId": "room"},
+                             headers=teacher).json["session"]["id"]
+
+    received = [[] for _ in user_ids]
+    connected = threading.Barrier(devices + 1)
+
+    def device(i, user_id):
+        headers = {"Authorization": f"Bearer {auth.generate_token(user_id, 'student', 'S')}"}
+        stream = iter(client.get(f"/api/sessions/{session_id}/events", headers=headers).response)
+        for _ in range(4):  # retry, session, initial state, prefetch
+            next(stream)
+        connected.wait()
+        for chunk in stream:
+            if chunk.startswith(b"event: state"):
+                received[i].append(time.perf_counter())
+            if chunk.startswith(b"event: end"):
+                return
+
+    threads = [threading.Thread(target=device, args=(i, u), daemon=True) for i, u in enumerate(user_ids)]
+    for thread in threads:
+        thread.start()
+    connected.wait()
+
+    latencies = []
+    for n in range(commands):
+        sent = time.perf_counter()
+        client.post(f"/api/sessions/{session_id}/control", json={"action": "slide", "slide": n + 2}, headers=teacher)
+        deadline = time.time() + 5
+        while any(len(r) < n + 1 for r in received) and time.time() < deadline:
+            time.sleep(0.001)
+        latencies += [r[n] - sent for r in received if len(r) > n]
+    client.post(f"/api/sessions/{session_id}/control", json={"action": "end"}, headers=teacher)
+    for thread in threads:
+        thread.join(5)
+    return {"p50_ms": percentile(latencies, 0.5) * 1000, "p95_ms": percentile(latencies, 0.95) * 1000,
+            "delivered": len(latencies), "expected": devices * commands}
+
+
+# ==================== SYNC ====================
+
+def wifi_delay(rng, size=None):
+    """One-way hotspot delay in seconds: mostly 3-20 ms, with a long tail"""
+    return rng.gamma(2.0, 0.006, size) + (rng.random(size) < 0.1) * rng.exponential(0.08, size)
+
+
+def bench_sync(devices: int, lead_ms: float, trials: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    naive, synced, late = [], [], 0
+    for _ in range(trials):
+        skew = rng.uniform(-2.0, 2.0, devices)  # device clock - server clock, seconds
+
+        # Offset estimate as the client does it: lowest-RTT sample, midpoint rule
+        up, down = wifi_delay(rng, (devices, CLOCK_SAMPLES)), wifi_delay(rng, (devices, CLOCK_SAMPLES))
+        best = np.argmin(up + down, axis=1)
+        rows = np.arange(devices)
+        # server time = t0 + up (true time, client sent at true t0), client midpoint = t0 + skew + (up + down) / 2
+        estimated = (up[rows, best] - (up[rows, best] + down[rows, best]) / 2) - skew
+        error = estimated - (-skew)
+
+        # The play command leaves the server at t=0 and arrives after one more hotspot delay
+        arrival = wifi_delay(rng, devices)
+        naive.append(np.ptp(arrival) * 1000)
+
+        # Scheduled: each device starts when its estimate of server time reaches startAt;
+        # a late arrival starts immediately and seeks forward, so audio position is still right
+        start = lead_ms / 1000
+        audible_offset = -error  # position error in seconds caused by the offset estimate
+        synced.append(np.ptp(audible_offset) * 1000)
+        late += int(np.sum(arrival > start))
+    return {
+        "naive_p50_ms": float(np.median(naive)), "naive_p95_ms": float(percentile(naive, 0.95)),
+        "synced_p50_ms": float(np.median(synced)), "synced_p95_ms": float(percentile(synced, 0.95)),
+        "late_share": late / (devices * trials)
+    }
+
+
+# ==================== PREFETCH ====================
+
+def shared_link(start_times, size_bytes: float, bandwidth: float) -> tuple[list, int]:
+    """Fluid simulation of downloads sharing one link equally: (finish times, peak concurrency)"""
+    pending = sorted(start_times)
+    active = {}  # download index -> bytes left
+    finish = [0.0] * len(pending)
+    now, peak, next_start = 0.0, 0, 0
+    while next_start < len(pending) or active:
+        if not active:
+            now = max(now, pending[next_start])
+        while next_start < len(pending) and pending[next_start] <= now:
+            active[next_start] = size_bytes
+            next_start += 1
+        peak = max(peak, len(active))
+        rate = bandwidth / len(active)
+        to_finish = min(active.values()) / rate
+        to_arrival = pending[next_start] - now if next_start < len(pending) else float("inf")
+        step = min(to_finish, to_arrival)
+        for key in list(active):
+            active[key] -= rate * step
+            if active[key] <= 1e-6:
+                finish[key] = now + step
+                del active[key]
+        now += step
+    return finish, peak
+
+
+def bench_prefetch(devices: int, slide_seconds: float, bandwidth_mbit: float) -> dict:
+    import live_session
+    from config import Config
+
+    # Next slide: 16-bit 24 kHz mono audio for the slide plus an SVG
+    size = slide_seconds * 24000 * 2 + 20_000
+    bandwidth = bandwidth_mbit * 1e6 / 8
+    plan = [{"slide": 1, "duration": slide_seconds, "assets": []}, {"slide": 2, "duration": slide_seconds, "assets": []}]
+    state = {"playing": True, "slide": 1, "position": 0.0, "startAt": 0, "at": 0}
+
+    naive_finish, naive_peak = shared_link([slide_seconds] * devices, size, bandwidth)
+    planned = [live_session.prefetch_time(state, plan, slot, 0) / 1000 for slot in range(devices)]
+    planned_finish, planned_peak = shared_link(planned, size, bandwidth)
+    return {
+        "size_mb": size / 1e6,
+        "naive_peak": naive_peak, "naive_wait": max(naive_finish) - slide_seconds,
+        "planned_peak": planned_peak, "planned_wait": max(0.0, max(planned_finish) - slide_seconds),
+        "fraction": Config.SESSION_PREFETCH_FRACTION
+    }
+
+
+# ==================== MAIN ====================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Teacher-driven session sync and prefetch")
+    parser.add_argument("--devices", type=int, default=40, help="Devices in the room")
+    parser.add_argument("--commands", type=int, default=10, help="Teacher commands timed for fan-out")
+    parser.add_argument("--slide-seconds", type=float, default=30, help="Slide audio length")
+    parser.add_argument("--bandwidth-mbit", type=float, default=30, help="Hotspot throughput shared by the room")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail if synced start spread p95 > 50 ms, fan-out p95 > 100 ms or prefetch stalls the slide change")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.update(DB_BACKEND="sqlite", SQLITE_PATH=os.path.join(tmp, "session.db"), METRICS_ENABLED="False")
+    sys.path.insert(0, str(BACKEND_PATH))
+    from config import Config
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        fanout = bench_fanout(args.devices, args.commands)
+    print(f"fan-out   {fanout['delivered']}/{fanout['expected']} state events, "
+          f"control to device p50 {fanout['p50_ms']:.1f} ms, p95 {fanout['p95_ms']:.1f} ms")
+
+    sync = bench_sync(args.devices, Config.SESSION_LEAD_MS, trials=200)
+    print(f"sync      start spread across {args.devices} devices: naive p50 {sync['naive_p50_ms']:.0f} ms, "
+          f"p95 {sync['naive_p95_ms']:.0f} ms; scheduled + clock offset p50 {sync['synced_p50_ms']:.1f} ms, "
+          f"p95 {sync['synced_p95_ms']:.1f} ms ({sync['late_share']:.1%} of plays arrive after "
+          f"the {Config.SESSION_LEAD_MS} ms lead and seek)")
+
+    prefetch = bench_prefetch(args.devices, args.slide_seconds, args.bandwidth_mbit)
+    print(f"prefetch  {prefetch['size_mb']:.2f} MB per device over {args.bandwidth_mbit:g} Mbit/s: "
+          f"all at slide change peak {prefetch['naive_peak']} downloads, last device waits "
+          f"{prefetch['naive_wait']:.1f} s; plan ({prefetch['fraction']:.0%} of slide) peak "
+          f"{prefetch['planned_peak']}, wait {prefetch['planned_wait']:.1f} s")
+
+    if args.check:
+        failed = []
+        if sync["synced_p95_ms"] > 50:
+            failed.append(f"start spread p95 {sync['synced_p95_ms']:.1f} ms")
+        if fanout["delivered"] != fanout["expected"] or fanout["p95_ms"] > 100:
+            failed.append(f"fan-out {fanout['delivered']}/{fanout['expected']}, p95 {fanout['p95_ms']:.1f} ms")
+        if prefetch["planned_wait"] > 0:
+            failed.append(f"prefetch plan leaves a {prefetch['planned_wait']:.1f} s wait")
+        for message in failed:
+            print(f"✗ {message}")
+        if failed:
+            sys.exit(1)
+        print("✓ Live session check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+Live class updates: polling vs Server-Sent Events push
+Reports, for one class of --students devices:
+
+    polling     cost of every device polling GET /api/leaderboard (Flask test
+                client, SQLite): time and SQL statements per round of polls
+    fan-out     a burst of --burst score changes published to the hub
+                (backend/live_updates.py) with every device subscribed:
+                publish cost, events per device, publish-to-delivery latency
+    stalled     one device that never reads while 10,000 changes are
+                flushed: its queue stays bounded and it resyncs with one snapshot
+    broker      the same publish relayed to a second server process through
+                `live_updates.py --broker` (multiprocessing connections)
+    restart     a process with no streams of its own writes through
+                read_change()/publish_progress() before the broker exists,
+                after it starts, and after it is restarted: how many writes
+                reach the second process, and how long reconnecting takes
+
+Usage:
+    python benchmarks/bench_live_updates.py --students 40
+    python benchmarks/bench_live_updates.py --check
+"""
+
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+CLASS_ID = "bench_class"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+# ==================== POLLING ====================
+
+def bench_polling(students: int, rounds: int) -> dict:
+    """Per round: every student polls the class leaderboard once"""
+    import app as app_module
+    import auth
+    import storage
+    from database import get_db_connection
+
+    storage.get_storage().init_schema()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO users (user_type, name, password_hash, roll_number, class_id) VALUES (%s, %s, %s, %s, %s)",
+        [("student", f"Student {i}", "x", f"R{i:03d}", CLASS_ID) for i in range(students)]
+    )
+    cursor.execute("SELECT id FROM users WHERE class_id = %s", (CLASS_ID,))
+    user_ids = [row[0] for row in cursor.fetchall()]
+    cursor.executemany(
+        "INSERT INTO leaderboard (user_id, total_score) VALUES (%s, %s)",
+        [(user_id, 10 * i) for i, user_id in enumerate(user_ids)]
+    )
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    client = app_module.app.test_client()
+    headers = [{"Authorization": f"Bearer {auth.generate_token(u, 'student', 'S')}"} for u in user_ids]
+    round_times, queries = [], 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for h in headers:
+            response = client.get("/api/leaderboard", headers=h)
+            queries += int(response.headers.get("X-Query-Count", 0))
+        round_times.append(time.perf_counter() - start)
+    return {
+        "round_ms": statistics.mean(round_times) * 1000,
+        "queries_per_round": queries / rounds
+    }
+
+
+# ==================== FAN-OUT ====================
+
+def make_hub(live_updates, students: int, broker=None):
+    standings = {
+        user_id: {"name": f"Student {user_id}", "score": 10 * user_id, "streak": 0}
+        for user_id in range(1, students + 1)
+    }
+    return live_updates.LiveHub(load_standings=lambda class_id: dict(standings), broker=broker)
+
+
+def drain(hub, subscriber, received: list, stop: threading.Event):
+    while not stop.is_set():
+        for event in hub.next_events(subscriber, timeout=0.1):
+            received.append((time.perf_counter(), event))
+
+
+def bench_fanout(students: int, burst: int) -> dict:
+    import live_updates
+
+    hub = make_hub(live_updates, students)
+    stop = threading.Event()
+    subscribers, inboxes, threads = [], [], []
+    for user_id in range(1, students + 1):
+        subscriber = hub.subscribe(CLASS_ID, user_id, is_teacher=False)
+        inbox = []
+        thread = threading.Thread(target=drain, args=(hub, subscriber, inbox, stop), daemon=True)
+        thread.start()
+        subscribers.append(subscriber)
+        inboxes.append(inbox)
+        threads.append(thread)
+    time.sleep(0.2)  # snapshots delivered
+    for inbox in inboxes:
+        inbox.clear()
+
+    # A class finishing a quiz: each student's score changes within one second
+    publish_times, published_at = [], {}
+    sent = time.perf_counter()
+    for i in range(burst):
+        user_id = i % students + 1
+        score = 1000 + 7 * i
+        start = time.perf_counter()
+        published_at[score] = start
+        hub.publish({"type": "score", "classId": CLASS_ID, "userId": user_id,
+                     "name": f"Student {user_id}", "score": score, "streak": 0})
+        publish_times.append(time.perf_counter() - start)
+        time.sleep(1.0 / burst)
+    burst_seconds = time.perf_counter() - sent
+    time.sleep(live_updates.Config.LIVE_COALESCE_MS / 1000 + 0.3)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    # Each changed score, from its publish to the first event carrying it on each device
+    latencies = []
+    for inbox in inboxes:
+        first_seen = {}
+        for delivered, event in inbox:
+            for change in event.get("changes", []):
+                first_seen.setdefault(change["score"], delivered)
+        latencies += [delivered - published_at[score] for score, delivered in first_seen.items()
+                      if score in published_at]
+    for subscriber in subscribers:
+        hub.unsubscribe(subscriber)
+    return {
+        "publish_us": statistics.mean(publish_times) * 1e6,
+        "events_per_device": statistics.mean(len(inbox) for inbox in inboxes),
+        "burst_seconds": burst_seconds,
+        "delivery_p50_ms": percentile(latencies, 0.5) * 1000 if latencies else float("nan"),
+        "delivery_p95_ms": percentile(latencies, 0.95) * 1000 if latencies else float("nan")
+    }
+
+
+def bench_stalled(students: int) -> dict:
+    import live_updates
+
+    hub = make_hub(live_updates, students)
+    stalled = hub.subscribe(CLASS_ID, 1, is_teacher=True)
+    hub.next_events(stalled, timeout=0)  # initial snapshot
+    most_queued = 0
+    for i in range(10000):
+        user_id = i % students + 1
+        hub.deliver({"type": "score", "classId": CLASS_ID, "userId": user_id,
+                     "name": f"Student {user_id}", "score": 1000 + i, "streak": 0})
+        hub.deliver({"type": "progress", "classId": CLASS_ID, "userId": user_id,
+                     "lectureId": f"L{i % 5}", "progressPercent": i % 100, "completed": False})
+        if i % 10 == 9:
+            hub.flush()
+            most_queued = max(most_queued, len(stalled.events))
+    events = hub.next_events(stalled, timeout=0)
+    hub.unsubscribe(stalled)
+    return {
+        "most_queued": most_queued,
+        "limit": live_updates.Config.LIVE_QUEUE_EVENTS,
+        "resync_events": [event["type"] for event in events]
+    }
+
+
+# ==================== BROKER ====================
+
+def _remote_process(address, ready, results, students, count, seconds=10, retry_seconds=None):
+    """Second server process: subscribes locally, records when publishes arrive"""
+    sys.path.insert(0, str(BACKEND_PATH))
+    os.environ["LIVE_BROKER_ADDRESS"] = f"{address[0]}:{address[1]}"
+    sys.stdout = io.StringIO()  # Connection notices from the link's threads
+    import live_updates
+    if retry_seconds is not None:
+        live_updates.BROKER_RETRY_SECONDS = retry_seconds
+    broker = live_updates.BrokerLink(address)
+    hub = make_hub(live_updates, students, broker)
+    broker.hub = hub
+    subscriber = hub.subscribe(CLASS_ID, 1, is_teacher=True)
+    hub.next_events(subscriber, timeout=1)
+    ready.set()
+    arrivals = {}
+    deadline = time.time() + seconds
+    while len(arrivals) < count and time.time() < deadline:
+        for event in hub.next_events(subscriber, timeout=0.5):
+            if event["type"] == "progress":
+                arrivals[event["lectureId"]] = time.time()
+    results.put(arrivals)
+
+
+def bench_broker(students: int, count: int = 50) -> dict:
+    import live_updates
+
+    with socket_free_port() as port:
+        address = ("127.0.0.1", port)
+    ctx = mp.get_context("spawn")
+    broker = ctx.Process(target=_run_broker_quietly, args=(address,), daemon=True)
+    broker.start()
+    time.sleep(0.5)
+
+    ready, results = ctx.Event(), ctx.Queue()
+    remote = ctx.Process(target=_remote_process, args=(address, ready, results, students, count), daemon=True)
+    remote.start()
+    ready.wait(15)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        link = live_updates.BrokerLink(address)
+        hub = make_hub(live_updates, students, link)
+        link.hub = hub
+        link.ensure_connected()
+    time.sleep(0.2)
+    sent = {}
+    for i in range(count):
+        sent[f"L{i}"] = time.time()
+        hub.publish({"type": "progress", "classId": CLASS_ID, "userId": 1, "lectureId": f"L{i}",
+                     "progressPercent": 50, "completed": False})
+        time.sleep(0.01)
+
+    arrivals = results.get(timeout=20)
+    remote.join(5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        broker.terminate()
+        time.sleep(0.2)  # the link notices the broker going away
+    latencies = [arrivals[key] - sent[key] for key in arrivals]
+    return {
+        "delivered": len(arrivals),
+        "sent": count,
+        "relay_p95_ms": percentile(latencies, 0.95) * 1000 if latencies else float("nan")
+    }
+
+
+def bench_restart(count: int = 20, retry_seconds: float = 0.5) -> dict:
+    import live_updates
+    from database import get_db_connection
+
+    live_updates.BROKER_RETRY_SECONDS = retry_seconds
+    with socket_free_port() as port:
+        address = ("127.0.0.1", port)
+    ctx = mp.get_context("spawn")
+
+    # This process has no streams: only read_change() can notice the broker
+    link = live_updates.BrokerLink(address)
+    hub = make_hub(live_updates, 1, link)
+    link.hub = hub
+    default_hub, live_updates.hub = live_updates.hub, hub
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM users WHERE class_id = %s ORDER BY id LIMIT 1", (CLASS_ID,))
+    user_id = cursor.fetchone()[0]
+
+    def write(lecture_id):
+        change = live_updates.read_change(cursor, user_id)
+        live_updates.publish_progress(change, lecture_id, 50, False)
+        return change is not None
+
+    def reconnect_seconds(since):
+        """Keep writing until read_change() sees the broker again; seconds since it started"""
+        while not live_updates.hub.active() and time.perf_counter() - since < 10 * retry_seconds + 5:
+            live_updates.read_change(cursor, user_id)
+            time.sleep(0.02)
+        return time.perf_counter() - since
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            early = write("early")  # before the broker exists: nowhere to send
+            broker = ctx.Process(target=_run_broker_quietly, args=(address,), daemon=True)
+            started = time.perf_counter()
+            broker.start()
+            time.sleep(0.5)
+            ready, results = ctx.Event(), ctx.Queue()
+            remote = ctx.Process(target=_remote_process,
+                                 args=(address, ready, results, 1, 2 * count, 30, retry_seconds), daemon=True)
+            remote.start()
+            ready.wait(15)
+
+            late_start = reconnect_seconds(started)
+            for i in range(count):
+                write(f"A{i}")
+                time.sleep(0.01)
+
+            broker.terminate()
+            broker.join(5)
+            time.sleep(0.2)
+            broker = ctx.Process(target=_run_broker_quietly, args=(address,), daemon=True)
+            started = time.perf_counter()
+            broker.start()
+            restart = reconnect_seconds(started)
+            time.sleep(4 * retry_seconds)  # the remote's stream heartbeat rejoins too
+            for i in range(count):
+                write(f"B{i}")
+                time.sleep(0.01)
+
+            arrivals = results.get(timeout=40)
+            remote.join(5)
+            broker.terminate()
+            time.sleep(0.2)  # the link notices the broker going away
+    finally:
+        live_updates.hub = default_hub
+        cursor.close()
+        conn.close()
+    return {
+        "early_sent": early,
+        "late_start_s": late_start,
+        "restart_s": restart,
+        "before": sum(key.startswith("A") for key in arrivals),
+        "after": sum(key.startswith("B") for key in arrivals),
+        "sent": count
+    }
+
+
+def _run_broker_quietly(address):
+    sys.path.insert(0, str(BACKEND_PATH))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import live_updates
+        live_updates.run_broker(address)
+
+
+@contextlib.contextmanager
+def socket_free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    yield port
+
+
+# ==================== MAIN ====================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Live class updates: polling vs SSE push")
+    parser.add_argument("--students", type=int, default=40, help="Devices in the class")
+    parser.add_argument("--burst", type=int, default=40, help="Score changes within one second")
+    parser.add_argument("--rounds", type=int, default=5, help="Polling rounds timed")
+    parser.add_argument("--poll-seconds", type=float, default=3, help="Polling interval being replaced")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail on unbounded stalled queue, lost broker messages (also across a broker "
+                             "restart) or slow delivery")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.update(DB_BACKEND="sqlite", SQLITE_PATH=os.path.join(tmp, "live.db"))
+    sys.path.insert(0, str(BACKEND_PATH))
+    with contextlib.redirect_stdout(io.StringIO()):
+        polling = bench_polling(args.students, args.rounds)
+    import live_updates
+    coalesce_ms = live_updates.Config.LIVE_COALESCE_MS
+
+    per_minute = 60 / args.poll_seconds
+    print(f"polling   {args.students} devices every {args.poll_seconds:g}s: "
+          f"{polling['round_ms']:.0f} ms and {polling['queries_per_round']:.0f} SQL statements per round "
+          f"= {polling['round_ms'] * per_minute / 1000:.1f} s server time, "
+          f"{polling['queries_per_round'] * per_minute:.0f} statements per minute")
+
+    fanout = bench_fanout(args.students, args.burst)
+    print(f"fan-out   {args.burst} changes in {fanout['burst_seconds']:.1f}s to {args.students} streams: "
+          f"publish {fanout['publish_us']:.0f} µs, {fanout['events_per_device']:.1f} events per device "
+          f"(coalesce {coalesce_ms:g} ms), delivery p50 {fanout['delivery_p50_ms']:.0f} ms, "
+          f"p95 {fanout['delivery_p95_ms']:.0f} ms")
+
+    stalled = bench_stalled(args.students)
+    print(f"stalled   10,000 changes: queue peaked at {stalled['most_queued']} "
+          f"(limit {stalled['limit']}), on read: {', '.join(stalled['resync_events'])}")
+
+    broker = bench_broker(args.students)
+    print(f"broker    {broker['delivered']}/{broker['sent']} relayed to a second process, "
+          f"delivery p95 {broker['relay_p95_ms']:.0f} ms (including coalesce window)")
+
+    restart = bench_restart()
+    print(f"restart   writer without streams: reconnected {restart['late_start_s']:.1f} s after a late broker "
+          f"start, {restart['restart_s']:.1f} s after a broker restart; {restart['before']}/{restart['sent']} "
+          f"writes relayed before the restart, {restart['after']}/{restart['sent']} after")
+
+    if args.check:
+        failed = []
+        if stalled["most_queued"] > stalled["limit"] or stalled["resync_events"] != ["snapshot"]:
+            failed.append("stalled stream not bounded/resynced")
+        if broker["delivered"] != broker["sent"]:
+            failed.append(f"broker lost {broker['sent'] - broker['delivered']} messages")
+        if restart["before"] != restart["sent"] or restart["after"] != restart["sent"]:
+            failed.append(f"writes lost around a broker (re)start: {restart['before']}/{restart['sent']} before, "
+                          f"{restart['after']}/{restart['sent']} after the restart")
+        if not fanout["delivery_p95_ms"] <= coalesce_ms + 250:
+            failed.append(f"fan-out delivery p95 {fanout['delivery_p95_ms']:.0f} ms")
+        for message in failed:
+            print(f"✗ {message}")
+        if failed:
+            sys.exit(1)
+        print("✓ Live updates check passed")
+
+
+if __name__ == "__main__":
+    main()
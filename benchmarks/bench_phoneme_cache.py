@@ -0,0 +1,95 @@
+"""
+Profile how much of synthesis time goes to G2P, with and without the phoneme cache
+Uses the real Kokoro model when KokoroTTS/kokoro-v1.0.onnx exists, otherwise
+the stub engine (whose G2P is trivial, so only cache overhead is measured).
+
+Usage:
+    python benchmarks/bench_phoneme_cache.py --passes 3
+"""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "KokoroTTS"))
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+from script_parser import parse_script
+from tts_engine import KokoroTTS
+
+
+def load_tts(phoneme_cache: bool) -> KokoroTTS:
+    """Real engine if the model files are present, stub otherwise"""
+    if (ROOT / "KokoroTTS" / "kokoro-v1.0.onnx").exists():
+        return KokoroTTS(phoneme_cache=phoneme_cache)
+    from stub_kokoro import StubKokoro
+    return KokoroTTS(kokoro=StubKokoro(), phoneme_cache=phoneme_cache)
+
+
+def lecture_chunks(tts: KokoroTTS) -> list[str]:
+    """_split_text chunks of the bundled photosynthesis lecture"""
+    source = (ROOT / "KokoroTTS" / "generate_full_lecture.py").read_text(encoding="utf-8")
+    script = source.split('PHOTOSYNTHESIS_LECTURE = """')[1].split('"""')[0]
+    chunks = []
+    for segment in parse_script(script):
+        chunks.extend(tts._split_text(segment["speech_clean"]))
+    return chunks
+
+
+def run(passes: int = 3) -> dict:
+    """Synthesize the lecture `passes` times with and without the cache"""
+    results = {}
+
+    tts = load_tts(phoneme_cache=False)
+    chunks = lecture_chunks(tts)
+    g2p = tts.kokoro.tokenizer.phonemize
+    g2p_seconds = 0.0
+    start = time.perf_counter()
+    for _ in range(passes):
+        for chunk in chunks:
+            t0 = time.perf_counter()
+            g2p(chunk, "en-us")
+            g2p_seconds += time.perf_counter() - t0
+            tts.synthesize(chunk, voice="am_liam")
+    total = time.perf_counter() - start
+    # create() phonemizes internally, so G2P was timed with a separate identical call
+    results["uncached"] = {
+        "synthesis_seconds": round(total - g2p_seconds, 4),
+        "g2p_seconds": round(g2p_seconds, 4),
+        "g2p_share": round(g2p_seconds / max(total - g2p_seconds, 1e-9), 4)
+    }
+
+    tts = load_tts(phoneme_cache=True)
+    start = time.perf_counter()
+    for _ in range(passes):
+        for chunk in chunks:
+            tts.synthesize(chunk, voice="am_liam")
+    total = time.perf_counter() - start
+    stats = tts.g2p_stats()
+    results["cached"] = {
+        "synthesis_seconds": round(total, 4),
+        "g2p_seconds": round(stats["g2p_seconds"], 4),
+        "cache_lookup_seconds": round(stats["lookup_seconds"] - stats["g2p_seconds"], 4),
+        "g2p_share": round(stats["lookup_seconds"] / max(total, 1e-9), 4),
+        "sentence_hits": stats["sentence_hits"],
+        "misses": stats["misses"]
+    }
+    results["chunks_per_pass"] = len(chunks)
+    results["passes"] = passes
+    return results
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="G2P share of synthesis time, with and without the phoneme cache")
+    parser.add_argument("--passes", type=int, default=3, help="Times to synthesize the lecture")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.passes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Lecture Q&A retrieval: index build time, index size, ask latency and recall
+Builds the passage index (backend/retrieval.py) of synthetic lectures with
+--slides slides each, then asks questions made from a passage's words:
+
+    exact       five content words of the passage
+    misspelled  the same words, one letter dropped from two of them
+    partial     two words of the passage among three unrelated ones
+
+recall@1 / recall@3: the source passage's slide is the best / among the top 3.
+Latency is for a cached index (the usual case after a lecture's first
+question); the first question of a lecture also loads its files (cold).
+
+Usage:
+    python benchmarks/bench_retrieval.py --slides 40
+    python benchmarks/bench_retrieval.py --check
+"""
+
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import retrieval
+from bench_search import VOCABULARY, word
+
+
+def synthetic_lecture(slides: int, rng) -> dict:
+    """Lecture whose slides draw on a Zipf vocabulary, like real narration"""
+    weights = 1.0 / np.arange(1, VOCABULARY + 1) ** 1.05
+    weights /= weights.sum()
+    take = lambda n: " ".join(word(r) for r in rng.choice(VOCABULARY, size=n, p=weights))
+    return {
+        "id": "lecture_bench",
+        "title": take(4).title(),
+        "segments": [
+            {
+                "index": s + 1,
+                "slide": {"title": take(3).title(), "content": [f"- {take(5)}" for _ in range(3)]},
+                "audio": {"text": " ".join(take(int(rng.integers(8, 20))) + "." for _ in range(8))}
+            }
+            for s in range(slides)
+        ]
+    }
+
+
+def make_question(kind: str, passage: str, rng) -> str:
+    words = [w.strip(".") for w in passage.split() if len(w) > 4]
+    picked = list(rng.choice(words, size=min(5, len(words)), replace=False))
+    if kind == "misspelled":
+        for i in rng.choice(len(picked), size=min(2, len(picked)), replace=False):
+            cut = int(rng.integers(1, len(picked[i]) - 1))
+            picked[i] = picked[i][:cut] + picked[i][cut + 1:]
+    elif kind == "partial":
+        picked = picked[:2] + [word(int(r)) for r in rng.integers(5000, VOCABULARY, size=3)]
+    return " ".join(picked)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lecture Q&A retrieval quality and latency")
+    parser.add_argument("--slides", type=int, default=20, help="Slides per synthetic lecture")
+    parser.add_argument("--lectures", type=int, default=5, help="Synthetic lectures")
+    parser.add_argument("--questions", type=int, default=100, help="Questions per kind and lecture")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail if exact/misspelled recall@3 < 0.9 or p95 above --max-p95-ms")
+    parser.add_argument("--max-p95-ms", type=float, default=20, help="Upper bound for cached ask p95")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    tmp = Path(tempfile.mkdtemp())
+    kinds = ("exact", "misspelled", "partial")
+    hits = {kind: [0, 0] for kind in kinds}
+    asked = 0
+    build_times, cold_times, times, sizes, passage_counts = [], [], [], [], []
+
+    for n in range(args.lectures):
+        lecture = synthetic_lecture(args.slides, rng)
+        lecture_dir = tmp / f"lecture_{n}"
+        lecture_dir.mkdir()
+        (lecture_dir / "lecture.json").write_text("{}")
+
+        start = time.perf_counter()
+        passage_counts.append(retrieval.build_index(lecture, lecture_dir))
+        build_times.append(time.perf_counter() - start)
+        sizes.append(sum((lecture_dir / name).stat().st_size for name in ("passages.npy", "passages.json")))
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            retrieval.ask(lecture_dir, "warm up")
+        cold_times.append(time.perf_counter() - start)
+
+        passages = retrieval.lecture_passages(lecture)
+        for _ in range(args.questions):
+            source = passages[int(rng.integers(len(passages)))]
+            for kind in kinds:
+                question = make_question(kind, source["text"], rng)
+                start = time.perf_counter()
+                results = retrieval.ask(lecture_dir, question, k=3)
+                times.append(time.perf_counter() - start)
+                slides = [r["slide"] for r in results]
+                hits[kind][0] += slides[:1] == [source["slide"]]
+                hits[kind][1] += source["slide"] in slides
+            asked += 1
+
+    times.sort()
+    p50 = statistics.median(times) * 1000
+    p95 = times[int(0.95 * (len(times) - 1))] * 1000
+    print(f"{args.lectures} lectures x {args.slides} slides, "
+          f"{statistics.mean(passage_counts):.0f} passages per lecture")
+    print(f"build {statistics.mean(build_times) * 1000:.1f} ms, "
+          f"index {statistics.mean(sizes) / 1024:.0f} KB per lecture")
+    print(f"ask: cold {statistics.mean(cold_times) * 1000:.1f} ms, cached p50 {p50:.2f} ms, p95 {p95:.2f} ms\n")
+
+    print(f"{'question':<11} {'recall@1':>9} {'recall@3':>9}")
+    failed = []
+    for kind in kinds:
+        at1, at3 = (h / asked for h in hits[kind])
+        print(f"{kind:<11} {at1:>9.1%} {at3:>9.1%}")
+        if kind != "partial" and at3 < 0.9:
+            failed.append(f"{kind}: recall@3 {at3:.1%} (limit 90%)")
+    if p95 > args.max_p95_ms:
+        failed.append(f"ask p95 {p95:.2f} ms (limit {args.max_p95_ms:.0f} ms)")
+
+    if args.check:
+        for message in failed:
+            print(f"✗ {message}")
+        if failed:
+            sys.exit(1)
+        print("✓ Retrieval check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Check that KokoroTTS.save keeps peak memory flat as text length grows
+Uses the stub engine and tracemalloc (NumPy reports its buffers to tracemalloc).
+
+Usage:
+    python benchmarks/bench_save_memory.py            # report
+    python benchmarks/bench_save_memory.py --check    # exit 1 if memory grows with text
+"""
+
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "KokoroTTS"))
+sys.path.insert(0, str(Path(__file__).parent))
+from stub_kokoro import StubKokoro
+from tts_engine import KokoroTTS
+
+SENTENCE = "Chlorophyll absorbs red and blue light and reflects green light back to our eyes. "
+
+
+def peak_save_memory(tts: KokoroTTS, n_chars: int, output_path: Path) -> int:
+    """Peak traced bytes while saving n_chars of narration"""
+    text = SENTENCE * (n_chars // len(SENTENCE) + 1)
+    tracemalloc.start()
+    try:
+        tts.save(text, output_path, voice="am_liam")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run(lengths=(5_000, 50_000, 250_000)) -> dict:
+    """Measure peak memory for each text length"""
+    tts = KokoroTTS(kokoro=StubKokoro())
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_chars in lengths:
+            peak = peak_save_memory(tts, n_chars, Path(tmp) / "out.wav")
+            results[n_chars] = peak
+            print(f"  {n_chars:>8} chars: peak {peak / 1024:.0f} KB")
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Peak memory of KokoroTTS.save vs text length")
+    parser.add_argument("--check", action="store_true", help="Fail if peak memory grows with text length")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed largest/smallest peak ratio")
+    args = parser.parse_args()
+
+    results = run()
+    peaks = list(results.values())
+    ratio = peaks[-1] / peaks[0]
+    print(f"Largest/smallest peak ratio: {ratio:.2f}")
+
+    if args.check and ratio > args.tolerance:
+        print("✗ Peak memory grows with text length")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
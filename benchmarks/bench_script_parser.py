@@ -0,0 +1,165 @@
+"""
+Benchmark the lecture script parser on multi-megabyte scripts
+Builds a synthetic "whole semester" script and times backend/script_parser.py
+against the regex-split parser it replaced. --check also verifies cue
+handling: bracketed words that are not cues stay narration, and only likely
+cue typos produce warnings.
+
+Usage:
+    python benchmarks/bench_script_parser.py --size-mb 8
+    python benchmarks/bench_script_parser.py --check
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+from script_parser import ANIMATION_CUES, parse_script
+
+SEGMENT_TEMPLATE = """SLIDE: Topic {n}: Cells and Energy
+- Chloroplasts capture light energy
+- Mitochondria release stored energy
+- Both organelles contain their own DNA
+
+SPEECH: Welcome back to part {n} of the course. [GESTURE] Today we compare two organelles. [POINT] As you can see on the board, chloroplasts capture light energy while mitochondria release it. [THINK] Why would a plant cell need both? [NOD] Exactly, because it has to use the sugar it makes. [POINT] Notice the last bullet: both carry their own DNA.
+
+---
+
+"""
+
+
+def build_script(size_mb: float) -> str:
+    """Repeat the template segment until the script reaches size_mb"""
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    total = 0
+    n = 1
+    while total < target:
+        seg = SEGMENT_TEMPLATE.format(n=n)
+        parts.append(seg)
+        total += len(seg)
+        n += 1
+    return "".join(parts)
+
+
+def legacy_parse_script(script: str) -> list[dict]:
+    """The pre-tokenizer parser, kept here only as a comparison baseline"""
+    segments = []
+    for seg in re.split(r'\n---+\n|\n\n\n+', script.strip()):
+        if not seg.strip():
+            continue
+        segment = {"slide": {"title": "", "content": []}, "speech": "", "animations": []}
+        current_section = None
+        for line in seg.strip().split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if line.upper().startswith("SLIDE:"):
+                current_section = "slide"
+                segment["slide"]["title"] = line[6:].strip()
+            elif line.upper().startswith("SPEECH:"):
+                current_section = "speech"
+                segment["speech"] = line[7:].strip()
+            elif current_section == "slide":
+                segment["slide"]["content"].append(line)
+            elif current_section == "speech":
+                segment["speech"] += " " + line if segment["speech"] else line
+        for cue, anim_name in ANIMATION_CUES.items():
+            if cue in segment["speech"]:
+                pos = segment["speech"].find(cue)
+                segment["animations"].append({
+                    "animation": anim_name,
+                    "timing": pos / len(segment["speech"])
+                })
+        clean_speech = segment["speech"]
+        for cue in ANIMATION_CUES.keys():
+            clean_speech = clean_speech.replace(cue, "")
+        segment["speech_clean"] = clean_speech.strip()
+        if segment["slide"]["title"] or segment["speech"]:
+            segments.append(segment)
+    return segments
+
+
+# Ordinary bracketed words, several of them one letter from a cue: narration, no warning
+NARRATION_WORDS = ["[ATP]", "[DNA]", "[RNA]", "[USA]", "[H]", "[NOT]", "[NO]", "[NOW]", "[GOD]",
+                   "[SAVE]", "[HAVE]", "[WAVES]", "[THING]", "[POINTS]", "[NOTE]", "[IDEAL]"]
+# Likely typos of a cue: narration too, with a warning naming the cue
+TYPOS = {"[PIONT]": "[POINT]", "[GESTUER]": "[GESTURE]", "[GESTRE]": "[GESTURE]", "[THNIK]": "[THINK]"}
+
+
+def check_cues() -> list[str]:
+    """Problems with cue handling, as messages (empty when everything holds)"""
+    failed = []
+    for word in NARRATION_WORDS + list(TYPOS):
+        warnings = []
+        segment = parse_script(f"SPEECH: Cells make {word} here. [POINT] Look.", warnings)[0]
+        if segment["speech_clean"] != f"Cells make {word} here. Look.":
+            failed.append(f"{word} not kept as narration: {segment['speech_clean']!r}")
+        if [a["animation"] for a in segment["animations"]] != ["PointToBoard"]:
+            failed.append(f"{word} changed the cues: {segment['animations']}")
+        expected = TYPOS.get(word)
+        if expected is None and warnings:
+            failed.append(f"{word} warned: {warnings[0]['message']}")
+        if expected is not None and (len(warnings) != 1 or expected not in warnings[0]["message"]
+                                     or warnings[0]["column"] != len("SPEECH: Cells make ") + 1):
+            failed.append(f"{word} should warn about {expected} at column 20, got {warnings}")
+    return failed
+
+
+def time_parser(fn, script: str, repeat: int) -> float:
+    """Best-of-N wall time in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(script)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(size_mb: float = 4.0, repeat: int = 3) -> dict:
+    """Run the parser benchmark and return the results as a dict"""
+    script = build_script(size_mb)
+    megabytes = len(script) / (1024 * 1024)
+    segments = parse_script(script)
+    cues = sum(len(s["animations"]) for s in segments)
+
+    new_time = time_parser(parse_script, script, repeat)
+    legacy_time = time_parser(legacy_parse_script, script, repeat)
+
+    return {
+        "script_mb": round(megabytes, 2),
+        "segments": len(segments),
+        "cues": cues,
+        "parse_seconds": round(new_time, 4),
+        "parse_mb_per_second": round(megabytes / new_time, 2),
+        "legacy_parse_seconds": round(legacy_time, 4),
+    }
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark the lecture script parser")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Synthetic script size")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N repetitions")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail if non-cue brackets are not narration or cue typos are not warned about")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.size_mb, args.repeat), indent=2))
+
+    if args.check:
+        failed = check_cues()
+        for message in failed:
+            print(f"✗ {message}")
+        if failed:
+            sys.exit(1)
+        print(f"✓ Script parser check passed ({len(NARRATION_WORDS)} words kept as narration, "
+              f"{len(TYPOS)} typos warned)")
+
+
+if __name__ == "__main__":
+    main()
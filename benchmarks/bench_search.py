@@ -0,0 +1,176 @@
+"""
+Lecture search at scale: index size, indexing throughput and query latency
+Indexes --lectures synthetic lectures (Zipf-distributed vocabulary, slide
+titles, bullets and narration shaped like generated lectures) into a fresh
+SQLite database through search_index.index_lecture, then times
+search_index.search for several query shapes:
+
+    rare        one uncommon term
+    common      one term present in most lectures
+    multi       three mixed terms
+    phrase      a quoted two-word phrase
+    class       multi-term query scoped to one class (class_lectures join)
+    teacher     multi-term query scoped to one teacher's lectures
+
+Usage:
+    python benchmarks/bench_search.py                  # 10k lectures
+    python benchmarks/bench_search.py --lectures 2000 --check --max-p95-ms 100
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+
+VOCABULARY = 20000
+SEGMENTS = 6
+BULLETS = 3
+SPEECH_WORDS = 90
+TEACHERS = 50
+CLASSES = 40
+
+
+def word(rank: int) -> str:
+    """Deterministic pronounceable pseudo-word for a vocabulary rank"""
+    consonants, vowels = "bcdfghklmnprstvz", "aeiou"
+    letters = []
+    n = rank + 7
+    while n:
+        n, c = divmod(n, len(consonants))
+        n, v = divmod(n, len(vowels))
+        letters.append(consonants[c] + vowels[v])
+    return "".join(letters)
+
+
+def synthetic_lectures(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Zipf-like ranks: a few words appear everywhere, most are rare
+    weights = 1.0 / np.arange(1, VOCABULARY + 1) ** 1.05
+    weights /= weights.sum()
+    words = [word(i) for i in range(VOCABULARY)]
+    per_lecture = SEGMENTS * (BULLETS * 4 + SPEECH_WORDS + 3) + 4
+    for i in range(count):
+        ranks = iter(rng.choice(VOCABULARY, size=per_lecture, p=weights))
+        take = lambda n: " ".join(words[next(ranks)] for _ in range(n))
+        yield {
+            "id": f"lecture_{i:05d}",
+            "title": take(4).title(),
+            "segments": [
+                {
+                    "index": s + 1,
+                    "slide": {"title": take(3).title(), "content": [f"- {take(4)}" for _ in range(BULLETS)]},
+                    "audio": {"text": take(SPEECH_WORDS) + "."}
+                }
+                for s in range(SEGMENTS)
+            ]
+        }, i % TEACHERS + 1
+
+
+def index_size_mb(conn, path: str) -> float:
+    """Pages used by the search tables (dbstat) or, without it, the whole file"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'search_%' OR name LIKE 'idx_search_%'")
+        return (cursor.fetchone()[0] or 0) / 1e6
+    except Exception:
+        return os.path.getsize(path) / 1e6
+    finally:
+        cursor.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search index size and query latency")
+    parser.add_argument("--lectures", type=int, default=10000, help="Synthetic lectures to index")
+    parser.add_argument("--queries", type=int, default=50, help="Timed queries per shape")
+    parser.add_argument("--check", action="store_true", help="Fail if any shape's p95 exceeds --max-p95-ms")
+    parser.add_argument("--max-p95-ms", type=float, default=250, help="Upper bound for p95 latency")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "search.db")
+    os.environ.update(DB_BACKEND="sqlite", SQLITE_PATH=db_path, METRICS_ENABLED="False")
+    sys.path.insert(0, str(BACKEND_PATH))
+    import search_index
+    import storage
+    from database import get_db_connection
+
+    storage.get_storage().init_schema()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # ---- Index ----
+    words = [word(i) for i in range(VOCABULARY)]
+    start = time.perf_counter()
+    for n, (lecture, teacher) in enumerate(synthetic_lectures(args.lectures), 1):
+        search_index.index_lecture(cursor, lecture, teacher)
+        if n % 500 == 0:
+            conn.commit()
+    conn.commit()
+    index_seconds = time.perf_counter() - start
+
+    cursor.executemany(
+        "INSERT INTO class_lectures (class_id, lecture_id) VALUES (%s, %s)",
+        [(f"class_{i % CLASSES}", f"lecture_{i:05d}") for i in range(0, args.lectures, 4)]
+    )
+    conn.commit()
+
+    cursor.execute("SELECT COUNT(*) FROM search_postings")
+    postings = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(DISTINCT term) FROM search_postings")
+    terms = cursor.fetchone()[0]
+    size = index_size_mb(conn, db_path)
+    print(f"{args.lectures} lectures indexed in {index_seconds:.1f}s "
+          f"({args.lectures / index_seconds:.0f} lectures/s)")
+    print(f"{terms} terms, {postings} postings, index {size:.1f} MB "
+          f"({size * 1e6 / args.lectures / 1024:.1f} KB per lecture)\n")
+
+    # ---- Query ----
+    rng = np.random.default_rng(1)
+    pick = lambda lo, hi: words[int(rng.integers(lo, hi))]
+    shapes = {
+        "rare": lambda: (pick(3000, 8000), {}),
+        "common": lambda: (pick(0, 20), {}),
+        "multi": lambda: (f"{pick(0, 200)} {pick(200, 2000)} {pick(2000, 8000)}", {}),
+        "phrase": lambda: (f'"{pick(0, 50)} {pick(0, 50)}"', {}),
+        "class": lambda: (f"{pick(0, 200)} {pick(200, 2000)}", {"class_id": f"class_{rng.integers(CLASSES)}"}),
+        "teacher": lambda: (f"{pick(0, 200)} {pick(200, 2000)}", {"created_by": int(rng.integers(1, TEACHERS + 1))}),
+    }
+
+    print(f"{'shape':<8} {'p50':>8} {'p95':>8} {'hits':>6}")
+    failed = []
+    for name, make in shapes.items():
+        times, hits = [], []
+        for _ in range(args.queries):
+            query, scope = make()
+            start = time.perf_counter()
+            results = search_index.search(cursor, query, limit=10, **scope)
+            times.append(time.perf_counter() - start)
+            hits.append(len(results))
+        times.sort()
+        p50 = statistics.median(times) * 1000
+        p95 = times[int(0.95 * (len(times) - 1))] * 1000
+        print(f"{name:<8} {p50:>6.1f}ms {p95:>6.1f}ms {statistics.mean(hits):>6.1f}")
+        if p95 > args.max_p95_ms:
+            failed.append(f"{name}: p95 {p95:.1f} ms (limit {args.max_p95_ms:.0f} ms)")
+
+    cursor.close()
+    conn.close()
+
+    if args.check:
+        for message in failed:
+            print(f"✗ {message}")
+        if failed:
+            sys.exit(1)
+        print("✓ Search latency check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Cold start and memory of the API per storage backend
+Each backend runs in a fresh interpreter, which reports:
+
+    import      time to import backend/app.py (Flask, routes, storage)
+    first       first /api/health request (opens the first DB connection)
+    dashboard   mean latency of GET /api/progress with the progress cache off
+    rss         peak resident memory of the process afterwards
+
+Usage:
+    python benchmarks/bench_storage.py                     # sqlite and mysql (if reachable)
+    python benchmarks/bench_storage.py --backends sqlite --requests 1000
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+
+
+def child(backend: str, requests: int):
+    """Runs inside the measured interpreter; prints one JSON line"""
+    import resource
+
+    started = time.perf_counter()
+    sys.path.insert(0, str(BACKEND_PATH))
+    import app as backend_app
+    imported = time.perf_counter()
+
+    client = backend_app.app.test_client()
+    health = client.get("/api/health").get_json()
+    first = time.perf_counter()
+    if health["database"] != "connected":
+        print(json.dumps({"backend": backend, "skipped": True}))
+        return
+
+    run_id = uuid.uuid4().hex[:8]
+    token = client.post("/api/auth/register", json={
+        "userType": "student", "name": "Bench Student", "password": "bench-password",
+        "rollNumber": f"BS-{run_id}", "classId": f"BS-{run_id}"
+    }).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(5):
+        client.post("/api/progress/lecture", headers=headers,
+                    json={"lectureId": f"lecture_{i}", "progressPercent": 50, "positionSeconds": 60})
+        client.post("/api/quiz/submit", headers=headers,
+                    json={"quizId": f"quiz_{i}", "score": 7, "totalQuestions": 10})
+
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        client.get("/api/progress", headers=headers)
+    elapsed = time.perf_counter() - t0
+
+    print(json.dumps({
+        "backend": backend,
+        "import_ms": (imported - started) * 1000,
+        "first_ms": (first - imported) * 1000,
+        "dashboard_ms": elapsed * 1000 / requests,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }))
+
+
+def measure(backend: str, requests: int, workdir: Path) -> dict:
+    env = dict(os.environ, DB_BACKEND=backend, PROGRESS_CACHE_SECONDS="0", METRICS_ENABLED="False")
+    if backend == "sqlite":
+        env["SQLITE_PATH"] = str(workdir / "bench.db")
+        subprocess.run([sys.executable, "database.py"], cwd=BACKEND_PATH, env=env,
+                       check=True, capture_output=True)
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", backend, "--requests", str(requests)],
+        env=env, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - started
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["process_ms"] = wall * 1000
+    return report
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cold start and memory per storage backend")
+    parser.add_argument("--backends", default="sqlite,mysql", help="Comma-separated backends to measure")
+    parser.add_argument("--requests", type=int, default=500, help="Dashboard requests to time")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.requests)
+        return
+
+    print(f"{'backend':<8} {'import':>9} {'first req':>10} {'dashboard':>10} {'peak RSS':>9} {'process':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends.split(","):
+            report = measure(backend, args.requests, Path(workdir))
+            if report.get("skipped"):
+                print(f"{backend:<8} database unreachable, skipped")
+                continue
+            print(f"{backend:<8} {report['import_ms']:>7.0f}ms {report['first_ms']:>8.1f}ms "
+                  f"{report['dashboard_ms']:>8.2f}ms {report['rss_mb']:>7.1f}MB {report['process_ms']:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Speed variants: WSOLA time-stretch vs re-synthesis
+For each speed, reports the cost of deriving the variant from existing audio
+(KokoroTTS/time_stretch.py) and, when the real model is present, of
+synthesizing the text again at that speed:
+
+    stretch RTF   time-stretch seconds per second of source audio
+    resynth RTF   synthesis seconds per second of source audio (real model)
+    duration      output length vs len(source) / speed
+    pitch         fundamental frequency change (autocorrelation estimate)
+
+Without the model files, the source is a synthetic voiced signal
+(harmonics with vibrato and a syllable envelope) and re-synthesis is skipped.
+
+Usage:
+    python benchmarks/bench_time_stretch.py --seconds 60
+    python benchmarks/bench_time_stretch.py --check
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+KOKORO_PATH = ROOT / "KokoroTTS"
+sys.path.insert(0, str(KOKORO_PATH))
+
+from time_stretch import wsola
+
+SAMPLE_RATE = 24000
+TEXT = (
+    "Photosynthesis is the process plants use to turn light into chemical energy. "
+    "Chlorophyll absorbs red and blue light and reflects green light back to our eyes. "
+    "The energy is stored as glucose, which the plant uses to grow."
+)
+
+
+def synthetic_voice(seconds: float, f0: float = 140.0) -> np.ndarray:
+    """Harmonic signal with vibrato and a syllable-rate envelope"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.02 * np.sin(2 * np.pi * 5 * t))) / SAMPLE_RATE
+    voice = sum(np.sin(h * phase) / h for h in range(1, 8))
+    envelope = np.abs(np.sin(np.pi * 4 * t)) ** 0.5
+    return (0.3 * voice * envelope).astype(np.float32)
+
+
+def estimate_f0(samples: np.ndarray, lo: float = 60.0, hi: float = 400.0) -> float:
+    """Median per-frame fundamental by autocorrelation over voiced frames"""
+    frame = 2048
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame)[::frame // 2]
+    frames = frames[np.sqrt(np.mean(frames ** 2, axis=1)) > 0.05]
+    spectrum = np.fft.rfft(frames * np.hanning(frame), n=2 * frame, axis=1)
+    corr = np.fft.irfft(np.abs(spectrum) ** 2, axis=1)[:, :frame]
+    lags = np.arange(int(SAMPLE_RATE / hi), int(SAMPLE_RATE / lo))
+    best = lags[np.argmax(corr[:, lags], axis=1)]
+    return float(np.median(SAMPLE_RATE / best))
+
+
+def best_time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="WSOLA speed variants vs re-synthesis")
+    parser.add_argument("--speeds", default="0.75,0.8,1.25,1.5", help="Comma-separated speeds")
+    parser.add_argument("--seconds", type=float, default=60, help="Synthetic source length")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per speed (best is kept)")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail on >1%% duration error, >3%% pitch change or stretch RTF above --max-rtf")
+    parser.add_argument("--max-rtf", type=float, default=0.05, help="Upper bound for stretch RTF")
+    args = parser.parse_args()
+
+    tts = None
+    if (KOKORO_PATH / "kokoro-v1.0.onnx").exists():
+        from tts_engine import KokoroTTS
+        with contextlib.redirect_stdout(io.StringIO()):
+            tts = KokoroTTS(phoneme_cache=False)
+        source, _ = tts.synthesize(TEXT, voice="am_liam")
+        source = np.asarray(source, dtype=np.float32)
+        print(f"Source: real model, {len(source) / SAMPLE_RATE:.1f}s of speech")
+    else:
+        source = synthetic_voice(args.seconds)
+        print(f"Source: synthetic voice, {args.seconds:.0f}s (model files not found, re-synthesis skipped)")
+
+    source_f0 = estimate_f0(source)
+    seconds = len(source) / SAMPLE_RATE
+    print(f"\n{'speed':>6} {'stretch RTF':>12} {'resynth RTF':>12} {'duration':>9} {'pitch':>7}")
+
+    failed = []
+    for speed in [float(s) for s in args.speeds.split(",")]:
+        stretched = wsola(source, speed, SAMPLE_RATE)
+        stretch_rtf = best_time(lambda: wsola(source, speed, SAMPLE_RATE), args.repeat) / seconds
+        duration_error = len(stretched) / (len(source) / speed) - 1
+        pitch_change = estimate_f0(stretched) / source_f0 - 1
+
+        resynth = f"{'n/a':>12}"
+        if tts is not None:
+            rtf = best_time(lambda: tts.synthesize(TEXT, voice="am_liam", speed=speed), args.repeat) / seconds
+            resynth = f"{rtf:>12.3f}"
+
+        print(f"{speed:>5g}x {stretch_rtf:>12.4f} {resynth} {duration_error:>+8.2%} {pitch_change:>+6.1%}")
+        if abs(duration_error) > 0.01:
+            failed.append(f"{speed:g}x duration off by {duration_error:+.2%}")
+        if abs(pitch_change) > 0.03:
+            failed.append(f"{speed:g}x pitch changed by {pitch_change:+.1%}")
+        if stretch_rtf > args.max_rtf:
+            failed.append(f"{speed:g}x stretch RTF {stretch_rtf:.4f} (limit {args.max_rtf})")
+
+    if args.check:
+        for message in failed:
+            print(f"✗ {message}")
+        if failed:
+            sys.exit(1)
+        print("✓ Time-stretch check passed")
+
+
+if __name__ == "__main__":
+    main()
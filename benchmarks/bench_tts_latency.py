@@ -0,0 +1,181 @@
+"""
+Time to first audio of /api/tts while lectures are being generated
+Runs backend/app.py in-process on a stub engine that takes --rtf seconds per
+second of audio (StubKokoro + sleep), keeps --lectures lecture syntheses
+running on the shared scheduler, and sends short /api/tts requests.
+
+    first audio   request start -> first WAV bytes (header + first chunk)
+    total         request start -> end of stream
+    cached        the same request once the phrase cache holds it
+
+Compared runs:
+    priority      the scheduler as shipped (interactive chunks first)
+    fifo          every chunk at lecture priority (interactive requests queue
+                  behind the lecture chunks already waiting)
+
+Usage:
+    python benchmarks/bench_tts_latency.py
+    python benchmarks/bench_tts_latency.py --check --max-first-ms 2500
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT / "KokoroTTS"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from stub_kokoro import SAMPLE_RATE, StubKokoro
+
+LECTURE_TEXT = " ".join(
+    f"Sentence {i} of the lecture explains one more detail about the water cycle and its stages."
+    for i in range(40)
+)
+QUESTIONS = [
+    "Evaporation turns liquid water into vapour. The sun provides the energy for it.",
+    "Condensation forms clouds when the vapour cools down high in the atmosphere.",
+    "Great question! Precipitation is any water that falls from clouds, like rain or snow.",
+]
+
+
+class SlowStubKokoro(StubKokoro):
+    """StubKokoro that takes rtf seconds per second of generated audio"""
+
+    def __init__(self, rtf):
+        super().__init__()
+        self.rtf = rtf
+
+    def create(self, text, voice="af_sky", speed=1.0, lang="en-us", is_phonemes=False):
+        samples, sr = super().create(text, voice, speed, lang, is_phonemes)
+        time.sleep(self.rtf * len(samples) / sr)
+        return samples, sr
+
+
+def lecture_load(scheduler, count, stop):
+    """Keep `count` lecture syntheses queued until stop is set"""
+    import tts_service
+
+    def loop():
+        # Same chunking as KokoroTTS.save(), checking stop between chunks
+        tts = scheduler.bind(tts_service.LECTURE)
+        while not stop.is_set():
+            for chunk in tts._split_text(LECTURE_TEXT, max_chars=300):
+                if stop.is_set():
+                    return
+                tts.synthesize(chunk, voice="am_liam")
+
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(count)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def timed_request(client, token, text):
+    """(first audio seconds, total seconds, cache header, bytes)"""
+    start = time.perf_counter()
+    response = client.post("/api/tts", json={"text": text, "voice": "sarah"},
+                           headers={"Authorization": f"Bearer {token}"}, buffered=False)
+    if response.status_code != 200:
+        raise RuntimeError(f"/api/tts returned {response.status_code}: {response.get_data(as_text=True)}")
+    first, size = None, 0
+    for piece in response.response:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(piece)
+    response.close()
+    return first, time.perf_counter() - start, response.headers.get("X-TTS-Cache"), size
+
+
+def run(mode, args, app, token):
+    import tts_service
+    from tts_engine import KokoroTTS
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tts = KokoroTTS(kokoro=SlowStubKokoro(args.rtf))
+    scheduler = tts_service.set_engine(tts)
+    tts_service.phrase_cache.clear()
+    levels = (tts_service.FIRST_AUDIO, tts_service.INTERACTIVE)
+    if mode == "fifo":
+        tts_service.FIRST_AUDIO = tts_service.INTERACTIVE = tts_service.LECTURE
+
+    stop = threading.Event()
+    threads = lecture_load(scheduler, args.lectures, stop)
+    time.sleep(0.5)  # let lecture chunks pile up in the queue
+
+    client = app.test_client()
+    first, total, cached = [], [], []
+    try:
+        for i in range(args.requests):
+            text = QUESTIONS[i % len(QUESTIONS)] + f" ({i})"
+            f, t, _, _ = timed_request(client, token, text)
+            first.append(f)
+            total.append(t)
+        # Second request admits a phrase into the cache, the third is served from it
+        for _ in range(2):
+            timed_request(client, token, QUESTIONS[0])
+        f, _, header, _ = timed_request(client, token, QUESTIONS[0])
+        if header == "hit":
+            cached.append(f)
+    finally:
+        stop.set()
+        tts_service.FIRST_AUDIO, tts_service.INTERACTIVE = levels
+        for t in threads:
+            t.join()
+
+    return {
+        "first_p50": statistics.median(first) * 1000,
+        "first_max": max(first) * 1000,
+        "total_p50": statistics.median(total) * 1000,
+        "cached": cached[0] * 1000 if cached else None
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="/api/tts time to first audio under lecture load")
+    parser.add_argument("--rtf", type=float, default=0.1, help="Stub engine seconds per audio second")
+    parser.add_argument("--lectures", type=int, default=3, help="Concurrent lecture syntheses")
+    parser.add_argument("--requests", type=int, default=6, help="/api/tts requests per run")
+    parser.add_argument("--check", action="store_true", help="Fail if priority first audio exceeds --max-first-ms")
+    parser.add_argument("--max-first-ms", type=float, default=2500,
+                        help="Upper bound for p50 first audio (one 300-char lecture chunk at the default RTF is 2 s)")
+    args = parser.parse_args()
+
+    os.environ["LECTURE_GENERATION_ENABLED"] = "True"
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as backend
+    from auth import generate_token
+
+    token = generate_token(1, "student", "bench")
+    print(f"Stub engine RTF {args.rtf}, {args.lectures} lectures generating, {args.requests} requests, "
+          f"{SAMPLE_RATE} Hz\n")
+    print(f"{'mode':<9} {'first p50':>10} {'first max':>10} {'total p50':>10} {'cached':>8}")
+    results = {}
+    for mode in ("priority", "fifo"):
+        r = results[mode] = run(mode, args, backend.app, token)
+        cached = f"{r['cached']:>6.1f}ms" if r["cached"] is not None else f"{'n/a':>8}"
+        print(f"{mode:<9} {r['first_p50']:>8.0f}ms {r['first_max']:>8.0f}ms {r['total_p50']:>8.0f}ms {cached}")
+
+    if args.check:
+        failed = False
+        if results["priority"]["first_p50"] > args.max_first_ms:
+            print(f"✗ First audio p50 {results['priority']['first_p50']:.0f} ms (limit {args.max_first_ms:.0f} ms)")
+            failed = True
+        if results["priority"]["cached"] is None:
+            print("✗ Repeated phrase was not served from the phrase cache")
+            failed = True
+        if failed:
+            sys.exit(1)
+        print("✓ TTS latency check passed")
+
+
+if __name__ == "__main__":
+    main()
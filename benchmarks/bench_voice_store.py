@@ -0,0 +1,133 @@
+"""
+Voice style loading: voices-v1.0.bin (.npz) vs the memory-mapped voice store
+Several worker processes each open the voices and look up the lecture voices
+(VOICES in backend/lecture_generator.py) the way kokoro-onnx does on every
+synthesis call. Reported per worker:
+
+    open     time to open the voices file / store
+    lookup   mean time of one style lookup
+    RSS      resident memory added by opening and using the voices
+    PSS      the same as proportional set size: pages shared between workers
+             are divided among them (Linux only)
+
+Uses KokoroTTS/voices-v1.0.bin when present, otherwise a synthetic file with
+the same layout (54 voices x 510 x 1 x 256 float32).
+
+Usage:
+    python benchmarks/bench_voice_store.py --workers 4
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+KOKORO_PATH = ROOT / "KokoroTTS"
+sys.path.insert(0, str(KOKORO_PATH))
+sys.path.insert(0, str(ROOT / "backend"))
+
+LOOKUPS = 200
+
+
+def lecture_voices() -> list[str]:
+    from lecture_generator import VOICES
+    return [v for group in VOICES.values() for v in group.values()]
+
+
+def synthetic_bin(path: Path, count: int = 54):
+    rng = np.random.default_rng(0)
+    names = lecture_voices()
+    names += [f"xx_voice{i}" for i in range(count - len(names))]
+    with open(path, "wb") as f:  # np.savez would append .npz to a path
+        np.savez(f, **{n: rng.standard_normal((510, 1, 256)).astype(np.float32) for n in names})
+
+
+def _memory_mb() -> dict:
+    """Current RSS and PSS of this process (Linux /proc)"""
+    memory = {"rss": None, "pss": None}
+    try:
+        for line in Path("/proc/self/smaps_rollup").read_text().splitlines():
+            key = line.split(":")[0].lower()
+            if key in memory:
+                memory[key] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return memory
+
+
+def child(mode: str, source: str):
+    """Runs inside one worker process; prints one JSON line"""
+    from voice_store import VoiceStore
+
+    before = _memory_mb()
+    start = time.perf_counter()
+    voices = np.load(source) if mode == "bin" else VoiceStore(source)
+    opened = time.perf_counter() - start
+
+    names = lecture_voices()
+    checksum = 0.0
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        style = voices[names[i % len(names)]]
+        checksum += float(style[i % len(style)][0, 0])  # touch the row kokoro would use
+    lookup = (time.perf_counter() - start) / LOOKUPS
+
+    time.sleep(0.5)  # keep pages mapped while the other workers measure
+    after = _memory_mb()
+    print(json.dumps({
+        "open_ms": opened * 1000,
+        "lookup_us": lookup * 1e6,
+        "rss_mb": after["rss"] - before["rss"] if after["rss"] is not None else None,
+        "pss_mb": after["pss"] - before["pss"] if after["pss"] is not None else None
+    }))
+
+
+def run(mode: str, source: Path, workers: int) -> list[dict]:
+    procs = [
+        subprocess.Popen([sys.executable, __file__, "--child", mode, "--source", str(source)],
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    return [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="voices-v1.0.bin vs memory-mapped voice store")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent worker processes")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.source)
+        return
+
+    from voice_store import convert
+
+    with tempfile.TemporaryDirectory() as tmp:
+        voices_bin = KOKORO_PATH / "voices-v1.0.bin"
+        if not voices_bin.exists():
+            voices_bin = Path(tmp) / "voices-v1.0.bin"
+            synthetic_bin(voices_bin)
+            print("Using a synthetic voices file (KokoroTTS/voices-v1.0.bin not found)")
+        store = convert(voices_bin, Path(tmp) / "voices")
+
+        print(f"{len(lecture_voices())} lecture voices, {LOOKUPS} lookups, {args.workers} workers\n")
+        print(f"{'source':<8} {'open':>8} {'lookup':>10} {'RSS/worker':>11} {'PSS/worker':>11}")
+        for mode, source in (("bin", voices_bin), ("store", store)):
+            reports = run(mode, source, args.workers)
+            mean = lambda key: sum(r[key] for r in reports) / len(reports)
+            memory = (f"{mean('rss_mb'):>9.2f}MB {mean('pss_mb'):>9.2f}MB"
+                      if reports[0]["rss_mb"] is not None else f"{'n/a':>11} {'n/a':>11}")
+            print(f"{mode:<8} {mean('open_ms'):>6.2f}ms {mean('lookup_us'):>8.1f}us {memory}")
+
+
+if __name__ == "__main__":
+    main()
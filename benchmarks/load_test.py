@@ -0,0 +1,312 @@
+"""
+HTTP load test for the AetherLearn Flask API
+Simulates a classroom surge: seeds N classes x M students through the real
+/api/auth/register route, then replays a weighted mix of student requests and
+reports throughput, p50/p95/p99 latency and DB queries per request per route.
+
+Two modes:
+    --url http://localhost:5000   Hit a running server over HTTP (keep-alive).
+                                  Query counts come from the X-Query-Count
+                                  response header when the server sends it.
+    (default)                     Run backend/app.py in-process through Flask's
+                                  test client against the DB configured in .env;
+                                  queries are counted by wrapping the connection.
+
+Usage:
+    python benchmarks/load_test.py --classes 4 --students 40 --duration 30 --concurrency 40
+    python benchmarks/load_test.py --url http://localhost:5000 --output load.json
+"""
+
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+
+PASSWORD = "loadtest-password"
+
+# Relative weights of each request type in the replayed mix
+MIX = {
+    "login": 10,
+    "lecture_progress": 30,
+    "leaderboard": 25,
+    "lectures": 15,
+    "quiz_submit": 20
+}
+
+
+# ==================== CLIENTS ====================
+
+class HttpClient:
+    """Minimal keep-alive JSON client for a running server (one per thread)"""
+
+    def __init__(self, base_url: str):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.local = threading.local()
+
+    def _connection(self):
+        if not hasattr(self.local, "conn"):
+            self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return self.local.conn
+
+    def request(self, method: str, path: str, body=None, token=None):
+        """Returns (status, json_body, query_count or None)"""
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = json.dumps(body) if body is not None else None
+
+        conn = self._connection()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # Server closed the keep-alive connection; retry once on a fresh one
+            conn.close()
+            del self.local.conn
+            conn = self._connection()
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+
+        query_count = response.getheader("X-Query-Count")
+        return (
+            response.status,
+            json.loads(data) if data else {},
+            int(query_count) if query_count is not None else None
+        )
+
+
+class InProcessClient:
+    """Drives backend/app.py through Flask's test client and counts DB queries"""
+
+    def __init__(self):
+        sys.path.insert(0, str(BACKEND_PATH))
+        import app as backend_app
+
+        self.app = backend_app.app
+        self.local = threading.local()
+
+        # Wrap every connection the routes open so cursor.execute calls are counted
+        original = backend_app.get_db_connection
+
+        def counting_connection():
+            conn = original()
+            return _CountingConnection(conn, self.local) if conn else conn
+
+        backend_app.get_db_connection = counting_connection
+
+    def request(self, method: str, path: str, body=None, token=None):
+        if not hasattr(self.local, "client"):
+            self.local.client = self.app.test_client()
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.local.queries = 0
+        response = self.local.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True) or {}, self.local.queries
+
+
+class _CountingConnection:
+    def __init__(self, conn, counter):
+        self._conn = conn
+        self._counter = counter
+
+    def cursor(self, *args, **kwargs):
+        return _CountingCursor(self._conn.cursor(*args, **kwargs), self._counter)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class _CountingCursor:
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def execute(self, *args, **kwargs):
+        self._counter.queries = getattr(self._counter, "queries", 0) + 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# ==================== SEEDING ====================
+
+def seed(client, classes: int, students: int, concurrency: int) -> list[dict]:
+    """Register classes x students through the real register route"""
+    run_id = uuid.uuid4().hex[:6]
+
+    def register(class_index, student_index):
+        class_id = f"LT-{run_id}-C{class_index}"
+        roll_number = f"LT-{run_id}-{class_index}-{student_index}"
+        status, body, _ = client.request("POST", "/api/auth/register", {
+            "userType": "student",
+            "name": f"Load Student {class_index}-{student_index}",
+            "password": PASSWORD,
+            "rollNumber": roll_number,
+            "classId": class_id
+        })
+        if status != 201:
+            raise RuntimeError(f"Registration failed ({status}): {body}")
+        return {"rollNumber": roll_number, "classId": class_id, "token": body["token"]}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(register, c, s)
+            for c in range(classes)
+            for s in range(students)
+        ]
+        return [f.result() for f in futures]
+
+
+# ==================== WORKLOAD ====================
+
+def make_request(client, kind: str, student: dict, rng: random.Random):
+    """Issue one request of the given kind as the given student"""
+    token = student["token"]
+    if kind == "login":
+        return client.request("POST", "/api/auth/login", {
+            "userType": "student",
+            "password": PASSWORD,
+            "rollNumber": student["rollNumber"],
+            "classId": student["classId"]
+        })
+    if kind == "lecture_progress":
+        return client.request("POST", "/api/progress/lecture", {
+            "lectureId": f"lecture_{rng.randint(1, 20)}",
+            "progressPercent": rng.randint(0, 100),
+            "positionSeconds": rng.randint(0, 900)
+        }, token)
+    if kind == "leaderboard":
+        return client.request("GET", "/api/leaderboard", token=token)
+    if kind == "lectures":
+        return client.request("GET", "/api/lectures", token=token)
+    if kind == "quiz_submit":
+        total = 10
+        return client.request("POST", "/api/quiz/submit", {
+            "quizId": f"quiz_{rng.randint(1, 10)}",
+            "score": rng.randint(0, total),
+            "totalQuestions": total
+        }, token)
+    raise ValueError(kind)
+
+
+def replay(client, students: list[dict], duration: float, concurrency: int, seed_value: int) -> dict:
+    """Run the weighted mix for `duration` seconds on `concurrency` threads"""
+    kinds = list(MIX)
+    weights = [MIX[k] for k in kinds]
+    samples = {kind: [] for kind in kinds}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = random.Random(seed_value + worker_id)
+        local = {kind: [] for kind in kinds}
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            student = rng.choice(students)
+            start = time.perf_counter()
+            try:
+                status, _, queries = make_request(client, kind, student, rng)
+            except Exception:
+                status, queries = 0, None
+            local[kind].append((time.perf_counter() - start, status, queries))
+        with lock:
+            for kind in kinds:
+                samples[kind].extend(local[kind])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return summarize(samples, elapsed)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    """Throughput, latency percentiles, error rate and query counts per route"""
+    routes = {}
+    total = 0
+    for kind, rows in samples.items():
+        latencies = sorted(r[0] for r in rows)
+        errors = sum(1 for r in rows if not 200 <= r[1] < 300)
+        queries = [r[2] for r in rows if r[2] is not None]
+        total += len(rows)
+        routes[kind] = {
+            "requests": len(rows),
+            "throughput_rps": round(len(rows) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "errors": errors,
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None
+        }
+    return {
+        "duration_seconds": round(elapsed, 2),
+        "total_requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "routes": routes
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{'route':<18}{'req':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err':>6}{'q/req':>7}")
+    for kind, r in report["routes"].items():
+        q = f"{r['queries_per_request']:.1f}" if r["queries_per_request"] is not None else "-"
+        print(f"{kind:<18}{r['requests']:>8}{r['throughput_rps']:>9}{r['p50_ms']:>9}"
+              f"{r['p95_ms']:>9}{r['p99_ms']:>9}{r['errors']:>6}{q:>7}")
+    print(f"\nTotal: {report['total_requests']} requests in {report['duration_seconds']}s "
+          f"({report['throughput_rps']} req/s)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test the AetherLearn API")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--classes", type=int, default=4, help="Classes to seed")
+    parser.add_argument("--students", type=int, default=40, help="Students per class")
+    parser.add_argument("--duration", type=float, default=30, help="Replay duration in seconds")
+    parser.add_argument("--concurrency", type=int, default=40, help="Concurrent simulated devices")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the request mix")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    client = HttpClient(args.url) if args.url else InProcessClient()
+
+    print(f"Seeding {args.classes} classes x {args.students} students via /api/auth/register...")
+    seed_start = time.perf_counter()
+    students = seed(client, args.classes, args.students, args.concurrency)
+    print(f"Seeded {len(students)} students in {time.perf_counter() - seed_start:.1f}s")
+
+    print(f"Replaying mix for {args.duration:.0f}s on {args.concurrency} threads...")
+    report = replay(client, students, args.duration, args.concurrency, args.seed)
+    report["config"] = vars(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
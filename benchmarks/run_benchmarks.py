@@ -0,0 +1,244 @@
+"""
+Benchmark suite for the TTS and lecture-generation pipeline
+Runs headless (no audio hardware) and falls back to the stub engine when the
+Kokoro ONNX model is not downloaded.
+
+Measures:
+    - model load time
+    - real-time factor per voice and speed
+    - _split_text throughput
+    - SVG slide render rate
+    - script parser throughput
+    - end-to-end LectureGenerator.generate_lecture wall time
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json   # exit 1 on regression
+"""
+
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "KokoroTTS"))
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import lecture_generator
+from lecture_generator import VOICES, LectureGenerator, generate_slide_svg
+from tts_engine import KokoroTTS
+import bench_script_parser
+
+SPEEDS = (0.8, 1.0, 1.25)
+
+PARAGRAPH = (
+    "Photosynthesis happens inside special structures called chloroplasts. "
+    "These are like tiny solar panels inside plant cells. Inside each chloroplast "
+    "is a green pigment called chlorophyll, and that's exactly why plants are green!"
+)
+
+LECTURE_SCRIPT = """
+SLIDE: Where Photosynthesis Happens
+- Inside plant cells called chloroplasts
+- Chloroplasts contain chlorophyll
+
+SPEECH: So where does all this happen? [POINT] If you look at the board, photosynthesis occurs inside special structures called chloroplasts. [GESTURE] Inside each chloroplast is a green pigment called chlorophyll.
+
+---
+
+SLIDE: The Two Stages
+- Light-dependent reactions
+- The Calvin Cycle
+
+SPEECH: [GESTURE] Photosynthesis is actually two interconnected stages! [POINT] As shown on the board, the first stage captures light energy and the second stage uses it to build glucose.
+"""
+
+
+def metric(value, unit, better="lower"):
+    """One benchmark result; `better` tells the baseline comparison which way is good"""
+    return {"value": round(value, 6), "unit": unit, "better": better}
+
+
+def real_model_available() -> bool:
+    return (ROOT / "KokoroTTS" / "kokoro-v1.0.onnx").exists() and \
+        (ROOT / "KokoroTTS" / "voices-v1.0.bin").exists()
+
+
+def load_tts(use_stub: bool) -> tuple[KokoroTTS, float]:
+    """Build the engine and return it with its load time in seconds"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if use_stub:
+            from stub_kokoro import StubKokoro
+            tts = KokoroTTS(kokoro=StubKokoro())
+        else:
+            tts = KokoroTTS()
+    return tts, time.perf_counter() - start
+
+
+# ==================== BENCHMARKS ====================
+
+def bench_rtf(tts: KokoroTTS, repeat: int) -> dict:
+    """Real-time factor (synthesis seconds per audio second) per voice and speed"""
+    results = {}
+    voice_ids = [v for group in VOICES.values() for v in group.values()]
+    for voice in voice_ids:
+        for speed in SPEEDS:
+            tts.synthesize(PARAGRAPH, voice=voice, speed=speed)  # warm-up
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                samples, sr = tts.synthesize(PARAGRAPH, voice=voice, speed=speed)
+                elapsed = time.perf_counter() - start
+                best = min(best, elapsed / (len(samples) / sr))
+            results[f"rtf.{voice}.{speed}"] = metric(best, "x")
+    return results
+
+
+def bench_split_text(tts: KokoroTTS, repeat: int) -> dict:
+    """Characters per second through _split_text on a long narration"""
+    text = PARAGRAPH * 2000
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tts._split_text(text)
+        best = min(best, time.perf_counter() - start)
+    return {"split_text.chars_per_second": metric(len(text) / best, "chars/s", "higher")}
+
+
+def bench_svg(repeat: int) -> dict:
+    """Slides rendered per second"""
+    content = ["- Inside plant cells called chloroplasts", "- Chlorophyll is the green pigment",
+               "Leaves have millions of chloroplasts", "- Light & water <in>, sugar \"out\""]
+    n = 2000
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(n):
+            generate_slide_svg("Where Photosynthesis Happens", content, i + 1, n)
+        best = min(best, time.perf_counter() - start)
+    return {"svg.slides_per_second": metric(n / best, "slides/s", "higher")}
+
+
+def bench_parser(repeat: int) -> dict:
+    """Script parser throughput on a multi-megabyte course script"""
+    result = bench_script_parser.run(size_mb=2.0, repeat=repeat)
+    return {"parser.mb_per_second": metric(result["parse_mb_per_second"], "MB/s", "higher")}
+
+
+def bench_generate_lecture(tts: KokoroTTS, repeat: int) -> dict:
+    """Wall time of LectureGenerator.generate_lecture (slides + audio + metadata)"""
+    original_base = lecture_generator.OUTPUT_BASE
+    best = float("inf")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            lecture_generator.OUTPUT_BASE = Path(tmp)
+            # generate_lecture narrates its progress; keep it out of the JSON on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator = LectureGenerator(voice="liam", speed=0.95, tts=tts)
+                for i in range(repeat):
+                    start = time.perf_counter()
+                    generator.generate_lecture(f"bench_{i}", "Benchmark Lecture", LECTURE_SCRIPT)
+                    best = min(best, time.perf_counter() - start)
+    finally:
+        lecture_generator.OUTPUT_BASE = original_base
+    return {"generate_lecture.wall_seconds": metric(best, "s")}
+
+
+def run(use_stub: bool, repeat: int = 3) -> dict:
+    """Run every benchmark and return the results document"""
+    tts, load_seconds = load_tts(use_stub)
+
+    metrics = {"model_load.seconds": metric(load_seconds, "s")}
+    metrics.update(bench_rtf(tts, repeat))
+    metrics.update(bench_split_text(tts, repeat))
+    metrics.update(bench_svg(repeat))
+    metrics.update(bench_parser(repeat))
+    metrics.update(bench_generate_lecture(tts, repeat))
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "engine": "stub" if use_stub else "kokoro-onnx",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "metrics": metrics
+    }
+
+
+# ==================== BASELINE ====================
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """
+    Compare results with a saved baseline
+
+    Returns:
+        List of regressions (metrics worse than baseline by more than tolerance)
+    """
+    regressions = []
+    if results["engine"] != baseline.get("engine"):
+        print(f"⚠ Baseline engine is {baseline.get('engine')}, current is {results['engine']}")
+
+    for name, current in results["metrics"].items():
+        previous = baseline.get("metrics", {}).get(name)
+        if not previous or not previous["value"]:
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        worse = change > tolerance if current["better"] == "lower" else change < -tolerance
+        marker = "✗" if worse else "✓"
+        print(f"  {marker} {name}: {previous['value']:.4g} -> {current['value']:.4g} {current['unit']} ({change:+.1%})")
+        if worse:
+            regressions.append({"metric": name, "baseline": previous["value"],
+                                "current": current["value"], "change": change})
+    return regressions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AetherLearn TTS / lecture generation benchmarks")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N repetitions")
+    parser.add_argument("--stub", action="store_true", help="Use the stub engine even if the model exists")
+    args = parser.parse_args()
+
+    use_stub = args.stub or not real_model_available()
+    if use_stub:
+        print("Using stub TTS engine (Kokoro model not found or --stub given)", file=sys.stderr)
+
+    results = run(use_stub, args.repeat)
+    document = json.dumps(results, indent=2)
+
+    if args.output:
+        Path(args.output).write_text(document, encoding="utf-8")
+        print(f"Results: {args.output}")
+    else:
+        print(document)
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(document, encoding="utf-8")
+        print(f"Baseline saved: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nComparing with {args.baseline} (tolerance {args.tolerance:.0%})")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s)")
+            sys.exit(1)
+        print("\n✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
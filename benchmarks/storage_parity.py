@@ -0,0 +1,277 @@
+"""
+Storage parity check for the AetherLearn API
+Runs the same API scenario (register, login, lecture progress, quiz and test
+submissions, dashboard, attempts, leaderboard, analytics, roster import,
+export) through Flask's test client against each storage backend and
+compares the normalized responses. One step submits the same quiz from
+CONCURRENT_SUBMISSIONS threads at once, which must get distinct attempt
+numbers and award the pass bonus once.
+
+    sqlite   Fresh temporary database file, schema from schema_sqlite.sql
+    mysql    The database configured in backend/.env (skipped when it is
+             unreachable); the scenario uses its own class and roll numbers
+
+Usage:
+    python benchmarks/storage_parity.py                    # both backends, print diff
+    python benchmarks/storage_parity.py --backends sqlite  # one backend
+    python benchmarks/storage_parity.py --check            # exit 1 on any mismatch or failed expectation
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+BACKEND_PATH = Path(__file__).parent.parent / "backend"
+
+PASSWORD = "parity-password"
+CONCURRENT_SUBMISSIONS = 8
+
+# Keys whose values legitimately differ between runs/backends
+VOLATILE_KEYS = {"token", "id", "userId", "atRisk", "completed_at", "date", "lastAttempt", "submittedAt"}
+
+
+def load_app():
+    sys.path.insert(0, str(BACKEND_PATH))
+    import app as backend_app
+    return backend_app
+
+
+def make_storage(name: str, workdir: Path):
+    import storage
+    if name == "sqlite":
+        backend = storage.SQLiteStorage(workdir / "parity.db")
+        backend.init_schema()
+        return backend
+    backend = storage.MySQLStorage()
+    conn = backend.connect()
+    if conn is None:
+        return None
+    conn.close()
+    return backend
+
+
+# ==================== SCENARIO ====================
+
+def run_scenario(client, run_id: str) -> dict:
+    """Drive the API and collect (status, body) for each step"""
+    class_id = f"PAR-{run_id}"
+    results = {}
+
+    def call(step, method, path, body=None, token=None, **kwargs):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = client.open(path, method=method, json=body, headers=headers, **kwargs)
+        payload = response.get_json(silent=True)
+        if payload is None:
+            payload = response.get_data(as_text=True)
+        results[step] = (response.status_code, payload)
+        return payload
+
+    students = []
+    for i in range(3):
+        body = call(f"register_{i}", "POST", "/api/auth/register", {
+            "userType": "student", "name": f"Parity Student {i}", "password": PASSWORD,
+            "rollNumber": f"{class_id}-{i}", "classId": class_id
+        })
+        students.append(body["token"])
+    call("register_duplicate", "POST", "/api/auth/register", {
+        "userType": "student", "name": "Dup", "password": PASSWORD,
+        "rollNumber": f"{class_id}-0", "classId": class_id
+    })
+    teacher = call("register_teacher", "POST", "/api/auth/register", {
+        "userType": "teacher", "name": "Parity Teacher", "password": PASSWORD,
+        "email": f"{run_id}@parity.test", "school": "Parity School"
+    })["token"]
+
+    call("login", "POST", "/api/auth/login", {
+        "userType": "student", "password": PASSWORD, "rollNumber": f"{class_id}-0", "classId": class_id
+    })
+    call("login_wrong_password", "POST", "/api/auth/login", {
+        "userType": "student", "password": "wrong", "rollNumber": f"{class_id}-0", "classId": class_id
+    })
+    call("me", "GET", "/api/auth/me", token=students[0])
+
+    for step, (token, lecture, percent) in enumerate([
+        (students[0], "lecture_1", 40), (students[0], "lecture_1", 100),
+        (students[1], "lecture_1", 60), (students[0], "lecture_2", 100)
+    ]):
+        call(f"lecture_progress_{step}", "POST", "/api/progress/lecture", {
+            "lectureId": lecture, "progressPercent": percent, "positionSeconds": percent * 3
+        }, token)
+
+    for step, (token, quiz, score) in enumerate([
+        (students[0], "quiz_1", 5), (students[0], "quiz_1", 8), (students[0], "quiz_1", 9),
+        (students[1], "quiz_1", 10), (students[2], "quiz_2", 3)
+    ]):
+        call(f"quiz_{step}", "POST", "/api/quiz/submit",
+             {"quizId": quiz, "score": score, "totalQuestions": 10}, token)
+
+    # Same student, same quiz, all at once: half of them pass
+    barrier = threading.Barrier(CONCURRENT_SUBMISSIONS)
+    concurrent = []
+
+    def submit(score):
+        own_client = client.application.test_client()
+        barrier.wait()
+        response = own_client.post("/api/quiz/submit", json={"quizId": "quiz_3", "score": score, "totalQuestions": 10},
+                                   headers={"Authorization": f"Bearer {students[2]}"})
+        concurrent.append((response.status_code, (response.get_json(silent=True) or {}).get("attempts")))
+
+    threads = [threading.Thread(target=submit, args=(9 if i % 2 else 3,)) for i in range(CONCURRENT_SUBMISSIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results["quiz_concurrent"] = (200, sorted(concurrent, key=lambda r: (r[0], r[1] or 0)))
+    call("progress_concurrent", "GET", "/api/progress", token=students[2])
+
+    call("test", "POST", "/api/test/submit", {
+        "testId": "test_1", "answers": {"q1": "photosynthesis"}, "aiScore": 15, "totalMarks": 20
+    }, students[1])
+
+    call("progress", "GET", "/api/progress", token=students[0])
+    call("attempts", "GET", "/api/progress/attempts?pageSize=2", token=students[0])
+    call("attempts_page_past_end", "GET", "/api/progress/attempts?page=9&pageSize=2", token=students[0])
+    call("leaderboard", "GET", "/api/leaderboard", token=students[0])
+
+    roster = "name,roll_number\nRoster One,{0}-r1\nRoster Dup,{0}-0\n,{0}-r2\n".format(class_id)
+    results["roster"] = _multipart(client, f"/api/classes/{class_id}/roster", roster, teacher)
+
+    for suffix in ("", "/lectures", "/quizzes", "/students"):
+        call(f"analytics{suffix or '/overview'}", "GET", f"/api/analytics/classes/{class_id}{suffix}", token=teacher)
+    call("export_csv", "GET", f"/api/classes/{class_id}/export?format=csv", token=teacher)
+    call("export_ndjson", "GET", f"/api/classes/{class_id}/export?format=ndjson", token=teacher)
+    call("analytics_forbidden", "GET", f"/api/analytics/classes/{class_id}", token=students[0])
+
+    return normalize(results, run_id)
+
+
+def _multipart(client, path, text, token):
+    response = client.post(path, headers={"Authorization": f"Bearer {token}"}, data={
+        "file": (io.BytesIO(text.encode()), "roster.csv"), "defaultPassword": PASSWORD
+    }, content_type="multipart/form-data")
+    return response.status_code, response.get_json(silent=True)
+
+
+def normalize(value, run_id):
+    """Strip run-specific and volatile values so backends can be compared"""
+    if isinstance(value, dict):
+        return {k: normalize(v, run_id) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v, run_id) for v in value]
+    if isinstance(value, str):
+        value = value.replace(run_id, "RUN")
+        if value.startswith("{") and "\n" in value:
+            # NDJSON export
+            return [normalize(json.loads(line), run_id) for line in value.splitlines()]
+        if "\n" in value and "," in value.split("\n", 1)[0]:
+            # CSV export: drop the date column
+            rows = list(csv.reader(io.StringIO(value)))
+            return [row[:-1] for row in rows]
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+# ==================== EXPECTATIONS ====================
+
+EXPECTED_STATUS = {
+    "register_0": 201, "register_duplicate": 409, "register_teacher": 201,
+    "login": 200, "login_wrong_password": 401, "me": 200,
+    "quiz_0": 200, "test": 200, "progress": 200, "attempts": 200,
+    "leaderboard": 200, "roster": 200, "analytics/overview": 200,
+    "export_csv": 200, "analytics_forbidden": 403
+}
+
+
+def check_expectations(results: dict) -> list[str]:
+    """Backend-independent facts the scenario must produce"""
+    failures = []
+    for step, status in EXPECTED_STATUS.items():
+        if results[step][0] != status:
+            failures.append(f"{step}: status {results[step][0]}, expected {status}: {results[step][1]}")
+
+    quiz = [results[f"quiz_{i}"][1] for i in range(3)]
+    if [q.get("attempts") for q in quiz] != [1, 2, 3]:
+        failures.append(f"quiz attempts not 1, 2, 3: {quiz}")
+
+    expected = [(200, n) for n in range(1, CONCURRENT_SUBMISSIONS + 1)]
+    if [tuple(r) for r in results["quiz_concurrent"][1]] != expected:
+        failures.append(f"concurrent quiz submissions: {results['quiz_concurrent'][1]}, expected {expected}")
+    if results["progress_concurrent"][1].get("stats", {}).get("quizzes_passed") != 1:
+        failures.append(f"concurrent passes counted more than once: {results['progress_concurrent'][1].get('stats')}")
+
+    progress = results["progress"][1]
+    if progress.get("stats", {}).get("quizzes_passed") != 1:
+        failures.append(f"pass bonus not applied exactly once: {progress.get('stats')}")
+    if results["attempts"][1].get("total") != 3:
+        failures.append(f"attempt history total != 3: {results['attempts'][1]}")
+    if results["attempts_page_past_end"][1].get("total") != 3:
+        failures.append("attempt total missing past the last page")
+    if results["roster"][1] and results["roster"][1].get("summary") != {"created": 1, "duplicate": 1, "invalid": 1}:
+        failures.append(f"roster summary: {results['roster'][1].get('summary')}")
+    return failures
+
+
+def diff(a, b, path="") -> list[str]:
+    if isinstance(a, dict) and isinstance(b, dict):
+        out = []
+        for key in sorted(set(a) | set(b), key=str):
+            out += diff(a.get(key), b.get(key), f"{path}.{key}")
+        return out
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        out = []
+        for i, (x, y) in enumerate(zip(a, b)):
+            out += diff(x, y, f"{path}[{i}]")
+        return out
+    return [] if a == b else [f"{path}: {a!r} != {b!r}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare API responses across storage backends")
+    parser.add_argument("--backends", default="sqlite,mysql", help="Comma-separated backends to run")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on any mismatch or failed expectation")
+    args = parser.parse_args()
+
+    backend_app = load_app()
+    import storage
+
+    outcomes = {}
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.backends.split(","):
+            backend = make_storage(name, Path(workdir))
+            if backend is None:
+                print(f"⚠ {name}: database unreachable, skipped")
+                continue
+            storage.set_storage(backend)
+
+            run_id = uuid.uuid4().hex[:8]
+            results = run_scenario(backend_app.app.test_client(), run_id)
+            outcomes[name] = results
+
+            failures = check_expectations(results)
+            failed |= bool(failures)
+            print(f"{'✓' if not failures else '✗'} {name}: {len(results)} steps")
+            for failure in failures:
+                print(f"    {failure}")
+
+    if len(outcomes) == 2:
+        (a_name, a), (b_name, b) = outcomes.items()
+        mismatches = diff(a, b)
+        failed |= bool(mismatches)
+        print(f"{'✓' if not mismatches else '✗'} {a_name} vs {b_name}: {len(mismatches)} mismatches")
+        for line in mismatches:
+            print(f"    {line}")
+
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Stub Kokoro engine for benchmarks
+Stands in for kokoro_onnx.Kokoro when the ONNX model files are absent, so the
+pipeline can be measured on machines without the model or audio hardware.
+"""
+
+import numpy as np
+
+SAMPLE_RATE = 24000
+CHARS_PER_SECOND = 15  # Roughly the speaking rate of the real voices
+
+
+class StubTokenizer:
+    """Character-level stand-in for kokoro_onnx's phonemizer"""
+
+    def phonemize(self, text, lang="en-us"):
+        return text.lower()
+
+
+class StubKokoro:
+    """
+    Produces speech-shaped noise whose length follows the text length
+
+    Mirrors Kokoro.create(text, voice, speed, lang) -> (samples, sample_rate).
+    """
+
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.tokenizer = StubTokenizer()
+
+    def create(self, text, voice="af_sky", speed=1.0, lang="en-us", is_phonemes=False):
+        n = int(SAMPLE_RATE * len(text) / CHARS_PER_SECOND / speed)
+        samples = self.rng.standard_normal(n, dtype=np.float32)
+        samples *= np.float32(0.1)
+        # Syllable-rate envelope so silence trimming and loudness have work to do
+        t = np.arange(n, dtype=np.float32) / SAMPLE_RATE
+        samples *= np.abs(np.sin(np.pi * 4 * t, dtype=np.float32))
+        return samples, SAMPLE_RATE
@@ -4,6 +4,7 @@ import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { Input } from "@/components/ui/input";
 import { useToast } from "@/hooks/use-toast";
+import { lectureAPI, ttsAPI } from "@/services/api";
 
 interface Message {
   id: string;
@@ -160,22 +161,35 @@ const AIQAWidget = ({ lectureId, lectureTopic }: AIQAWidgetProps) => {
     setInputText("");
     setAttachments([]);
 
-    // Simulate AI response (replace with actual API call)
+    // Answer from the lecture's own content (top passages and their slides)
     try {
-      await new Promise((resolve) => setTimeout(resolve, 1500));
+      const { passages } = newQuestion.content.trim()
+        ? await lectureAPI.ask(lectureId, newQuestion.content)
+        : { passages: [] };
 
       const aiResponse: Message = {
         id: `a-${Date.now()}`,
         type: "answer",
-        content: `This is an AI-generated answer to your question about "${lectureTopic}". In a real implementation, this would be powered by an AI model that understands the lecture content and your question${
-          newQuestion.attachments && newQuestion.attachments.length > 0
-            ? ` along with the ${newQuestion.attachments.length} attachment(s) you provided`
-            : ""
-        }.`,
+        content: passages.length
+          ? passages
+              .map((p) => `Slide ${p.slide} (${p.slideTitle}): ${p.text}`)
+              .join("\n\n")
+          : `I couldn't find that in "${lectureTopic}". Try asking with words used in the lecture.`,
         timestamp: new Date(),
       };
 
       setMessages((prev) => [...prev, aiResponse]);
+
+      // Read the answer aloud; the text stays usable if speech is unavailable
+      ttsAPI
+        .speak(passages.length ? passages[0].text : aiResponse.content)
+        .then((audio) => {
+          const url = URL.createObjectURL(audio);
+          const player = new Audio(url);
+          player.onended = () => URL.revokeObjectURL(url);
+          return player.play();
+        })
+        .catch(() => {});
     } catch (error) {
       toast({
         title: "Error",
@@ -212,7 +226,7 @@ const AIQAWidget = ({ lectureId, lectureTopic }: AIQAWidgetProps) => {
                     : "bg-muted text-foreground"
                 }`}
               >
-                <p className="text-sm break-words">{msg.content}</p>
+                <p className="text-sm break-words whitespace-pre-line">{msg.content}</p>
                 {msg.attachments && msg.attachments.length > 0 && (
                   <div className="mt-2 flex flex-wrap gap-2">
                     {msg.attachments.map((att, idx) => (
@@ -3,7 +3,7 @@ import { useNavigate } from "react-router-dom";
 import { ArrowLeft, Trophy, Medal, Loader2 } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
-import { leaderboardAPI, LeaderboardEntry } from "@/services/api";
+import { leaderboardAPI, liveAPI, LeaderboardEntry } from "@/services/api";
 import { Line, Pie } from "react-chartjs-2";
 import {
   Chart as ChartJS,
@@ -60,6 +60,29 @@ const LeaderboardPage = () => {
     fetchLeaderboard();
   }, []);
 
+  // Live rank changes for the student's class instead of polling
+  useEffect(() => {
+    const classId = localStorage.getItem("classId");
+    if (!classId) return;
+    const currentUserId = Number(localStorage.getItem("userId"));
+
+    return liveAPI.subscribe(classId, (event) => {
+      if (event.type === "snapshot") {
+        setLeaderboard(
+          event.leaderboard.map((entry) => ({ ...entry, isCurrentUser: entry.userId === currentUserId }))
+        );
+      } else if (event.type === "ranks") {
+        setLeaderboard((previous) => {
+          const byUser = new Map(previous.map((entry) => [entry.userId, entry]));
+          for (const { previousRank, ...change } of event.changes) {
+            byUser.set(change.userId, { ...change, isCurrentUser: change.userId === currentUserId });
+          }
+          return Array.from(byUser.values()).sort((a, b) => a.rank - b.rank);
+        });
+      }
+    });
+  }, []);
+
   const getMedalIcon = (rank: number) => {
     if (rank === 1) return <span className="text-2xl">🥇</span>;
     if (rank === 2) return <span className="text-2xl">🥈</span>;
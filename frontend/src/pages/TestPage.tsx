@@ -37,6 +37,7 @@ const TestPage = () => {
   const [answers, setAnswers] = useState<Record<string, string>>({});
   const [submitted, setSubmitted] = useState(false);
   const [aiScore, setAiScore] = useState<number | null>(null);
+  const [serverGraded, setServerGraded] = useState(false);
 
   // Load draft from localStorage
   useEffect(() => {
@@ -126,9 +127,21 @@ const TestPage = () => {
     localStorage.setItem('testResults', JSON.stringify(results));
     localStorage.removeItem(`test_${id}_draft`);
     
-    // Submit to backend
+    // Submit to backend; tests with an answer key are graded there
     try {
-      await testAPI.submitTest(id!, answers, score, test.total_marks);
+      const response = await testAPI.submitTest(id!, answers, score, test.total_marks);
+      if (response.status === 'pending' && response.resultId) {
+        const resultId = response.resultId;
+        for (let attempt = 0; attempt < 30; attempt++) {
+          await new Promise((resolve) => setTimeout(resolve, 2000));
+          const result = await testAPI.getResult(resultId);
+          if (result.status === 'graded' && result.aiScore !== null) {
+            setAiScore(result.aiScore);
+            setServerGraded(true);
+            break;
+          }
+        }
+      }
     } catch (error) {
       console.log("Offline mode - test saved locally");
     }
@@ -151,7 +164,7 @@ const TestPage = () => {
           <Card className="w-full max-w-2xl p-8 text-center shadow-elevated">
             <h1 className="text-3xl font-bold text-foreground mb-4">Test Submitted!</h1>
             <p className="text-lg text-muted-foreground mb-6">
-              Your answers have been evaluated by AI
+              {serverGraded ? 'Your answers have been graded by the server' : 'Your answers have been evaluated by AI'}
             </p>
 
             <div className={`rounded-xl p-6 mb-6 ${passed ? 'bg-accent/10' : 'bg-warning/10'}`}>
@@ -187,11 +187,42 @@ export interface UserStats {
   streak_days: number;
 }
 
+export interface ProgressSummary {
+  lectures_started: number;
+  lectures_completed: number;
+  average_lecture_progress: number | null;
+  quizzes_attempted: number;
+  quizzes_passed: number;
+  quiz_attempts_total: number;
+  average_best_quiz_percentage: number | null;
+  tests_taken: number;
+  average_test_percentage: number | null;
+}
+
 export interface UserProgress {
   lectures: LectureProgress[];
   quizzes: QuizScore[];
   tests: TestResult[];
   stats: UserStats;
+  summary: ProgressSummary;
+}
+
+export interface QuizAttempt {
+  quiz_id: string;
+  score: number;
+  total_questions: number;
+  percentage: number;
+  passed: boolean;
+  attempt: number;
+  completed_at: string | null;
+}
+
+export interface QuizAttemptPage {
+  attempts: QuizAttempt[];
+  page: number;
+  pageSize: number;
+  total: number;
+  totalPages: number;
 }
 
 export const progressAPI = {
@@ -199,6 +230,12 @@ export const progressAPI = {
     return apiRequest<UserProgress>('/progress');
   },
 
+  getAttempts: async (page = 1, pageSize = 20, quizId?: string): Promise<QuizAttemptPage> => {
+    const params = new URLSearchParams({ page: String(page), pageSize: String(pageSize) });
+    if (quizId) params.set('quizId', quizId);
+    return apiRequest<QuizAttemptPage>(`/progress/attempts?${params}`);
+  },
+
   updateLectureProgress: async (
     lectureId: string,
     progressPercent: number,
@@ -236,13 +273,24 @@ export const quizAPI = {
 
 // ==================== TEST API ====================
 
+export interface TestResultStatus {
+  resultId: number;
+  testId: string;
+  status: 'pending' | 'graded';
+  aiScore: number | null;
+  totalMarks: number;
+  percentage: number | null;
+  submittedAt: string;
+}
+
 export const testAPI = {
+  // Tests with a server answer key come back pending; poll getResult for the score
   submitTest: async (
     testId: string,
     answers: Record<string, string>,
     aiScore: number,
     totalMarks: number
-  ): Promise<{ message: string; percentage: number }> => {
+  ): Promise<{ message: string; status: 'pending' | 'graded'; percentage?: number; resultId?: number }> => {
     return apiRequest('/test/submit', {
       method: 'POST',
       body: JSON.stringify({
@@ -253,6 +301,10 @@ export const testAPI = {
       }),
     });
   },
+
+  getResult: async (resultId: number): Promise<TestResultStatus> => {
+    return apiRequest(`/test/results/${resultId}`);
+  },
 };
 
 // ==================== LEADERBOARD API ====================
@@ -272,6 +324,213 @@ export const leaderboardAPI = {
   },
 };
 
+// ==================== LIVE UPDATES API ====================
+
+export interface LiveRankChange {
+  userId: number;
+  name: string;
+  score: number;
+  streak: number;
+  rank: number;
+  previousRank: number | null;
+}
+
+export type LiveEvent =
+  | { type: 'snapshot'; leaderboard: Omit<LiveRankChange, 'previousRank'>[] }
+  | { type: 'ranks'; changes: LiveRankChange[] }
+  | { type: 'progress'; userId: number; lectureId: string; progressPercent: number; completed: boolean };
+
+// Server-Sent Events read with fetch (EventSource cannot send the auth header).
+// Reconnects after drops until closed or refused; returns a function that closes the stream.
+const subscribeEvents = <T>(path: string, onEvent: (event: T) => void): (() => void) => {
+  const controller = new AbortController();
+  let retryMs = 3000;
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const token = getToken();
+        const response = await fetch(`${API_BASE_URL}${path}`, {
+          headers: token ? { Authorization: `Bearer ${token}` } : {},
+          signal: controller.signal,
+        });
+        if (!response.ok || !response.body) {
+          if ([401, 403, 404, 503].includes(response.status)) return;
+          throw new Error(`Event stream failed: ${response.status}`);
+        }
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          let end;
+          while ((end = buffer.indexOf('\n\n')) >= 0) {
+            const message = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            const lines = message.split('\n');
+            const retry = lines.find((line) => line.startsWith('retry: '));
+            if (retry) retryMs = Number(retry.slice(7)) || retryMs;
+            const data = lines.filter((line) => line.startsWith('data: ')).map((line) => line.slice(6));
+            if (data.length) onEvent(JSON.parse(data.join('\n')));
+          }
+        }
+      } catch {
+        if (controller.signal.aborted) return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, retryMs));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};
+
+export const liveAPI = {
+  // Returns a function that closes the stream
+  subscribe: (classId: string, onEvent: (event: LiveEvent) => void): (() => void) =>
+    subscribeEvents(`/live/classes/${encodeURIComponent(classId)}`, onEvent),
+};
+
+// ==================== LIVE SESSION API ====================
+
+export interface SessionSlide {
+  slide: number;
+  duration: number;
+  assets: string[];
+}
+
+export interface SessionState {
+  playing: boolean;
+  slide: number;
+  position: number;
+  startAt: number;
+  at: number;
+}
+
+export interface LiveSession {
+  id: string;
+  lectureId: string;
+  classId: string;
+  teacherId: number;
+  createdAt: number;
+  state: SessionState;
+  ended: boolean;
+}
+
+export type SessionEvent =
+  | { type: 'session'; id: string; lectureId: string; classId: string; slot: number; plan: SessionSlide[]; leadMs: number }
+  | ({ type: 'state'; serverTime: number } & SessionState)
+  | { type: 'prefetch'; slide: number; assets: string[]; at: number }
+  | { type: 'end' };
+
+export type SessionAction = 'play' | 'pause' | 'seek' | 'slide' | 'end';
+
+export const sessionAPI = {
+  // Server clock minus this device's clock in ms: the sample with the shortest
+  // round trip, assuming the server read its clock halfway through
+  clockOffset: async (samples = 5): Promise<number> => {
+    let best = { roundTrip: Infinity, offset: 0 };
+    for (let i = 0; i < samples; i++) {
+      const sent = Date.now();
+      const response = await fetch(`${API_BASE_URL}/sessions/clock`, { cache: 'no-store' });
+      const received = Date.now();
+      const { serverTime } = await response.json();
+      if (received - sent < best.roundTrip) {
+        best = { roundTrip: received - sent, offset: serverTime - (sent + received) / 2 };
+      }
+    }
+    return best.offset;
+  },
+
+  // Seconds into the current slide at this device's time, given its clock offset
+  position: (state: SessionState, offsetMs: number): number => {
+    const serverNow = Date.now() + offsetMs;
+    return state.playing && serverNow > state.startAt
+      ? state.position + (serverNow - state.startAt) / 1000
+      : state.position;
+  },
+
+  start: async (lectureId: string, classId: string): Promise<{ session: LiveSession & { plan: SessionSlide[] } }> => {
+    return apiRequest('/sessions', {
+      method: 'POST',
+      body: JSON.stringify({ lectureId, classId }),
+    });
+  },
+
+  current: async (classId: string): Promise<{ session: LiveSession }> => {
+    return apiRequest(`/classes/${encodeURIComponent(classId)}/session`);
+  },
+
+  control: async (
+    sessionId: string,
+    action: SessionAction,
+    options: { slide?: number; position?: number } = {}
+  ): Promise<{ state: SessionState }> => {
+    return apiRequest(`/sessions/${encodeURIComponent(sessionId)}/control`, {
+      method: 'POST',
+      body: JSON.stringify({ action, ...options }),
+    });
+  },
+
+  // Follows the session until it ends; returns a function that closes the stream
+  follow: (sessionId: string, onEvent: (event: SessionEvent) => void): (() => void) => {
+    const close = subscribeEvents<SessionEvent>(`/sessions/${encodeURIComponent(sessionId)}/events`, (event) => {
+      onEvent(event);
+      if (event.type === 'end') close();
+    });
+    return close;
+  },
+};
+
+// ==================== LECTURE Q&A API ====================
+
+export interface LecturePassage {
+  slide: number;
+  slideTitle: string;
+  text: string;
+  score: number;
+}
+
+export const lectureAPI = {
+  // Passages of the lecture that best match the question, best first
+  ask: async (
+    lectureId: string,
+    question: string,
+    k = 3
+  ): Promise<{ lectureId: string; question: string; passages: LecturePassage[] }> => {
+    return apiRequest(`/lectures/${encodeURIComponent(lectureId)}/ask`, {
+      method: 'POST',
+      body: JSON.stringify({ question, k }),
+    });
+  },
+};
+
+// ==================== SPEECH API ====================
+
+export const ttsAPI = {
+  // Returns a WAV blob; the server streams it and starts with the first sentence
+  speak: async (text: string, voice = 'sarah', speed = 1.0): Promise<Blob> => {
+    const token = getToken();
+    const response = await fetch(`${API_BASE_URL}/tts`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify({ text, voice, speed }),
+    });
+
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.error || 'Speech synthesis failed');
+    }
+
+    return response.blob();
+  },
+};
+
 // ==================== HEALTH CHECK ====================
 
 export const healthAPI = {
@@ -287,5 +546,9 @@ export default {
   quiz: quizAPI,
   test: testAPI,
   leaderboard: leaderboardAPI,
+  live: liveAPI,
+  session: sessionAPI,
+  lecture: lectureAPI,
+  tts: ttsAPI,
   health: healthAPI,
 };